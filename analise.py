@@ -1,41 +1,50 @@
 import glob
-import matplotlib.pyplot as plt
 import os
+import numpy as np
 import pandas as pd
-from scipy.stats import ttest_ind, shapiro, mannwhitneyu
-from pandas.api.types import is_string_dtype
-import seaborn as sns
+
+from player_store import CSV_ROOT, open_store
+from render_cache import RENDER_KEY, RenderPool, is_up_to_date, render_key
+from results_store import ResultsStore, data_key, params_key
+from steamdb_csv import cache_info, load_chart_csv
+from tracing import annotate, span, traced, tracer
 
 class Analyzer(object):
-    def __init__(self, media_name, game_franchise_name, media_type, release_dates, combine=False, metric="Average"):
+    def __init__(self, media_name, game_franchise_name, media_type, release_dates, combine=False, metric="Average", store=None, renderer=None):
         self.media_name = media_name
         self.game_franchise_name = game_franchise_name
         self.media_type = media_type
         self.release_dates = release_dates
         self.combine = combine
-        self.metric = metric
-
+        # metric pode ser uma métrica ("Average") ou uma lista delas (["Peak", "Average"]);
+        # com várias métricas cada arquivo é lido uma vez e gera uma figura com um subgráfico por métrica.
+        self.metrics = [metric] if isinstance(metric, str) else list(metric)
+        self.metric = self.metrics[0]
+        self.store = store
+        self.renderer = renderer
+
+    @traced(category="analyzer")
     def create_graph(self, df, output_graph_dir, csv_filename, combined_plot_title=None):
         """
         Cria e salva um gráfico.
         Se combined_plot_title for fornecido e 'Source' estiver nas colunas do df,
         trata como um gráfico combinado com múltiplas fontes.
+        O gráfico só é renderizado se os dados ou as opções mudaram desde a última geração;
+        com um RenderPool configurado, a renderização é feita em outro processo.
         """
-        plt.figure(figsize=(15, 7)) # Aumentado um pouco para melhor visualização de múltiplos plots
-        title_metric_name = 'Média' if self.metric == "Average" else self.metric
-
-        if 'Source' in df.columns and combined_plot_title:  # Gráfico combinado
-            # Agrupa por 'Source' e plota cada um
-            for source_name, group in df.groupby('Source'):
-                # Ordena cada grupo por data para garantir que as linhas sejam desenhadas corretamente
-                group_sorted = group.sort_values("Month")
-                plt.plot(group_sorted["Month"], group_sorted[self.metric], label=f"{source_name} - {self.metric}", marker='o', linestyle='-')
-            plt.title(combined_plot_title)
+        metrics = [m for m in self.metrics if m in df.columns]
+        title_metric_name = " / ".join(_metric_label(m) for m in metrics)
+        metrics_slug = "_".join(m.replace(' ', '_').lower() for m in metrics)
+        combined = 'Source' in df.columns and bool(combined_plot_title)
+
+        if combined:  # Gráfico combinado
+            title = combined_plot_title
+            plot_df = df[["Month", *metrics, "Source"]]
             # Nome do arquivo para o gráfico combinado
-            graph_filename_base = f"combined_{self.game_franchise_name}_{self.metric.replace(' ', '_').lower()}"
+            graph_filename_base = f"combined_{self.game_franchise_name}_{metrics_slug}"
         else:  # Gráfico individual
-            plt.plot(df["Month"], df[self.metric], label=f"{self.metric}", marker='o', linestyle='-')
-            plt.title(f"{title_metric_name} de Jogadores Mensais: {os.path.splitext(csv_filename)[0]}")
+            title = f"{title_metric_name} de Jogadores Mensais: {os.path.splitext(csv_filename)[0]}"
+            plot_df = df[["Month", *metrics]]
             graph_filename_base = os.path.splitext(csv_filename)[0]
 
         # Lógica para desenhar linhas verticais de datas de lançamento
@@ -46,37 +55,205 @@ class Analyzer(object):
             current_release_dates = {"Release": self.release_dates}
         # Não mostrar print se não houver datas, especialmente no modo combinado
 
+        release_lines = []
         for event_name, date_str in current_release_dates.items():
             try:
                 release_date = pd.to_datetime(date_str, errors='raise') # 'raise' para capturar datas inválidas
-                plt.axvline(x=release_date, color='r', linestyle='--',
-                            label=f'{event_name} Release ({release_date.strftime("%Y-%m-%d")})')
+                release_lines.append((f'{event_name} Release ({release_date.strftime("%Y-%m-%d")})', release_date))
             except ValueError:
                 print(f"Data de lançamento '{event_name}' ('{date_str}') é inválida e não será plotada.")
             except Exception as e:
                 print(f"Erro ao processar data de lançamento '{event_name}' ('{date_str}'): {e}")
 
+        options = {
+            "metrics": metrics,
+            "combined": combined,
+            "title": title,
+            "ylabels": [f"{_metric_label(m)} de Jogadores" for m in metrics],
+            "release_lines": release_lines,
+            # Aumentado um pouco para melhor visualização de múltiplos plots; cada métrica extra ganha uma faixa
+            "figsize": (15, 7) if len(metrics) == 1 else (15, 4 * len(metrics) + 1),
+        }
+
+        graph_filename = f"{graph_filename_base}_{metrics_slug}_analysis.png"
+        graph_filepath = os.path.join(output_graph_dir, graph_filename)
+        key = render_key(plot_df, options)
+        if is_up_to_date(graph_filepath, key):
+            annotate(outcome="cached")
+            print(f"Gráfico sem alterações, mantendo: {graph_filepath}")
+            return
+        if self.renderer is not None:
+            self.renderer.submit(render_line_chart, plot_df, graph_filepath, options, key)
+        else:
+            render_line_chart(plot_df, graph_filepath, options, key)
 
-        plt.xlabel("Mês")
-        plt.ylabel(f"{title_metric_name} de Jogadores")
-        plt.legend(loc='upper left', bbox_to_anchor=(1,1)) # Ajusta a posição da legenda
-        plt.grid(True)
-        plt.xticks(rotation=45)
-        plt.tight_layout(rect=[0, 0, 0.85, 1]) # Ajusta o layout para caber a legenda fora
+    def _load_frame(self, csv_filepath, csv_filename, store=None):
+        """
+        Retorna o DataFrame limpo (Month e as métricas) de um arquivo, ordenado por mês.
+        Usa o armazenamento colunar quando ele contém uma cópia atualizada do CSV.
+        """
+        entry = store.entry_for_path(csv_filepath) if store is not None else None
+        if entry is not None and store.is_fresh(entry):
+            return self._clean_metrics(store.series(entry, self.metrics), csv_filename)
+        return self._read_csv(csv_filepath, csv_filename)
 
-        graph_filename = f"{graph_filename_base}_{self.metric.replace(' ', '_').lower()}_analysis.png"
-        graph_filepath = os.path.join(output_graph_dir, graph_filename)
-        plt.savefig(graph_filepath)
-        plt.close()
-        print(f"Gráfico salvo em: {graph_filepath}")
+    def _read_csv(self, csv_filepath, csv_filename):
+        try:
+            df = load_chart_csv(csv_filepath, self.metrics)
+        except KeyError:
+            print(f"Coluna 'Month' não encontrada em {csv_filename}. Pulando.")
+            return None
+        return self._clean_metrics(df, csv_filename)
+
+    def _clean_metrics(self, df, csv_filename):
+        metrics = []
+        for metric in self.metrics:
+            if metric in df.columns:
+                metrics.append(metric)
+            else:
+                print(f"Coluna da métrica '{metric}' não encontrada em {csv_filename}. Pulando.")
+        if not metrics:
+            return None
+
+        # Remove linhas sem nenhuma das métricas APÓS a conversão.
+        # Isso é importante para não tentar plotar NaNs ou ter problemas na combinação.
+        df = df[["Month", *metrics]].dropna(subset=metrics, how='all')
+        if df.empty:
+            print(f"DataFrame vazio ou sem dados válidos para a métrica '{', '.join(metrics)}' em {csv_filename} após limpeza. Pulando.")
+            return None
+        return df
+
+    def csv_dir(self):
+        return os.path.join(CSV_ROOT, self.game_franchise_name)
+
+    def csv_files(self):
+        """Lista, em ordem alfabética, os arquivos CSV da franquia."""
+        return sorted(f for f in os.listdir(self.csv_dir()) if f.endswith(".csv"))
+
+    @traced(category="analyzer")
+    def analyze_file(self, csv_filename, store=None, output_graph_dir="graphs"):
+        """
+        Carrega e limpa um CSV da franquia, uma única vez para todas as métricas.
+        No modo individual gera o gráfico do arquivo e retorna None; no modo combinado
+        retorna o DataFrame (Month, métricas, Source) usado no gráfico combinado.
+        """
+        csv_filepath = os.path.join(self.csv_dir(), csv_filename)
+        print(f"Analisando arquivo: {csv_filepath} para a métrica: {', '.join(self.metrics)}")
+        df = self._load_frame(csv_filepath, csv_filename, store)
+        if df is None:
+            return None
+        return self._analyze_frame(df, csv_filename, output_graph_dir)
+
+    def _analyze_frame(self, df, csv_filename, output_graph_dir):
+        if self.combine:
+            df = df.copy()
+            df['Source'] = os.path.splitext(csv_filename)[0]  # Adiciona nome do arquivo como fonte
+            return df
+
+        # Lógica original para gráficos individuais e filtro por data de lançamento
+        oldest_date_in_csv = df["Month"].min()
+        if pd.isna(oldest_date_in_csv):
+            print(f"Não foi possível determinar a data mais antiga em {csv_filename}. Pulando.")
+            return None
+
+        main_release_date_str = None
+        if self.media_type == "Series" and isinstance(self.release_dates, dict) and "S1" in self.release_dates:
+            main_release_date_str = self.release_dates["S1"]
+        elif isinstance(self.release_dates, str):
+            main_release_date_str = self.release_dates
+        elif isinstance(self.release_dates, dict) and self.release_dates:
+            try:
+                main_release_date_str = next(iter(self.release_dates.values()))
+            except StopIteration:
+                pass # main_release_date_str continua None
+
+        if main_release_date_str:
+            try:
+                compare_release_date = pd.to_datetime(main_release_date_str, errors='raise')
+                if oldest_date_in_csv < compare_release_date:
+                    print(f"Gerando gráfico para {csv_filename} pois {oldest_date_in_csv.strftime('%Y-%m-%d')} < {compare_release_date.strftime('%Y-%m-%d')}")
+                    self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
+                else:
+                    print(f"Dados em {csv_filename} ({oldest_date_in_csv.strftime('%Y-%m-%d')}) não são anteriores à data de lançamento principal ({compare_release_date.strftime('%Y-%m-%d')}). Nenhum gráfico gerado.")
+            except ValueError:
+                print(f"Data de lançamento principal ('{main_release_date_str}') é inválida. Gerando gráfico para {csv_filename} sem filtro de data.")
+                self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
+        else:
+            print(f"Gerando gráfico para {csv_filename} (sem data de lançamento principal para filtro).")
+            self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
+        return None
+
+    def load_frames(self, store=None):
+        """
+        Lê e limpa todos os CSVs da franquia de uma vez.
 
+        Returns:
+            dict: csv_filename -> DataFrame (Month e as métricas), sem os arquivos que falharam.
+        """
+        frames = {}
+        for csv_filename in self.csv_files():
+            csv_filepath = os.path.join(self.csv_dir(), csv_filename)
+            try:
+                df = self._load_frame(csv_filepath, csv_filename, store)
+            except Exception as e:
+                print(f"Erro ao processar o arquivo {csv_filepath}: {e}")
+                continue
+            if df is not None:
+                frames[csv_filename] = df
+        return frames
+
+    @traced(category="analyzer")
+    def analyze_frames(self, frames, output_graph_dir="graphs"):
+        """
+        Equivalente a analyze_media sobre DataFrames já carregados por load_frames, que podem
+        conter mais métricas que as desta mídia; assim várias mídias da mesma franquia
+        compartilham uma única leitura dos arquivos.
+        """
+        os.makedirs(output_graph_dir, exist_ok=True)
+        all_dfs_for_combine = []
+        for csv_filename, df in frames.items():
+            try:
+                df = self._clean_metrics(df, csv_filename)
+                if df is None:
+                    continue
+                df = self._analyze_frame(df, csv_filename, output_graph_dir)
+                if df is not None:
+                    all_dfs_for_combine.append(df)
+            except Exception as e:
+                print(f"Erro ao analisar {csv_filename} para '{self.media_name}': {e}")
+        if self.combine:
+            self.analyze_combined(all_dfs_for_combine, output_graph_dir)
+
+    @traced(category="analyzer")
+    def analyze_combined(self, all_dfs_for_combine, output_graph_dir="graphs"):
+        """Gera o gráfico combinado a partir dos DataFrames retornados por analyze_file."""
+        if not all_dfs_for_combine:
+            print("Modo de combinação ativado, mas nenhum dado foi coletado dos arquivos CSV.")
+            return
+
+        combined_df = pd.concat(all_dfs_for_combine, ignore_index=True)
+        # Métricas já vêm como int32/float32; a fonte se repete em todas as linhas do jogo
+        combined_df["Source"] = combined_df["Source"].astype("category")
+
+        if not combined_df.empty:
+            # Ordenar por data geral para o eixo X e depois por fonte para consistência na legenda
+            combined_df.sort_values(by=["Month", "Source"], inplace=True)
+            title_metric_name = " / ".join(_metric_label(m) for m in self.metrics)
+            combined_title = f"{title_metric_name} de Jogadores Mensais Combinada: {self.game_franchise_name}"
+            print(f"Gerando gráfico combinado para {self.game_franchise_name}...")
+            # Passar um nome de arquivo "placeholder" para csv_filename, pois o nome do gráfico combinado é gerado internamente
+            self.create_graph(df=combined_df, output_graph_dir=output_graph_dir, csv_filename="combined_data", combined_plot_title=combined_title)
+        else:
+            print("Nenhum dado para combinar após processar todos os arquivos.")
+
+    @traced(category="analyzer")
     def analyze_media(self):
         if not self.game_franchise_name:
             print("Nome da franquia não definido. Abortando analyze_media.")
             return
 
         # Caminho para os arquivos CSV (ajuste conforme necessário)
-        csv_dir_path = os.path.join("/csv_data", self.game_franchise_name)
+        csv_dir_path = self.csv_dir()
         if not os.path.isdir(csv_dir_path):
             print(f"Diretório CSV não encontrado: {csv_dir_path}")
             return
@@ -86,214 +263,340 @@ class Analyzer(object):
 
         all_dfs_for_combine = [] # Lista para armazenar DataFrames se self.combine for True
 
-        for csv_filename in os.listdir(csv_dir_path):
-            if csv_filename.endswith(".csv"):
-                csv_filepath = os.path.join(csv_dir_path, csv_filename)
-                print(f"Analisando arquivo: {csv_filepath} para a métrica: {self.metric}")
-                try:
-                    df = pd.read_csv(csv_filepath)
-
-                    if "Month" not in df.columns:
-                        print(f"Coluna 'Month' não encontrada em {csv_filename}. Pulando.")
-                        continue
-                    if self.metric not in df.columns: # Corrigido para usar self.metric diretamente
-                        print(f"Coluna da métrica '{self.metric}' não encontrada em {csv_filename}. Pulando.")
-                        continue
-
-                    # Limpeza e conversão da coluna 'Month'
-                    df["Month"] = df["Month"].astype(str)
-                    df = df[~df["Month"].str.contains("Last 30 Days", na=False, case=False)]
-                    df["Month"] = pd.to_datetime(df["Month"].apply(lambda x: x + " 1" if isinstance(x, str) else x),
-                                                 format='%B %Y %d', errors='coerce')
-                    df.dropna(subset=["Month"], inplace=True)
-
-                    if df.empty:
-                        print(f"Nenhum dado de data válido encontrado em {csv_filename} após a conversão. Pulando.")
-                        continue
-
-                    # Limpeza e conversão da coluna da métrica
-                    df[self.metric] = pd.to_numeric(
-                        df[self.metric].astype(str).str.replace(",", "", regex=False),
-                        errors='coerce'
-                    )
-                    # Remove linhas onde a métrica é NaN APÓS a conversão.
-                    # Isso é importante para não tentar plotar NaNs ou ter problemas na combinação.
-                    df.dropna(subset=[self.metric], inplace=True)
-
-
-                    if df.empty or df[self.metric].isnull().all():
-                        print(f"DataFrame vazio ou sem dados válidos para a métrica '{self.metric}' em {csv_filename} após limpeza. Pulando.")
-                        continue
-
-                    df.sort_values("Month", inplace=True)
-
-                    if self.combine:
-                        df['Source'] = os.path.splitext(csv_filename)[0]  # Adiciona nome do arquivo como fonte
-                        # Seleciona apenas as colunas necessárias e faz uma cópia
-                        all_dfs_for_combine.append(df[["Month", self.metric, "Source"]].copy())
-                    else:
-                        # Lógica original para gráficos individuais e filtro por data de lançamento
-                        oldest_date_in_csv = df["Month"].min()
-                        if pd.isna(oldest_date_in_csv):
-                            print(f"Não foi possível determinar a data mais antiga em {csv_filename}. Pulando.")
-                            continue
-
-                        main_release_date_str = None
-                        if self.media_type == "Series" and isinstance(self.release_dates, dict) and "S1" in self.release_dates:
-                            main_release_date_str = self.release_dates["S1"]
-                        elif isinstance(self.release_dates, str):
-                            main_release_date_str = self.release_dates
-                        elif isinstance(self.release_dates, dict) and self.release_dates:
-                            try:
-                                main_release_date_str = next(iter(self.release_dates.values()))
-                            except StopIteration:
-                                pass # main_release_date_str continua None
-
-                        if main_release_date_str:
-                            try:
-                                compare_release_date = pd.to_datetime(main_release_date_str, errors='raise')
-                                if oldest_date_in_csv < compare_release_date:
-                                    print(f"Gerando gráfico para {csv_filename} pois {oldest_date_in_csv.strftime('%Y-%m-%d')} < {compare_release_date.strftime('%Y-%m-%d')}")
-                                    self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
-                                else:
-                                    print(f"Dados em {csv_filename} ({oldest_date_in_csv.strftime('%Y-%m-%d')}) não são anteriores à data de lançamento principal ({compare_release_date.strftime('%Y-%m-%d')}). Nenhum gráfico gerado.")
-                            except ValueError:
-                                print(f"Data de lançamento principal ('{main_release_date_str}') é inválida. Gerando gráfico para {csv_filename} sem filtro de data.")
-                                self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
-                        else:
-                            print(f"Gerando gráfico para {csv_filename} (sem data de lançamento principal para filtro).")
-                            self.create_graph(df=df, output_graph_dir=output_graph_dir, csv_filename=csv_filename)
+        store = self.store if self.store is not None else open_store()
+        # Sem um RenderPool de quem chamou, os gráficos desta mídia usam um pool próprio, esperado no fim
+        owns_renderer = self.renderer is None
+        if owns_renderer:
+            self.renderer = RenderPool()
 
+        try:
+            for csv_filename in self.csv_files():
+                try:
+                    df = self.analyze_file(csv_filename, store, output_graph_dir)
+                    if df is not None:
+                        all_dfs_for_combine.append(df)
                 except Exception as e:
-                    print(f"Erro ao processar o arquivo {csv_filepath}: {e}")
+                    print(f"Erro ao processar o arquivo {os.path.join(csv_dir_path, csv_filename)}: {e}")
                     import traceback
                     traceback.print_exc() # Para depuração mais detalhada
 
-        # Após o loop, se self.combine for True e houver dados, criar o gráfico combinado
-        if self.combine and all_dfs_for_combine:
-            if not all_dfs_for_combine: # Verificação redundante, mas segura
-                print("Modo de combinação ativado, mas nenhum dado foi coletado dos arquivos CSV.")
-                return
-
-            combined_df = pd.concat(all_dfs_for_combine, ignore_index=True)
-
-            if not combined_df.empty:
-                # Ordenar por data geral para o eixo X e depois por fonte para consistência na legenda
-                combined_df.sort_values(by=["Month", "Source"], inplace=True)
-                title_metric_name = 'Média' if self.metric == "Average" else self.metric
-                combined_title = f"{title_metric_name} de Jogadores Mensais Combinada: {self.game_franchise_name}"
-                print(f"Gerando gráfico combinado para {self.game_franchise_name}...")
-                # Passar um nome de arquivo "placeholder" para csv_filename, pois o nome do gráfico combinado é gerado internamente
-                self.create_graph(df=combined_df, output_graph_dir=output_graph_dir, csv_filename="combined_data", combined_plot_title=combined_title)
-            else:
-                print("Nenhum dado para combinar após processar todos os arquivos.")
-        elif self.combine and not all_dfs_for_combine: # Caso self.combine seja True mas nenhum dado foi coletado
-             print("Modo de combinação ativado, mas nenhum dado foi coletado dos arquivos CSV.")
+            # Após o loop, se self.combine for True, criar o gráfico combinado
+            if self.combine:
+                self.analyze_combined(all_dfs_for_combine, output_graph_dir)
+        finally:
+            if owns_renderer:
+                self.renderer.close()
+                self.renderer = None
+
+        info = cache_info()
+        print(f"Cache de séries: {info.hits} acertos, {info.misses} faltas, {info.entries} arquivos ({info.bytes / 1024:.0f} KiB).")
+
+
+def _metric_label(metric):
+    return 'Média' if metric == "Average" else metric
+
 
+@traced(category="plot")
+def render_line_chart(df, graph_filepath, options, key):
+    """
+    Renderiza o gráfico de linhas descrito por options e grava a chave de cache no PNG.
+    Cada métrica de options["metrics"] ocupa um subgráfico, todos com o mesmo eixo X.
+    """
+    # matplotlib, seaborn e scipy são importados só nas funções que os usam, para que
+    # o scraper e os demais comandos não paguem por esses imports.
+    import matplotlib.pyplot as plt
+
+    metrics = options["metrics"]
+    fig, axes = plt.subplots(len(metrics), 1, figsize=options["figsize"], sharex=True, squeeze=False)
+
+    for ax, metric, ylabel in zip(axes[:, 0], metrics, options["ylabels"]):
+        if options["combined"]:
+            # Agrupa por 'Source' e plota cada um
+            for source_name, group in df.groupby('Source', observed=True):
+                # Ordena cada grupo por data e ignora meses sem esta métrica
+                group_sorted = group.sort_values("Month").dropna(subset=[metric])
+                ax.plot(group_sorted["Month"], group_sorted[metric], label=f"{source_name} - {metric}", marker='o', linestyle='-')
+        else:
+            series = df.dropna(subset=[metric])
+            ax.plot(series["Month"], series[metric], label=f"{metric}", marker='o', linestyle='-')
+
+        for label, release_date in options["release_lines"]:
+            ax.axvline(x=release_date, color='r', linestyle='--', label=label)
+
+        ax.set_ylabel(ylabel)
+        ax.legend(loc='upper left', bbox_to_anchor=(1,1)) # Ajusta a posição da legenda
+        ax.grid(True)
+
+    axes[0, 0].set_title(options["title"])
+    axes[-1, 0].set_xlabel("Mês")
+    axes[-1, 0].tick_params(axis='x', labelrotation=45)
+    fig.tight_layout(rect=[0, 0, 0.85, 1]) # Ajusta o layout para caber a legenda fora
+
+    fig.savefig(graph_filepath, metadata={RENDER_KEY: key})
+    plt.close(fig)
+    print(f"Gráfico salvo em: {graph_filepath}")
+
+
+@traced(category="plot")
+def render_boxplot(df_plot, caminho_saida, key):
+    """Renderiza o boxplot antes/depois e grava a chave de cache no PNG."""
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
-def generate_boxplot(antes, depois, nome_arquivo_saida):
     plt.figure(figsize=(12, 8))
     sns.set_theme(style="whitegrid")
+    sns.boxplot(data=df_plot, x='periodo', y='Peak', palette="pastel", width=0.5)
+
+    plt.title('Comparação Mensal do Pico de Jogadores', fontsize=16)
+    plt.ylabel('Pico por mês', fontsize=12)
+    plt.xlabel('Períodos', fontsize=12)
+    plt.tight_layout()
+
+    try:
+        plt.savefig(caminho_saida, metadata={RENDER_KEY: key})
+        print(f"\nGráfico salvo com sucesso como '{caminho_saida}'")
+    except Exception as e:
+        print(f"\nOcorreu um erro ao salvar o gráfico: {e}")
+    finally:
+        plt.close()
+
+
+def generate_boxplot(antes, depois, nome_arquivo_saida, renderer=None):
     antes["periodo"] = "antes"
     depois["periodo"] = "depois"
     df_plot = pd.concat([antes, depois])
 
     if not df_plot.empty:
-        sns.boxplot(data=df_plot, x='periodo', y='Peak', palette="pastel", width=0.5)
-
-        plt.title('Comparação Mensal do Pico de Jogadores', fontsize=16)
-        plt.ylabel('Pico por mês', fontsize=12)
-        plt.xlabel('Períodos', fontsize=12)
-        plt.tight_layout()
-
-        try:
-            plt.savefig(f"{nome_arquivo_saida}_boxplot.png")
-            print(f"\nGráfico salvo com sucesso como '{nome_arquivo_saida}_boxplot.png'")
-        except Exception as e:
-            print(f"\nOcorreu um erro ao salvar o gráfico: {e}")
+        caminho_saida = f"{nome_arquivo_saida}_boxplot.png"
+        df_plot = df_plot[['periodo', 'Peak']].reset_index(drop=True)
+        key = render_key(df_plot, {"plot": "boxplot", "figsize": (12, 8)})
+        if is_up_to_date(caminho_saida, key):
+            print(f"\nGráfico sem alterações, mantendo '{caminho_saida}'")
+        elif renderer is not None:
+            renderer.submit(render_boxplot, df_plot, caminho_saida, key)
+        else:
+            render_boxplot(df_plot, caminho_saida, key)
     else:
         print("\nNenhum dado para plotar.")
 
-def analisar_impacto_lancamento(caminho_csv, mes_lancamento, nome_audiovisual):
+def carregar_picos(caminho_csv, store=None):
     """
-    Analisa o impacto de um lançamento, diagnosticando os dados para escolher
-    automaticamente o teste estatístico mais apropriado (Teste t ou Mann-Whitney U).
-
-    Args:
-        caminho_csv (str): O caminho para o arquivo CSV com os dados de jogadores.
-        mes_lancamento (str): A data de lançamento no formato 'AAAA-MM'.
-        nome_audiovisual (str): O nome do audiovisual para exibição nos resultados.
+    Retorna um DataFrame com a coluna 'Peak' indexado por mês (PeriodIndex, em ordem crescente).
+    Lê do armazenamento colunar quando ele tem uma cópia atualizada do CSV.
     """
+    entry = store.entry_for_path(caminho_csv) if store is not None else None
+    if entry is not None and store.is_fresh(entry):
+        df = store.series(entry, ['Peak'])
+    else:
+        df = load_chart_csv(caminho_csv, ['Peak'])
+    df['Month'] = df['Month'].dt.to_period('M')
+    return df.set_index('Month').sort_index()
 
-    log_file = os.path.splitext(caminho_csv)[0] + nome_audiovisual + ".txt"
-    with open(log_file, 'w', encoding='utf-8') as f:
-        print(f"--- Análise de Impacto: {nome_audiovisual} ---", file=f)
 
-        # ... (O código de carregamento e limpeza dos dados permanece o mesmo)
-        try:
-            df = pd.read_csv(caminho_csv)
-            if 'Peak' in df.columns and is_string_dtype(df['Peak']):
-                df['Peak'] = df['Peak'].str.replace(',', '', regex=False)
-            df['Peak'] = pd.to_numeric(df['Peak'], errors='coerce')
-            df['Month'] = pd.to_datetime(df['Month'], errors='coerce')
-            df = df.dropna(subset=['Month', 'Peak'])
-            df['Month'] = df['Month'].dt.to_period('M')
-            df = df.set_index('Month')
-        except (FileNotFoundError, KeyError) as e:
-            print(f"Erro ao carregar ou processar o CSV: {e}", file=f)
-            return
+def _janela_para_dict(periodo):
+    return {"months": [str(m) for m in periodo.index], "values": periodo['Peak'].tolist(),
+            "dtype": str(periodo['Peak'].dtype)}
 
-        data_lancamento = pd.Period(mes_lancamento, 'M')
-        if data_lancamento not in df.index:
-            print(f"Erro: A data de lançamento '{mes_lancamento}' não foi encontrada nos dados.", file=f)
-            return
 
+def _janela_de_dict(janela):
+    return pd.DataFrame({"Peak": np.array(janela["values"], dtype=janela["dtype"])},
+                        index=pd.PeriodIndex(janela["months"], freq='M', name='Month'))
 
-        print("\n[ Análise de Impacto Imediato ]", file=f)
-        mes_anterior = data_lancamento - 1
-        if mes_anterior in df.index:
-            pico_mes_lancamento = df.loc[data_lancamento]['Peak']
-            pico_mes_anterior = df.loc[mes_anterior]['Peak']
-            variacao_imediata = ((pico_mes_lancamento - pico_mes_anterior) / pico_mes_anterior) * 100
-            print(f"Pico de jogadores no mês anterior ('{mes_anterior}'): {pico_mes_anterior:,.0f}", file=f)
-            print(f"Pico de jogadores no mês do lançamento ('{data_lancamento}'): {pico_mes_lancamento:,.0f}", file=f)
-            print(f"Variação imediata: {variacao_imediata:+.2f}%", file=f)
+
+def calcular_impacto(df, mes_lancamento, janela=6, teste="mannwhitney", n_reamostragens=10000, seed=0, alpha=0.05):
+    """
+    Calcula a análise de impacto de um lançamento sobre a série de picos (carregar_picos).
+
+    Returns:
+        dict: Resultado serializável em JSON com 'status' ('ok', 'mes_ausente' ou
+        'dados_insuficientes'), o impacto imediato, as janelas antes/depois, o p-valor e,
+        no teste 'permutacao', a variação com o intervalo bootstrap.
+    """
+    resultado = {"mes_lancamento": mes_lancamento, "janela": janela, "teste": teste, "alpha": alpha}
+    data_lancamento = pd.Period(mes_lancamento, 'M')
+    if data_lancamento not in df.index:
+        resultado["status"] = "mes_ausente"
+        return resultado
+
+    mes_anterior = data_lancamento - 1
+    resultado["data_lancamento"] = str(data_lancamento)
+    resultado["mes_anterior"] = str(mes_anterior)
+    resultado["imediato"] = None
+    if mes_anterior in df.index:
+        pico_mes_lancamento = df.loc[data_lancamento]['Peak']
+        pico_mes_anterior = df.loc[mes_anterior]['Peak']
+        variacao_imediata = ((pico_mes_lancamento - pico_mes_anterior) / pico_mes_anterior) * 100
+        resultado["imediato"] = {"pico_mes_anterior": float(pico_mes_anterior),
+                                 "pico_mes_lancamento": float(pico_mes_lancamento),
+                                 "variacao_pct": float(variacao_imediata)}
+
+    periodo_antes = df.loc[data_lancamento - janela:data_lancamento - 1]
+    periodo_depois = df.loc[data_lancamento + 1:data_lancamento + janela]
+    if len(periodo_antes) != janela or len(periodo_depois) != janela:
+        resultado["status"] = "dados_insuficientes"
+        return resultado
+
+    resultado["status"] = "ok"
+    resultado["antes"] = _janela_para_dict(periodo_antes)
+    resultado["depois"] = _janela_para_dict(periodo_depois)
+    with span("statistics", "analyzer", test=teste):
+        if teste == "permutacao":
+            from significance import bootstrap_lift, permutation_test
+            p_value = permutation_test(periodo_antes['Peak'], periodo_depois['Peak'], n_reamostragens, seed=seed)["p_value"][0]
+            intervalo = bootstrap_lift(periodo_antes['Peak'], periodo_depois['Peak'], n_reamostragens, seed=seed)
+            resultado["lift_pct"] = float(intervalo["lift_pct"][0])
+            resultado["lift_ci_low"] = float(intervalo["ci_low"][0])
+            resultado["lift_ci_high"] = float(intervalo["ci_high"][0])
         else:
-            print(f"Não foi possível calcular o impacto imediato: mês anterior ('{mes_anterior}') não encontrado.", file=f)
-
-        print("\n[ Análise de Impacto a Longo Prazo (6 meses) ]", file=f)
-        periodo_antes = df.loc[data_lancamento - 1:data_lancamento - 6].copy()
-        periodo_depois = df.loc[data_lancamento + 6:data_lancamento + 1].copy()
-
-        if len(periodo_antes) == 6 and len(periodo_depois) == 6:
-            print("---6 meses antes----", file=f)
-            print(periodo_antes.describe().to_string(), file=f)
-            print("---6 meses depois----", file=f)
-            print(periodo_depois.describe().to_string(), file=f)
-            generate_boxplot(periodo_antes, periodo_depois, os.path.splitext(caminho_csv)[0] + nome_audiovisual + ".png")
-            alpha = 0.05
             # Este teste é mais seguro para dados não normais ou amostras pequenas.
+            from scipy.stats import mannwhitneyu
             stat, p_value = mannwhitneyu(periodo_depois['Peak'], periodo_antes['Peak'], alternative='greater')
+            resultado["u_statistic"] = float(stat)
+    resultado["p_value"] = float(p_value)
+    return resultado
+
+
+def escrever_relatorio(resultado, nome_audiovisual, f):
+    """Escreve o relatório de texto de analisar_impacto_lancamento a partir do resultado estruturado."""
+    print(f"--- Análise de Impacto: {nome_audiovisual} ---", file=f)
+    if resultado["status"] == "erro_leitura":
+        print(f"Erro ao carregar ou processar o CSV: {resultado['erro']}", file=f)
+        return
+    if resultado["status"] == "mes_ausente":
+        print(f"Erro: A data de lançamento '{resultado['mes_lancamento']}' não foi encontrada nos dados.", file=f)
+        return
+
+    print("\n[ Análise de Impacto Imediato ]", file=f)
+    imediato = resultado["imediato"]
+    if imediato is not None:
+        print(f"Pico de jogadores no mês anterior ('{resultado['mes_anterior']}'): {imediato['pico_mes_anterior']:,.0f}", file=f)
+        print(f"Pico de jogadores no mês do lançamento ('{resultado['data_lancamento']}'): {imediato['pico_mes_lancamento']:,.0f}", file=f)
+        print(f"Variação imediata: {imediato['variacao_pct']:+.2f}%", file=f)
+    else:
+        print(f"Não foi possível calcular o impacto imediato: mês anterior ('{resultado['mes_anterior']}') não encontrado.", file=f)
+
+    janela = resultado["janela"]
+    print(f"\n[ Análise de Impacto a Longo Prazo ({janela} meses) ]", file=f)
+    if resultado["status"] == "ok":
+        print(f"---{janela} meses antes----", file=f)
+        print(_janela_de_dict(resultado["antes"]).describe().to_string(), file=f)
+        print(f"---{janela} meses depois----", file=f)
+        print(_janela_de_dict(resultado["depois"]).describe().to_string(), file=f)
+        alpha, p_value = resultado["alpha"], resultado["p_value"]
+        if resultado["teste"] == "permutacao":
+            print(f"Variação da média: {resultado['lift_pct']:+.2f}% "
+                  f"(IC 95% bootstrap: {resultado['lift_ci_low']:+.2f}% a {resultado['lift_ci_high']:+.2f}%)", file=f)
+        print(f"p-valor do teste: {p_value:.4f}", file=f)
+        if p_value < alpha:
+            print(f"Conclusão: Como o p-valor ({p_value:.4f}) é menor que {alpha}, o resultado é ESTATISTICAMENTE SIGNIFICATIVO.", file=f)
+        else:
+            print(f"Conclusão: Como o p-valor ({p_value:.4f}) é maior que {alpha}, não há evidência estatística de um aumento significativo.", file=f)
+    else:
+        print(f"Não foi possível realizar a análise de longo prazo: dados insuficientes para os períodos de {janela} meses.", file=f)
+
+    print("-" * 50, file=f)
 
-            print(f"p-valor do teste: {p_value:.4f}", file=f)
-            if p_value < alpha:
-                print(f"Conclusão: Como o p-valor ({p_value:.4f}) é menor que {alpha}, o resultado é ESTATISTICAMENTE SIGNIFICATIVO.", file=f)
-            else:
-                print(f"Conclusão: Como o p-valor ({p_value:.4f}) é maior que {alpha}, não há evidência estatística de um aumento significativo.", file=f)
 
+def resultado_impacto(caminho_csv, mes_lancamento, store=None, results=None, janela=6, teste="mannwhitney",
+                      n_reamostragens=10000, seed=0, alpha=0.05, force=False):
+    """
+    Resultado de calcular_impacto para o CSV, reaproveitando o ResultsStore quando o arquivo
+    (ou ao menos os meses da janela do evento) e os parâmetros não mudaram.
+
+    Returns:
+        tuple: (resultado, chave do resultado ou None se não foi guardado, True se foi recalculado).
+    """
+    parametros = {"mes_lancamento": mes_lancamento, "janela": janela, "teste": teste, "alpha": alpha}
+    if teste == "permutacao":
+        parametros.update(n_reamostragens=n_reamostragens, seed=seed)
+    chave = params_key(**parametros)
+    data_lancamento = pd.Period(mes_lancamento, 'M')
+    try:
+        if results is not None and not force:
+            resultado, df, chave_dados = results.lookup(caminho_csv, chave, lambda: carregar_picos(caminho_csv, store),
+                                                        (data_lancamento - janela, data_lancamento + janela))
+            if resultado is not None:
+                return resultado, f"{chave}:{chave_dados}", False
         else:
-            print("Não foi possível realizar a análise de longo prazo: dados insuficientes para os períodos de 6 meses.", file=f)
+            df = carregar_picos(caminho_csv, store)
+    except (FileNotFoundError, KeyError) as e:
+        return {"status": "erro_leitura", "erro": str(e)}, None, True
+
+    resultado = calcular_impacto(df, mes_lancamento, janela, teste, n_reamostragens, seed, alpha)
+    if results is None:
+        return resultado, None, True
+    if force:
+        chave_dados = data_key(df, data_lancamento - janela, data_lancamento + janela)
+    results.put(caminho_csv, chave, chave_dados, resultado)
+    return resultado, f"{chave}:{chave_dados}", True
+
+
+@traced(category="analyzer")
+def analisar_impacto_lancamento(caminho_csv, mes_lancamento, nome_audiovisual, store=None, renderer=None,
+                                janela=6, teste="mannwhitney", n_reamostragens=10000, seed=0, results=None,
+                                force=False):
+    """
+    Analisa o impacto de um lançamento, diagnosticando os dados para escolher
+    automaticamente o teste estatístico mais apropriado (Teste t ou Mann-Whitney U).
+
+    Args:
+        caminho_csv (str): O caminho para o arquivo CSV com os dados de jogadores.
+        mes_lancamento (str): A data de lançamento no formato 'AAAA-MM'.
+        nome_audiovisual (str): O nome do audiovisual para exibição nos resultados.
+        store (PlayerStore, opcional): Armazenamento colunar usado no lugar do CSV quando atualizado.
+        renderer (RenderPool, opcional): Pool usado para renderizar o boxplot em outro processo.
+        janela (int): Quantidade de meses antes e depois do lançamento.
+        teste (str): 'mannwhitney' (padrão) ou 'permutacao', que usa o teste de permutação
+            e o intervalo bootstrap da variação de significance.py.
+        n_reamostragens (int): Permutações/reamostragens do teste 'permutacao'.
+        seed (int): Semente das reamostragens, para relatórios reproduzíveis.
+        results (ResultsStore, opcional): Resultados já calculados; só entradas desatualizadas
+            são recalculadas e o .txt só é reescrito quando o resultado muda.
+        force (bool): Recalcula mesmo com um resultado válido no ResultsStore.
+
+    Returns:
+        dict: O resultado estruturado (ver calcular_impacto).
+    """
+    if teste not in ("mannwhitney", "permutacao"):
+        raise ValueError(f"Teste desconhecido: {teste}")
+
+    resultado, chave, recalculado = resultado_impacto(caminho_csv, mes_lancamento, store, results, janela, teste,
+                                                      n_reamostragens, seed, force=force)
+    annotate(outcome="computed" if recalculado else "cached")
+
+    base = os.path.splitext(caminho_csv)[0] + nome_audiovisual
+    log_file = base + ".txt"
+    if chave is None or not results.report_is_current(log_file, chave):
+        with open(log_file, 'w', encoding='utf-8') as f:
+            escrever_relatorio(resultado, nome_audiovisual, f)
+        if chave is not None:
+            results.mark_report(log_file, chave)
+    if resultado["status"] == "ok":
+        # O PNG guarda a própria chave de renderização: só é redesenhado se as janelas mudaram
+        generate_boxplot(_janela_de_dict(resultado["antes"]), _janela_de_dict(resultado["depois"]),
+                         base + ".png", renderer)
+    return resultado
+
+
+def analisar_franquia(franquia, mes_lancamento, nome_audiovisual, csv_folder=CSV_ROOT, janela=6, teste="mannwhitney",
+                      force=False):
+    """
+    Executa analisar_impacto_lancamento para todos os CSVs de uma franquia, reaproveitando
+    os resultados do ResultsStore que continuam válidos.
+    """
+    csv_files_to_process = glob.glob(os.path.join(csv_folder, franquia, "*.csv"))
+    store = open_store()
 
-        print("-" * 50, file=f)
+    with ResultsStore() as results, RenderPool() as renderer:
+        for csv_path in csv_files_to_process:
+            analisar_impacto_lancamento(csv_path, mes_lancamento, nome_audiovisual, store=store, renderer=renderer,
+                                        janela=janela, teste=teste, results=results, force=force)
+        print(f"Resultados de análise: {results.info()}")
 
 
 def main():
-    csv_folder = "csv_data"
-    csv_game_folder = "tomb_raider"
-    csv_files_to_process = glob.glob(os.path.join(csv_folder, csv_game_folder, "*.csv"))
-
-    for csv_path in csv_files_to_process:
-        analisar_impacto_lancamento(csv_path, '2018-03', "_1_temp")
+    analisar_franquia("tomb_raider", '2018-03', "_1_temp")
+    tracer.finish("analise")
 
 
 
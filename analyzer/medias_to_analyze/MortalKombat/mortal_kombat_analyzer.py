@@ -1,5 +1,5 @@
 from analise import Analyzer
-from analise.medias_to_analyze.MortalKombat.mortal_kombat import MortalKombat
+from analyzer.medias_to_analyze.MortalKombat.mortal_kombat import MortalKombat
 
 
 class MortalKombatAnalyzer(MortalKombat):
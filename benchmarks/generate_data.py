@@ -0,0 +1,116 @@
+import argparse
+import csv
+import os
+
+import numpy as np
+import pandas as pd
+
+CSV_HEADER = ["Month", "Peak", "Gain", "% Gain", "Average", "Avg % Gain"]
+LAST_30_DAYS_LABEL = "Last 30 days"
+# O SteamDB só publica a média de jogadores dos meses mais recentes; antes disso a coluna vem "-".
+AVERAGE_MONTHS = 30
+
+
+def _format_int(value):
+    return f"{int(value):,}"
+
+
+def _format_signed(value):
+    return f"{int(value):+,}"
+
+
+def _format_pct(value):
+    return f"{value:+.1f}%"
+
+
+def _game_rows(rng, months, peak_scale):
+    """Gera as linhas de um jogo no formato do SteamDB, do mês mais recente para o mais antigo."""
+    n = len(months)
+    # Passeio aleatório multiplicativo com alguns picos (lançamentos, promoções)
+    steps = rng.normal(0, 0.15, n) + (rng.random(n) < 0.03) * rng.uniform(0.5, 1.5, n)
+    peak = np.maximum(np.round(peak_scale * np.exp(np.cumsum(steps) - steps.sum() / 2)), 1)
+    average = np.maximum(np.round(peak * rng.uniform(0.3, 0.5, n)), 1)
+    gain = np.diff(peak, prepend=peak[0])
+    pct_gain = gain / np.roll(peak, 1) * 100
+    avg_gain = np.diff(average, prepend=average[0])
+    avg_pct_gain = avg_gain / np.roll(average, 1) * 100
+
+    rows = []
+    for i in range(n - 1, -1, -1):
+        has_average = i >= n - AVERAGE_MONTHS
+        rows.append([
+            months[i],
+            _format_int(peak[i]),
+            _format_signed(gain[i]) if i else "-",
+            _format_pct(pct_gain[i]) if i else "-",
+            _format_int(average[i]) if has_average else "-",
+            _format_pct(avg_pct_gain[i]) if has_average and i else "-",
+        ])
+    last = rows[0]
+    rows.insert(0, [LAST_30_DAYS_LABEL] + last[1:])
+    return rows
+
+
+def generate_tree(root, n_games=10, years=5, games_per_franchise=10, end_month="2025-04", seed=0):
+    """
+    Escreve uma árvore csv_data/<franquia>/<jogo>_chart_month_data.csv com o mesmo formato
+    dos arquivos baixados do SteamDB (números entre aspas com separador de milhar, sinais,
+    porcentagens e a linha "Last 30 days").
+
+    Args:
+        root (str): Pasta onde csv_data será criada.
+        n_games (int): Quantidade total de jogos.
+        years (int): Anos de histórico por jogo.
+        games_per_franchise (int): Jogos por pasta de franquia.
+        end_month (str): Mês mais recente ('AAAA-MM').
+        seed (int): Semente do gerador aleatório.
+
+    Returns:
+        dict: Metadados da árvore: franquias, arquivos, linhas e um mês de lançamento
+        no meio do histórico para a análise de impacto.
+    """
+    rng = np.random.default_rng(seed)
+    periods = pd.period_range(end=pd.Period(end_month, "M"), periods=years * 12, freq="M")
+    months = [p.strftime("%B %Y") for p in periods]
+
+    csv_root = os.path.join(root, "csv_data")
+    franchises, files, rows = [], [], 0
+    for game in range(n_games):
+        franchise = f"franchise_{game // games_per_franchise:04d}"
+        franchise_dir = os.path.join(csv_root, franchise)
+        if not franchises or franchises[-1] != franchise:
+            os.makedirs(franchise_dir, exist_ok=True)
+            franchises.append(franchise)
+        csv_path = os.path.join(franchise_dir, f"Game_{game:05d}_chart_month_data.csv")
+        game_rows = _game_rows(rng, months, peak_scale=10 ** rng.uniform(2, 5))
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(game_rows)
+        files.append(csv_path)
+        rows += len(game_rows)
+
+    return {
+        "csv_root": csv_root,
+        "franchises": franchises,
+        "files": files,
+        "rows": rows,
+        "release_month": str(periods[len(periods) // 2]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos no formato do SteamDB.")
+    parser.add_argument("root", help="Pasta de saída (csv_data é criada dentro dela)")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--games-per-franchise", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    info = generate_tree(args.root, args.games, args.years, args.games_per_franchise, seed=args.seed)
+    print(f"{len(info['files'])} arquivos, {info['rows']} linhas em {info['csv_root']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,237 @@
+"""
+Benchmarks das etapas de carga, análise e gráficos sobre dados sintéticos.
+
+Rode a partir da raiz do repositório com ``python benchmarks/run_benchmarks.py`` ou
+``python -m benchmarks.run_benchmarks``.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+
+import matplotlib
+matplotlib.use("Agg")
+
+import pandas as pd
+
+# Executado como script (python benchmarks/run_benchmarks.py), o sys.path tem benchmarks/ e não a raiz do repositório
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analise import Analyzer, analisar_impacto_lancamento, carregar_picos, generate_boxplot
+from benchmarks.generate_data import generate_tree
+from steamdb_csv import clear_cache, clear_month_lookup, load_chart_csv
+
+GRAPH_DIR = "graphs"
+
+
+@contextmanager
+def _working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def _remove_pngs(paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _time_stage(function, repeat, items, setup=None):
+    """Executa function repeat vezes (chamando setup antes de cada uma, fora da medição)."""
+    seconds = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - start)
+    best = min(seconds)
+    return {
+        "seconds": seconds,
+        "min": best,
+        "median": statistics.median(seconds),
+        "items": items,
+        "per_item_ms": best / items * 1000 if items else None,
+    }
+
+
+def _quiet(function):
+    """O analisador informa o progresso com print; durante a medição a saída é descartada."""
+    def wrapped():
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+            function()
+    return wrapped
+
+
+def run_scale(n_games, years, repeat=3, games_per_franchise=10, analyze_franchises=1, plot_limit=20, workdir=None):
+    """
+    Gera uma árvore sintética e mede cada etapa separadamente.
+
+    Etapas:
+        load_cold / load_warm: load_chart_csv em todos os arquivos, sem e com o cache de séries.
+        impact_analysis: analisar_impacto_lancamento em todos os arquivos (boxplots já em dia).
+        analyze_media / analyze_media_combined: Analyzer.analyze_media nas primeiras
+            analyze_franchises franquias, com os gráficos apagados antes de cada repetição.
+        create_graph / generate_boxplot: renderização de até plot_limit gráficos.
+
+    Returns:
+        dict: Parâmetros da escala e, por etapa, tempos (s) e custo por item (ms).
+    """
+    root = tempfile.mkdtemp(prefix="bench_", dir=workdir)
+    try:
+        info = generate_tree(root, n_games, years, games_per_franchise)
+        with _working_dir(root):
+            files = [os.path.relpath(p, root) for p in info["files"]]
+            release_month = info["release_month"]
+            stages = {}
+
+            def load_all():
+                for path in files:
+                    load_chart_csv(path)
+
+            def cold_start():
+                # A frio de verdade: sem séries em cache e sem os rótulos de mês já interpretados
+                clear_cache()
+                clear_month_lookup()
+
+            stages["load_cold"] = _time_stage(load_all, repeat, len(files), setup=cold_start)
+            stages["load_warm"] = _time_stage(load_all, repeat, len(files))
+
+            def impact():
+                for path in files:
+                    analisar_impacto_lancamento(path, release_month, "_bench")
+
+            _quiet(impact)()  # aquecimento: grava os boxplots, que depois ficam em cache
+            stages["impact_analysis"] = _time_stage(_quiet(impact), repeat, len(files))
+
+            analyzed = info["franchises"][:analyze_franchises]
+            analyzed_files = sum(len(glob.glob(os.path.join("csv_data", f, "*.csv"))) for f in analyzed)
+            release_dates = {"Release": release_month}
+
+            def clear_graphs():
+                shutil.rmtree(GRAPH_DIR, ignore_errors=True)
+
+            for combine, stage in ((False, "analyze_media"), (True, "analyze_media_combined")):
+                def analyze(combine=combine):
+                    for franchise in analyzed:
+                        Analyzer(franchise, franchise, "Game", release_dates, combine=combine, metric="Peak").analyze_media()
+                stages[stage] = _time_stage(_quiet(analyze), repeat, analyzed_files, setup=clear_graphs)
+
+            plotted = files[:plot_limit]
+            analyzer = Analyzer("bench", "bench", "Game", release_dates, metric="Peak")
+            frames = [(os.path.basename(p), load_chart_csv(p, ["Peak"])) for p in plotted]
+            os.makedirs(GRAPH_DIR, exist_ok=True)
+
+            def create_graphs():
+                for csv_filename, df in frames:
+                    analyzer.create_graph(df, GRAPH_DIR, csv_filename)
+
+            stages["create_graph"] = _time_stage(
+                _quiet(create_graphs), repeat, len(frames),
+                setup=lambda: _remove_pngs(glob.glob(os.path.join(GRAPH_DIR, "*.png"))))
+
+            month = pd.Period(release_month, "M")
+            windows = []
+            for path in plotted:
+                df = carregar_picos(path)
+                windows.append((df.loc[month - 6:month - 1], df.loc[month + 1:month + 6],
+                                os.path.join(GRAPH_DIR, os.path.splitext(os.path.basename(path))[0])))
+
+            def boxplots():
+                for antes, depois, output in windows:
+                    generate_boxplot(antes.copy(), depois.copy(), output)
+
+            stages["generate_boxplot"] = _time_stage(
+                _quiet(boxplots), repeat, len(windows),
+                setup=lambda: _remove_pngs(glob.glob(os.path.join(GRAPH_DIR, "*_boxplot.png"))))
+
+        return {"games": n_games, "years": years, "files": len(files), "rows": info["rows"], "stages": stages}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def compare(baseline, current, threshold=0.10):
+    """
+    Compara dois resultados (mesmas escalas) e retorna as etapas que ficaram mais lentas
+    que a linha de base por mais de threshold (fração do tempo mínimo).
+    """
+    regressions = []
+    previous = {(r["games"], r["years"]): r["stages"] for r in baseline["runs"]}
+    for run in current["runs"]:
+        base_stages = previous.get((run["games"], run["years"]))
+        if base_stages is None:
+            continue
+        for stage, result in run["stages"].items():
+            if stage not in base_stages:
+                continue
+            before, after = base_stages[stage]["min"], result["min"]
+            if before and (after - before) / before > threshold:
+                regressions.append((run["games"], run["years"], stage, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks das etapas de carga, análise e gráficos. Rode da raiz do "
+                                                 "repositório: python benchmarks/run_benchmarks.py ou "
+                                                 "python -m benchmarks.run_benchmarks.")
+    parser.add_argument("--games", type=int, nargs="+", default=[10, 100],
+                        help="Quantidades de jogos a medir (ex.: 10 100 1000 10000)")
+    parser.add_argument("--years", type=int, nargs="+", default=[5], help="Anos de histórico (ex.: 5 25)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--games-per-franchise", type=int, default=10)
+    parser.add_argument("--analyze-franchises", type=int, default=1,
+                        help="Franquias usadas nas etapas do Analyzer, que geram um gráfico por arquivo")
+    parser.add_argument("--plot-limit", type=int, default=20, help="Gráficos por etapa de renderização")
+    parser.add_argument("--workdir", default=None, help="Pasta para os dados temporários")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "repeat": args.repeat,
+        "runs": [],
+    }
+    for years in args.years:
+        for n_games in args.games:
+            print(f"Medindo {n_games} jogos x {years} anos...")
+            run = run_scale(n_games, years, args.repeat, args.games_per_franchise,
+                            args.analyze_franchises, args.plot_limit, args.workdir)
+            results["runs"].append(run)
+            for stage, result in run["stages"].items():
+                per_item = f"{result['per_item_ms']:9.2f} ms/item" if result["per_item_ms"] is not None else ""
+                print(f"  {stage:<24} {result['min']:9.3f} s  {per_item}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Resultados salvos em: {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, results, args.threshold)
+        for n_games, years, stage, before, after in regressions:
+            print(f"REGRESSÃO {n_games} jogos x {years} anos, {stage}: {before:.3f} s -> {after:.3f} s")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+import pandas as pd
+
+from impacto_lote import eventos_de_lancamento
+from media_catalog import load_catalog
+from player_store import load_store
+
+SHIFT_COLUMNS = ["franchise", "game", "month", "mean_before", "mean_after", "lift_pct",
+                 "u_statistic", "z_score", "direction"]
+
+
+def _remove(window, value):
+    del window[bisect_left(window, value)]
+
+
+def _wins_over(window, value):
+    """Pontos de value contra os elementos de window (1 se maior, 0,5 se empate)."""
+    left = bisect_left(window, value)
+    return left + (bisect_right(window, value) - left) / 2
+
+
+def _losses_to(window, value):
+    """Pontos dos elementos de window contra value (1 se maior, 0,5 se empate)."""
+    right = bisect_right(window, value)
+    return len(window) - right + (right - bisect_left(window, value)) / 2
+
+
+def scan_series(values, window=6):
+    """
+    Trata cada mês de uma série contígua (sem NaN) como candidato a evento e calcula as
+    estatísticas de janela usadas em analisar_impacto_lancamento: médias dos `window` meses
+    antes e depois (sem o próprio mês) e a estatística U de Mann-Whitney (depois > antes).
+
+    As médias vêm de somas acumuladas e o U é atualizado a cada passo removendo e inserindo
+    um valor em cada janela ordenada (bisect), então o custo é O(n log n) em vez de
+    refatiar e reordenar as janelas em cada mês.
+
+    Returns:
+        dict: Arrays 'position' (índice do mês), 'mean_before', 'mean_after' e 'u_statistic'.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    positions = np.arange(window, n - window)
+    if len(positions) == 0:
+        empty = np.empty(0)
+        return {"position": positions, "mean_before": empty, "mean_after": empty, "u_statistic": empty}
+
+    prefix = np.concatenate([[0.0], np.cumsum(values)])
+    mean_before = (prefix[positions] - prefix[positions - window]) / window
+    mean_after = (prefix[positions + window + 1] - prefix[positions + 1]) / window
+
+    items = values.tolist()
+    before = sorted(items[0:window])
+    after = sorted(items[window + 1:2 * window + 1])
+    u = sum(_wins_over(before, a) for a in after)
+    u_statistic = np.empty(len(positions))
+    u_statistic[0] = u
+    for i, t in enumerate(positions[1:], start=1):
+        # Mês t: antes = [t-window, t-1], depois = [t+1, t+window]
+        leaving_before, entering_before = items[t - window - 1], items[t - 1]
+        leaving_after, entering_after = items[t], items[t + window]
+        _remove(before, leaving_before)
+        u -= _losses_to(after, leaving_before)
+        u += _losses_to(after, entering_before)
+        insort(before, entering_before)
+        _remove(after, leaving_after)
+        u -= _wins_over(before, leaving_after)
+        u += _wins_over(before, entering_after)
+        insort(after, entering_after)
+        u_statistic[i] = u
+    return {"position": positions, "mean_before": mean_before, "mean_after": mean_after, "u_statistic": u_statistic}
+
+
+def _suppress_neighbors(order, positions, window, top):
+    """Mantém os melhores candidatos que distam mais de `window` meses de um já escolhido."""
+    chosen = []
+    for index in order:
+        if all(abs(positions[index] - positions[other]) > window for other in chosen):
+            chosen.append(index)
+            if len(chosen) == top:
+                break
+    return chosen
+
+
+def scan_panel(panel, window=6, top=5, min_lift_pct=0.0):
+    """
+    Varre todos os meses de todos os jogos do painel e retorna as maiores mudanças de
+    patamar por franquia.
+
+    Args:
+        panel (pd.DataFrame): Painel mês x jogo (PlayerStore.panel), com colunas (franquia, jogo).
+        window (int): Meses de cada lado do candidato.
+        top (int): Mudanças retornadas por franquia.
+        min_lift_pct (float): Variação percentual mínima (em módulo) para um candidato contar.
+
+    Returns:
+        pd.DataFrame: Colunas de SHIFT_COLUMNS, ordenadas por franquia e |z_score|. Candidatos
+        do mesmo jogo a até `window` meses de uma mudança melhor são descartados.
+    """
+    sigma = np.sqrt(window * window * (2 * window + 1) / 12)
+    mu = window * window / 2
+    candidates = []
+    for (franchise, game) in panel.columns:
+        series = panel[(franchise, game)].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(series)
+        # Cada trecho contíguo sem NaN é varrido separadamente
+        edges = np.flatnonzero(np.diff(np.concatenate([[False], valid, [False]]).astype(np.int8)))
+        for start, end in zip(edges[::2], edges[1::2]):
+            result = scan_series(series[start:end], window)
+            if len(result["position"]) == 0:
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                lift = (result["mean_after"] - result["mean_before"]) / result["mean_before"] * 100
+            candidates.append(pd.DataFrame({
+                "franchise": franchise,
+                "game": game,
+                "position": result["position"] + start,
+                "mean_before": result["mean_before"],
+                "mean_after": result["mean_after"],
+                "lift_pct": lift,
+                "u_statistic": result["u_statistic"],
+                "z_score": (result["u_statistic"] - mu) / sigma,
+            }))
+    if not candidates:
+        return pd.DataFrame(columns=SHIFT_COLUMNS)
+
+    candidates = pd.concat(candidates, ignore_index=True)
+    candidates = candidates[candidates["lift_pct"].abs() >= min_lift_pct]
+    # Mais extremo primeiro; entre U iguais (janelas totalmente separadas), a maior variação
+    candidates = candidates.assign(_z=candidates["z_score"].abs(), _lift=candidates["lift_pct"].abs())
+    candidates = candidates.sort_values(["_z", "_lift"], ascending=False, kind="stable")
+
+    shifts = []
+    for franchise, group in candidates.groupby("franchise", sort=True):
+        positions = group["position"].to_numpy()
+        games = group["game"].to_numpy()
+        chosen = []
+        for game in pd.unique(games):
+            rows = np.flatnonzero(games == game)
+            chosen += _suppress_neighbors(rows, positions, window, top)
+        shifts.append(group.iloc[sorted(chosen)].head(top))
+    shifts = pd.concat(shifts, ignore_index=True)
+    shifts["month"] = [str(panel.index[p]) for p in shifts["position"]]
+    shifts["direction"] = np.where(shifts["lift_pct"] >= 0, "up", "down")
+    return shifts[SHIFT_COLUMNS]
+
+
+def match_events(shifts, eventos, tolerance=1):
+    """
+    Marca as mudanças que coincidem (até `tolerance` meses) com um lançamento conhecido
+    da mesma franquia. eventos segue o formato de impacto_lote.eventos_de_lancamento.
+
+    Returns:
+        pd.DataFrame: shifts com a coluna 'event' (None quando a mudança não tem explicação).
+    """
+    matched = []
+    for shift in shifts.itertuples(index=False):
+        month = pd.Period(shift.month, 'M')
+        event = None
+        for evento in eventos.itertuples(index=False):
+            same_franchise = evento.franchise is None or evento.franchise == shift.franchise
+            if same_franchise and abs((month - pd.Period(evento.month, 'M')).n) <= tolerance:
+                event = evento.event
+                break
+        matched.append(event)
+    return shifts.assign(event=matched)
+
+
+def catalog_events(entries):
+    """Lançamentos de todas as mídias do catálogo, no formato de eventos_de_lancamento."""
+    eventos = [eventos_de_lancamento(entry["release_dates"], entry["game_franchise_name"]) for entry in entries]
+    return pd.concat(eventos, ignore_index=True) if eventos else pd.DataFrame(columns=["event", "month", "franchise"])
+
+
+def main(window=6, top=5, min_lift_pct=0.0, entries=None):
+    store = load_store()
+    shifts = scan_panel(store.panel("Peak"), window=window, top=top, min_lift_pct=min_lift_pct)
+    shifts = match_events(shifts, catalog_events(load_catalog() if entries is None else entries))
+    print(shifts.to_string(index=False))
+    return shifts
+
+
+if __name__ == '__main__':
+    main()
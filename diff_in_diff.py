@@ -0,0 +1,252 @@
+import numpy as np
+import pandas as pd
+
+from impacto_lote import eventos_de_lancamento
+from player_store import load_store
+from tracing import span
+
+# Quantidade máxima de valores (pares x jogos x meses x meses) mantidos por vez no ajuste em lote
+CHUNK_ELEMENTS = 4_000_000
+
+DID_COLUMNS = ["franchise", "game", "event", "event_month", "n_controls", "treated_change_pct",
+               "control_change_pct", "did_log", "did_pct", "std_error", "t_statistic", "p_value", "significant"]
+
+
+def control_columns(panel, eventos, controles=None):
+    """
+    Jogos usados como controle: por padrão, os jogos das franquias do painel sem nenhum
+    evento em eventos (um evento sem franquia vale para todas, e então não sobra controle).
+
+    Args:
+        controles (list[str], opcional): Franquias de controle escolhidas explicitamente.
+
+    Returns:
+        np.ndarray: Posições das colunas de controle no painel.
+    """
+    franchises = panel.columns.get_level_values(0).to_numpy()
+    if controles is not None:
+        return np.flatnonzero(np.isin(franchises, list(controles)))
+    treated = eventos["franchise"] if "franchise" in eventos else pd.Series([None] * len(eventos))
+    if treated.isna().any():
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(~np.isin(franchises, treated.unique()))
+
+
+def fit_did(treated, controls, janela):
+    """
+    Ajusta, para vários pares de uma vez, a regressão de diferença em diferenças com efeitos
+    fixos de jogo e de mês sobre o log do pico:
+
+        log(y_it) = a_i + g_t + tau * (tratado_i * depois_t) + e_it
+
+    Meses ausentes de cada controle têm peso 0. Os efeitos de jogo são eliminados antes da
+    solução (complemento de Schur do bloco diagonal dos jogos, equivalente a tirar a média de
+    cada jogo), então sobra por par um sistema de 2*janela incógnitas (meses 1..T-1 e tau),
+    resolvido em lote para todos os pares com a pseudoinversa (que também cobre meses sem
+    nenhuma observação). O custo cresce linearmente com o número de controles.
+
+    Args:
+        treated (array): Pares x 2*janela, série do jogo tratado (antes e depois do evento).
+        controls (array): Pares x controles x 2*janela, séries dos controles na mesma janela.
+        janela (int): Meses de cada lado do evento.
+
+    Returns:
+        dict: Arrays 'did_log' (tau), 'std_error', 'dof' e 'n_controls', um valor por par.
+    """
+    n_pairs, n_controls, n_periods = controls.shape
+    with np.errstate(divide='ignore', invalid='ignore'):
+        responses = np.log(np.concatenate([treated[:, None, :], controls], axis=1))
+    weights = np.isfinite(responses).astype(np.float64)
+    responses = np.where(weights > 0, responses, 0.0)
+    after = np.arange(n_periods) >= janela
+
+    # Controle conta se tiver ao menos um mês antes e um depois do evento
+    observed = weights[:, 1:, :]
+    useful = observed[:, :, :janela].any(axis=2) & observed[:, :, janela:].any(axis=2)
+
+    did_log = np.full(n_pairs, np.nan)
+    std_error = np.full(n_pairs, np.nan)
+    dof = np.zeros(n_pairs)
+    diagonal = np.arange(n_periods - 1)
+    step = max(1, CHUNK_ELEMENTS // ((n_controls + 1) * n_periods * n_periods))
+    for start in range(0, n_pairs, step):
+        rows = slice(start, min(start + step, n_pairs))
+        w, y = weights[rows], responses[rows]
+        counts = w.sum(axis=2)
+        with np.errstate(divide='ignore'):
+            inverse_counts = np.where(counts > 0, 1 / counts, 0.0)
+        weighted = w * y
+        sums = weighted.sum(axis=2)
+        treated_weights = w[:, 0, :] * after
+
+        # Linhas do bloco jogo x (meses 1..T-1, tau) das equações normais
+        unit_columns = np.concatenate([w[:, :, 1:], np.zeros(w.shape[:2] + (1,))], axis=2)
+        unit_columns[:, 0, -1] = treated_weights.sum(axis=1)
+
+        # Bloco (meses, tau) x (meses, tau) e lado direito, antes de eliminar os jogos
+        gram = np.zeros((len(w), n_periods, n_periods))
+        gram[:, diagonal, diagonal] = w[:, :, 1:].sum(axis=1)
+        gram[:, :-1, -1] = gram[:, -1, :-1] = treated_weights[:, 1:]
+        gram[:, -1, -1] = treated_weights.sum(axis=1)
+        moments = np.concatenate([weighted.sum(axis=1)[:, 1:], (treated_weights * y[:, 0, :]).sum(axis=1)[:, None]],
+                                 axis=1)
+
+        scaled = unit_columns * inverse_counts[:, :, None]
+        reduced = gram - np.einsum('piu,piv->puv', scaled, unit_columns)
+        inverse = np.linalg.pinv(reduced, hermitian=True)
+        theta = (inverse @ (moments - np.einsum('piu,pi->pu', scaled, sums))[:, :, None])[:, :, 0]
+
+        # Efeitos de jogo recuperados a partir de theta para calcular os resíduos
+        unit_effects = (sums - np.einsum('piu,pu->pi', unit_columns, theta)) * inverse_counts
+        fitted = unit_effects[:, :, None] + np.concatenate([np.zeros((len(w), 1)), theta[:, :-1]], axis=1)[:, None, :]
+        fitted[:, 0, :] += theta[:, -1:] * after
+        residuals = (y - fitted) * w
+        rank = (counts > 0).sum(axis=1) + np.linalg.matrix_rank(reduced, hermitian=True)
+        dof[rows] = w.sum(axis=(1, 2)) - rank
+        with np.errstate(divide='ignore', invalid='ignore'):
+            variance = (residuals ** 2).sum(axis=(1, 2)) / dof[rows]
+        did_log[rows] = theta[:, -1]
+        std_error[rows] = np.sqrt(variance * inverse[:, -1, -1])
+    std_error[dof <= 0] = np.nan
+    return {"did_log": did_log, "std_error": std_error, "dof": dof, "n_controls": useful.sum(axis=1)}
+
+
+def _mean_observed(values, axis=-1):
+    """Média dos valores finitos ao longo de axis (NaN quando não há nenhum, sem avisos)."""
+    observed = np.isfinite(values)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(observed, values, 0.0).sum(axis=axis) / observed.sum(axis=axis)
+
+
+def _log_change(series, janela):
+    """Diferença entre as médias do log depois e antes do evento (meses não observados ignorados)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        logs = np.log(series)
+    return _mean_observed(logs[..., janela:]) - _mean_observed(logs[..., :janela])
+
+
+def analisar_diferenca_em_diferencas(panel, eventos, janela=6, alpha=0.05, controles=None,
+                                     alternative="greater", min_controles=1):
+    """
+    Estima o impacto de cada lançamento descontando o movimento dos jogos de controle
+    (franquias sem evento), para que a sazonalidade da Steam (promoções, picos de dezembro)
+    não apareça como impacto da mídia.
+
+    O painel inteiro é alinhado no mesmo eixo mensal e cada par jogo x evento recebe uma
+    regressão de diferença em diferenças sobre os `janela` meses antes e depois do evento
+    (sem o próprio mês), com todos os ajustes resolvidos em lote (fit_did).
+
+    Args:
+        panel (pd.DataFrame): Painel mês x jogo do pico de jogadores (PlayerStore.panel) com
+            os jogos tratados e os de controle.
+        eventos (pd.DataFrame): Colunas 'event', 'month' e 'franchise' (eventos_de_lancamento).
+        janela (int): Meses antes e depois do lançamento.
+        alpha (float): Nível de significância.
+        controles (list[str], opcional): Franquias de controle; padrão são as sem evento.
+        alternative (str): 'greater', 'less' ou 'two-sided', como em significance.permutation_test.
+        min_controles (int): Controles com meses antes e depois exigidos para o par ter estimativa.
+
+    Returns:
+        pd.DataFrame: Colunas de DID_COLUMNS, uma linha por par jogo x evento cujo mês de
+        lançamento está nos dados. did_pct é o impacto em % já descontados os controles.
+    """
+    if alternative not in ("greater", "less", "two-sided"):
+        raise ValueError(f"alternative inválida: {alternative}")
+    if panel.empty or eventos.empty:
+        return pd.DataFrame(columns=DID_COLUMNS)
+
+    values = panel.to_numpy(dtype=np.float64)
+    n_months = values.shape[0]
+    franchises = panel.columns.get_level_values(0).to_numpy()
+    games = panel.columns.get_level_values(1).to_numpy()
+    first_month = panel.index[0]
+    controls = control_columns(panel, eventos, controles)
+
+    pair_game, pair_event = [], []
+    event_positions = np.empty(len(eventos), dtype=np.int64)
+    event_labels = np.array([str(pd.Period(month, 'M')) for month in eventos["month"]], dtype=object)
+    for i, evento in enumerate(eventos.itertuples(index=False)):
+        event_positions[i] = (pd.Period(evento.month, 'M') - first_month).n
+        franchise = getattr(evento, "franchise", None)
+        if franchise is None or pd.isna(franchise):
+            selected = np.arange(len(games))
+        else:
+            selected = np.flatnonzero(franchises == franchise)
+        selected = selected[~np.isin(selected, controls)]
+        pair_game.append(selected)
+        pair_event.append(np.full(len(selected), i))
+    pair_game = np.concatenate(pair_game)
+    pair_event = np.concatenate(pair_event)
+    pair_month = event_positions[pair_event]
+
+    # Mesmo critério de analisar_impacto_em_lote: o mês de lançamento precisa existir nos dados
+    inside = (pair_month >= 0) & (pair_month < n_months)
+    inside[inside] = ~np.isnan(values[pair_month[inside], pair_game[inside]])
+    pair_game, pair_event, pair_month = pair_game[inside], pair_event[inside], pair_month[inside]
+
+    offsets = np.concatenate([np.arange(-janela, 0), np.arange(1, janela + 1)])
+    rows = pair_month[:, None] + offsets[None, :]
+    valid_rows = (rows >= 0) & (rows < n_months)
+    rows = np.clip(rows, 0, n_months - 1)
+    treated = np.where(valid_rows, values[rows, pair_game[:, None]], np.nan)
+    control_values = np.where(valid_rows[:, None, :], values[rows[:, None, :], controls[None, :, None]], np.nan)
+
+    did_log = np.full(len(pair_game), np.nan)
+    std_error = np.full(len(pair_game), np.nan)
+    dof = np.zeros(len(pair_game))
+    n_controls = np.zeros(len(pair_game), dtype=np.int64)
+    # O jogo tratado precisa da janela completa, como no teste de Mann-Whitney
+    complete = (treated > 0).all(axis=1)
+    with span("did_fit", "analyzer", rows=int(complete.sum()), controls=len(controls)):
+        if complete.any() and len(controls):
+            fit = fit_did(treated[complete], control_values[complete], janela)
+            did_log[complete], std_error[complete] = fit["did_log"], fit["std_error"]
+            dof[complete], n_controls[complete] = fit["dof"], fit["n_controls"]
+    unusable = n_controls < max(min_controles, 1)
+    did_log[unusable] = np.nan
+    std_error[unusable] = np.nan
+
+    from scipy.stats import t as student_t
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_statistic = did_log / std_error
+    safe_dof = np.maximum(dof, 1)
+    if alternative == "greater":
+        p_value = student_t.sf(t_statistic, safe_dof)
+    elif alternative == "less":
+        p_value = student_t.cdf(t_statistic, safe_dof)
+    else:
+        p_value = 2 * student_t.sf(np.abs(t_statistic), safe_dof)
+
+    control_change = _mean_observed(_log_change(control_values, janela), axis=1)
+    treated_change = _log_change(treated, janela)
+    treated_change[~complete] = np.nan
+
+    return pd.DataFrame({
+        "franchise": franchises[pair_game],
+        "game": games[pair_game],
+        "event": eventos["event"].to_numpy()[pair_event],
+        "event_month": event_labels[pair_event],
+        "n_controls": n_controls,
+        "treated_change_pct": np.expm1(treated_change) * 100,
+        "control_change_pct": np.expm1(control_change) * 100,
+        "did_log": did_log,
+        "did_pct": np.expm1(did_log) * 100,
+        "std_error": std_error,
+        "t_statistic": t_statistic,
+        "p_value": p_value,
+        "significant": p_value < alpha,
+    }, columns=DID_COLUMNS)
+
+
+def main():
+    store = load_store()
+    eventos = pd.concat([
+        eventos_de_lancamento({"S1": "December, 2019", "S2": "December, 2021"}, "the_witcher"),
+        eventos_de_lancamento({"S1": "April, 2024"}, "fallout"),
+    ], ignore_index=True)
+    resultados = analisar_diferenca_em_diferencas(store.panel("Peak"), eventos)
+    print(resultados.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from player_store import load_store
+from tracing import span
+
+
+def eventos_de_lancamento(release_dates, franchise=None):
+    """
+    Monta a tabela de eventos a partir de release_dates no formato das mídias
+    (dict {"S1": "December, 2019", ...} ou uma única string).
+
+    Returns:
+        pd.DataFrame: Colunas 'event', 'month' (Period mensal) e 'franchise'.
+    """
+    if isinstance(release_dates, str):
+        release_dates = {"Release": release_dates}
+    rows = []
+    for event_name, date_str in (release_dates or {}).items():
+        try:
+            month = pd.to_datetime(date_str, errors='raise').to_period('M')
+        except ValueError:
+            print(f"Data de lançamento '{event_name}' ('{date_str}') é inválida e será ignorada.")
+            continue
+        rows.append({"event": event_name, "month": month, "franchise": franchise})
+    return pd.DataFrame(rows, columns=["event", "month", "franchise"])
+
+
+def analisar_impacto_em_lote(panel, eventos, janela=6, alpha=0.05, teste="mannwhitney", n_reamostragens=10000, seed=0):
+    """
+    Executa a análise de impacto de analisar_impacto_lancamento para todos os pares
+    jogo x evento de uma vez, com operações vetorizadas sobre o painel.
+
+    Args:
+        panel (pd.DataFrame): Painel mês x jogo do pico de jogadores (PlayerStore.panel),
+            com PeriodIndex mensal e colunas (franquia, jogo).
+        eventos (pd.DataFrame): Colunas 'event', 'month' e, opcionalmente, 'franchise'.
+            Eventos sem franquia são aplicados a todos os jogos do painel.
+        janela (int): Quantidade de meses antes e depois do lançamento.
+        alpha (float): Nível de significância do teste.
+        teste (str): 'mannwhitney' (padrão) ou 'permutacao': teste de permutação e intervalo
+            bootstrap da variação de longo prazo (lift_ci_low/lift_ci_high), de significance.py.
+        n_reamostragens (int): Permutações/reamostragens do teste 'permutacao'.
+        seed (int): Semente das reamostragens.
+
+    Returns:
+        pd.DataFrame: Uma linha por par jogo x evento cujo mês de lançamento está nos dados.
+    """
+    columns = ["franchise", "game", "event", "event_month", "peak_prev_month", "peak_event_month",
+               "immediate_change_pct", "mean_before", "mean_after", "long_term_change_pct",
+               "u_statistic", "p_value", "lift_ci_low", "lift_ci_high", "significant"]
+    if panel.empty or eventos.empty:
+        return pd.DataFrame(columns=columns)
+
+    values = panel.to_numpy(dtype=np.float64)
+    n_months = values.shape[0]
+    franchises = panel.columns.get_level_values(0).to_numpy()
+    games = panel.columns.get_level_values(1).to_numpy()
+    first_month = panel.index[0]
+
+    # Expande cada evento para os jogos da sua franquia (ou todos, se não houver franquia).
+    pair_game, pair_event = [], []
+    event_positions = np.empty(len(eventos), dtype=np.int64)
+    event_labels = np.array([str(pd.Period(month, 'M')) for month in eventos["month"]], dtype=object)
+    for i, evento in enumerate(eventos.itertuples(index=False)):
+        event_positions[i] = (pd.Period(evento.month, 'M') - first_month).n
+        franchise = getattr(evento, "franchise", None)
+        if franchise is None or pd.isna(franchise):
+            selected = np.arange(len(games))
+        else:
+            selected = np.flatnonzero(franchises == franchise)
+        pair_game.append(selected)
+        pair_event.append(np.full(len(selected), i))
+    pair_game = np.concatenate(pair_game)
+    pair_event = np.concatenate(pair_event)
+    pair_month = event_positions[pair_event]
+
+    def gather(offsets):
+        rows = pair_month[:, None] + offsets[None, :]
+        inside = (rows >= 0) & (rows < n_months)
+        gathered = values[np.clip(rows, 0, n_months - 1), pair_game[:, None]]
+        return np.where(inside, gathered, np.nan)
+
+    peak_event = gather(np.array([0]))[:, 0]
+    peak_prev = gather(np.array([-1]))[:, 0]
+    before = gather(np.arange(-janela, 0))
+    after = gather(np.arange(1, janela + 1))
+
+    # Mesmo critério do fluxo por arquivo: o mês de lançamento precisa existir nos dados.
+    keep = ~np.isnan(peak_event)
+    pair_game, pair_event = pair_game[keep], pair_event[keep]
+    peak_event, peak_prev = peak_event[keep], peak_prev[keep]
+    before, after = before[keep], after[keep]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        immediate = (peak_event - peak_prev) / peak_prev * 100
+        mean_before = before.mean(axis=1)
+        mean_after = after.mean(axis=1)
+        long_term = (mean_after - mean_before) / mean_before * 100
+
+    complete = ~(np.isnan(before).any(axis=1) | np.isnan(after).any(axis=1))
+    u_statistic = np.full(len(complete), np.nan)
+    p_value = np.full(len(complete), np.nan)
+    lift_ci_low = np.full(len(complete), np.nan)
+    lift_ci_high = np.full(len(complete), np.nan)
+    if teste == "permutacao":
+        from significance import bootstrap_lift, permutation_test
+        with span("statistics", "analyzer", rows=int(complete.sum()), test=teste):
+            if complete.any():
+                p_value[complete] = permutation_test(before[complete], after[complete], n_reamostragens, seed=seed)["p_value"]
+                intervalo = bootstrap_lift(before[complete], after[complete], n_reamostragens, seed=seed)
+                lift_ci_low[complete] = intervalo["ci_low"]
+                lift_ci_high[complete] = intervalo["ci_high"]
+    elif teste == "mannwhitney":
+        from scipy.stats import mannwhitneyu
+        # O scipy escolhe o método (exato ou assintótico) olhando para empates no array inteiro;
+        # separar as linhas com e sem empates reproduz a escolha feita em cada chamada individual.
+        merged = np.sort(np.concatenate([before, after], axis=1), axis=1)
+        has_ties = (np.diff(merged, axis=1) == 0).any(axis=1)
+        with span("statistics", "analyzer", rows=int(complete.sum()), test=teste):
+            for group in (complete & has_ties, complete & ~has_ties):
+                if group.any():
+                    u, p = mannwhitneyu(after[group], before[group], alternative='greater', axis=1)
+                    u_statistic[group] = u
+                    p_value[group] = p
+    else:
+        raise ValueError(f"Teste desconhecido: {teste}")
+    mean_before[~complete] = np.nan
+    mean_after[~complete] = np.nan
+    long_term[~complete] = np.nan
+
+    return pd.DataFrame({
+        "franchise": franchises[pair_game],
+        "game": games[pair_game],
+        "event": eventos["event"].to_numpy()[pair_event],
+        "event_month": event_labels[pair_event],
+        "peak_prev_month": peak_prev,
+        "peak_event_month": peak_event,
+        "immediate_change_pct": immediate,
+        "mean_before": mean_before,
+        "mean_after": mean_after,
+        "long_term_change_pct": long_term,
+        "u_statistic": u_statistic,
+        "p_value": p_value,
+        "lift_ci_low": lift_ci_low,
+        "lift_ci_high": lift_ci_high,
+        "significant": p_value < alpha,
+    }, columns=columns)
+
+
+def main():
+    store = load_store()
+    panel = store.panel("Peak", franchise="tomb_raider")
+    eventos = eventos_de_lancamento({"Release": "2018-03"}, franchise="tomb_raider")
+    resultados = analisar_impacto_em_lote(panel, eventos)
+    print(resultados.to_string())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,138 @@
-import sys
+import argparse
+import os
 
-from analyzer.medias_to_analyze.Fallout.fallout_analyzer import analyze_fallout
-from analyzer.medias_to_analyze.MortalKombat.mortal_kombat_analyzer import analyze_mortal_kombat
-from analyzer.medias_to_analyze.TheWitcher.the_witcher_analyzer import analyze_the_witcher
-from scraper.execute_scraper import execute_scraper
-from scraper.games_to_scraper.games import franchises, games
+# Cada comando importa apenas os módulos de que precisa, para que o scraper não carregue pandas/matplotlib.
+CATALOG_FILE = os.path.join("analyzer", "medias_to_analyze", "catalog.json")
 
 
-def main():
-    execute_scraper()
+def scrape(args):
+    from scraper.execute_scraper import execute_scraper
+
+    execute_scraper(incremental=args.incremental, workers=args.workers, http_mode=args.http,
+                    fresh=args.fresh, retry_failed=args.retry_failed, lean=args.lean,
+                    headless=False if args.visible else "auto", profile_dir=args.profile_dir)
+
+
+def analyze(args):
+    from analise import analisar_franquia
+    from tracing import tracer
+
+    analisar_franquia(args.franchise, args.month, args.suffix, janela=args.window, teste=args.test, force=args.force)
+    tracer.finish("analyze")
+
+
+def plot(args):
+    from media_catalog import OUTPUT_GRAPH_DIR, load_catalog, run_catalog
+    from tracing import tracer
+
+    entries = load_catalog(args.catalog)
+    if args.medias:
+        known = {entry["media_name"] for entry in entries}
+        unknown = [media for media in args.medias if media not in known]
+        if unknown:
+            raise SystemExit(f"Mídia não encontrada no catálogo: {', '.join(unknown)}")
+        entries = [entry for entry in entries if entry["media_name"] in args.medias]
+
+    impacto = run_catalog(entries, max_workers=args.workers)
+    if not impacto.empty:
+        output_path = os.path.join(OUTPUT_GRAPH_DIR, "impacto_catalogo.csv")
+        impacto.to_csv(output_path, index=False)
+        print(f"\nImpacto dos lançamentos salvo em: {output_path}")
+    tracer.finish("plot")
+
+
+def scan(args):
+    from change_points import main as scan_change_points
+    from media_catalog import load_catalog
+
+    shifts = scan_change_points(args.window, args.top, args.min_lift, load_catalog(args.catalog))
+    if args.output:
+        shifts.to_csv(args.output, index=False)
+        print(f"\nMudanças de patamar salvas em: {args.output}")
+
+
+def did(args):
+    from change_points import catalog_events
+    from diff_in_diff import analisar_diferenca_em_diferencas
+    from media_catalog import OUTPUT_GRAPH_DIR, load_catalog
+    from player_store import load_store
+    from tracing import tracer
+
+    store = load_store()
+    eventos = catalog_events(load_catalog(args.catalog))
+    resultados = analisar_diferenca_em_diferencas(store.panel("Peak"), eventos, janela=args.window,
+                                                  controles=args.controls or None)
+    print(resultados.to_string(index=False))
+    output_path = args.output or os.path.join(OUTPUT_GRAPH_DIR, "diferenca_em_diferencas.csv")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    resultados.to_csv(output_path, index=False)
+    print(f"\nDiferença em diferenças salva em: {output_path}")
+    tracer.finish("did")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Coleta e análise de jogadores do SteamDB.")
+    commands = parser.add_subparsers(dest="command")
+
+    scrape_parser = commands.add_parser("scrape", help="Baixa as tabelas mensais do SteamDB (padrão)")
+    scrape_parser.add_argument("--incremental", action="store_true", help="Baixa apenas os meses novos")
+    scrape_parser.add_argument("--workers", type=int, default=1, help="Navegadores em paralelo")
+    scrape_parser.add_argument("--http", action="store_true", help="Busca as tabelas por HTTP após o login")
+    scrape_parser.add_argument("--fresh", action="store_true",
+                               help="Ignora o diário e recomeça do zero em vez de retomar a execução anterior")
+    scrape_parser.add_argument("--retry-failed", action="store_true",
+                               help="Devolve à fila as tarefas que esgotaram as tentativas")
+    scrape_parser.add_argument("--lean", action="store_true",
+                               help="Navegador enxuto: headless com sessão salva, sem imagens/fontes/anúncios")
+    scrape_parser.add_argument("--visible", action="store_true", help="Com --lean, mantém o navegador visível")
+    scrape_parser.add_argument("--profile-dir",
+                               help="Perfil persistente do Chrome (user-data-dir) reaproveitado entre execuções; "
+                                    "com --workers, uma subpasta por sessão")
+    scrape_parser.set_defaults(func=scrape)
+
+    analyze_parser = commands.add_parser("analyze", help="Análise de impacto de um lançamento em uma franquia")
+    analyze_parser.add_argument("--franchise", default="tomb_raider")
+    analyze_parser.add_argument("--month", default="2018-03", help="Mês do lançamento (AAAA-MM)")
+    analyze_parser.add_argument("--suffix", default="_1_temp", help="Sufixo dos relatórios gerados")
+    analyze_parser.add_argument("--window", type=int, default=6, help="Meses antes e depois do lançamento")
+    analyze_parser.add_argument("--test", choices=["mannwhitney", "permutacao"], default="mannwhitney",
+                                help="Teste de significância (permutacao inclui o intervalo bootstrap)")
+    analyze_parser.add_argument("--force", action="store_true",
+                                help="Recalcula mesmo os resultados ainda válidos no armazenamento de resultados")
+    analyze_parser.set_defaults(func=analyze)
+
+    plot_parser = commands.add_parser("plot", help="Gráficos e impacto das mídias do catálogo, por franquia")
+    plot_parser.add_argument("medias", nargs="*", metavar="media",
+                             help="media_name das mídias a avaliar; padrão é todo o catálogo")
+    plot_parser.add_argument("--catalog", default=CATALOG_FILE, help="Arquivo JSON do catálogo de mídias")
+    plot_parser.add_argument("--workers", type=int, default=1,
+                             help="Processos para os gráficos (um arquivo por tarefa)")
+    plot_parser.set_defaults(func=plot)
+
+    scan_parser = commands.add_parser("scan", help="Busca mudanças de patamar em todos os meses de todos os jogos")
+    scan_parser.add_argument("--window", type=int, default=6, help="Meses de cada lado do mês candidato")
+    scan_parser.add_argument("--top", type=int, default=5, help="Mudanças listadas por franquia")
+    scan_parser.add_argument("--min-lift", type=float, default=0.0, help="Variação percentual mínima (em módulo)")
+    scan_parser.add_argument("--catalog", default=CATALOG_FILE, help="Catálogo com os lançamentos conhecidos")
+    scan_parser.add_argument("--output", help="CSV de saída (opcional)")
+    scan_parser.set_defaults(func=scan)
+
+    did_parser = commands.add_parser("did", help="Impacto dos lançamentos do catálogo descontando franquias de controle")
+    did_parser.add_argument("--window", type=int, default=6, help="Meses antes e depois do lançamento")
+    did_parser.add_argument("--controls", nargs="*", metavar="franchise",
+                            help="Franquias de controle; padrão são as sem lançamento no catálogo")
+    did_parser.add_argument("--catalog", default=CATALOG_FILE, help="Catálogo com os lançamentos")
+    did_parser.add_argument("--output", help="CSV de saída (padrão graphs/diferenca_em_diferencas.csv)")
+    did_parser.set_defaults(func=did)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(["scrape"])
+    args.func(args)
 
 
 if __name__ == "__main__":
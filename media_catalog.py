@@ -0,0 +1,171 @@
+import json
+import os
+import traceback
+from collections import OrderedDict
+
+import pandas as pd
+
+from analise import Analyzer
+from impacto_lote import analisar_impacto_em_lote, eventos_de_lancamento
+from parallel_runner import run_parallel
+from player_store import STORE_DIR, open_store
+from render_cache import RenderPool
+
+CATALOG_FILE = os.path.join("analyzer", "medias_to_analyze", "catalog.json")
+OUTPUT_GRAPH_DIR = "graphs"
+REQUIRED_FIELDS = ("media_name", "media_type", "game_franchise_name", "release_dates")
+DEFAULTS = {"metric": "Average", "combine": False}
+
+
+def load_catalog(path=CATALOG_FILE):
+    """
+    Lê o catálogo de mídias.
+
+    O arquivo é um JSON {"medias": [...]} em que cada mídia tem media_name, media_type,
+    game_franchise_name, release_dates (dict ou string) e, opcionalmente, metric
+    (uma métrica ou lista) e combine.
+
+    Returns:
+        list[dict]: Mídias com os valores padrão preenchidos.
+
+    Raises:
+        ValueError: Se faltar um campo obrigatório ou houver media_name repetido.
+    """
+    with open(path, encoding="utf-8") as f:
+        medias = json.load(f)["medias"]
+    entries, names = [], set()
+    for position, media in enumerate(medias):
+        missing = [field for field in REQUIRED_FIELDS if field not in media]
+        if missing:
+            raise ValueError(f"Mídia {position} do catálogo sem os campos: {', '.join(missing)}")
+        if media["media_name"] in names:
+            raise ValueError(f"Mídia '{media['media_name']}' repetida no catálogo.")
+        names.add(media["media_name"])
+        entries.append({**DEFAULTS, **media})
+    return entries
+
+
+def group_by_franchise(entries):
+    """Agrupa as mídias por game_franchise_name, mantendo a ordem do catálogo."""
+    groups = OrderedDict()
+    for entry in entries:
+        groups.setdefault(entry["game_franchise_name"], []).append(entry)
+    return groups
+
+
+def analyzer_for(entry, renderer=None):
+    return Analyzer(
+        media_name=entry["media_name"],
+        game_franchise_name=entry["game_franchise_name"],
+        media_type=entry["media_type"],
+        release_dates=entry["release_dates"],
+        combine=entry["combine"],
+        metric=entry["metric"],
+        renderer=renderer,
+    )
+
+
+def _peak_panel(franchise, frames):
+    """Painel mês x jogo do Peak no formato de PlayerStore.panel, a partir dos frames já lidos."""
+    series = {}
+    for csv_filename, df in frames.items():
+        if "Peak" in df.columns:
+            peaks = df.dropna(subset=["Peak"])
+            series[(franchise, os.path.splitext(csv_filename)[0])] = pd.Series(
+                peaks["Peak"].to_numpy(), index=peaks["Month"].dt.to_period("M"))
+    if not series:
+        return pd.DataFrame()
+    panel = pd.DataFrame(series).sort_index()
+    return panel.reindex(pd.period_range(panel.index.min(), panel.index.max(), freq="M"))
+
+
+def franchise_impact(franchise, analyzers, frames):
+    """Impacto dos lançamentos de todas as mídias da franquia sobre o painel de Peak dos frames."""
+    panel = _peak_panel(franchise, frames)
+    results = []
+    for analyzer in analyzers:
+        impacto = analisar_impacto_em_lote(panel, eventos_de_lancamento(analyzer.release_dates, franchise))
+        impacto.insert(0, "media", analyzer.media_name)
+        results.append(impacto)
+    return pd.concat(results, ignore_index=True)
+
+
+def run_franchise(franchise, entries, store=None, output_graph_dir=OUTPUT_GRAPH_DIR, renderer=None):
+    """
+    Lê os CSVs da franquia uma única vez (com a união das métricas das mídias) e avalia
+    todas as mídias do grupo: gráficos de cada mídia e análise de impacto dos lançamentos.
+    Com um RenderPool, os gráficos são renderizados em outros processos enquanto a
+    franquia segue para o cálculo do impacto.
+
+    Returns:
+        pd.DataFrame: Resultado de analisar_impacto_em_lote para os lançamentos de todas as
+        mídias, com a coluna 'media' identificando a mídia de cada evento.
+    """
+    analyzers = [analyzer_for(entry, renderer) for entry in entries]
+    metrics = ["Peak"]
+    for analyzer in analyzers:
+        metrics += [m for m in analyzer.metrics if m not in metrics]
+
+    loader = Analyzer(franchise, franchise, None, None, metric=metrics)
+    if not os.path.isdir(loader.csv_dir()):
+        print(f"Diretório CSV não encontrado: {loader.csv_dir()}")
+        return pd.DataFrame()
+    print(f"\nFranquia '{franchise}': {len(entries)} mídias, métricas {', '.join(metrics)}")
+    frames = loader.load_frames(store)
+
+    for analyzer in analyzers:
+        print(f"Avaliando mídia '{analyzer.media_name}'...")
+        analyzer.analyze_frames(frames, output_graph_dir)
+    return franchise_impact(franchise, analyzers, frames)
+
+
+def run_catalog(entries=None, store=None, max_workers=1, output_graph_dir=OUTPUT_GRAPH_DIR, store_dir=STORE_DIR):
+    """
+    Avalia as mídias do catálogo agrupadas por franquia: o custo cresce com o número de
+    franquias, não de mídias. Com max_workers > 1 os gráficos são gerados por
+    parallel_runner.run_parallel (uma tarefa por arquivo, inclusive nas mídias combinadas)
+    e o impacto de cada franquia é calculado depois, no processo principal. Sem trabalhadores,
+    os gráficos vão para um único RenderPool, esperado antes do retorno.
+
+    Returns:
+        pd.DataFrame: Impacto de todos os lançamentos do catálogo (ver run_franchise).
+    """
+    entries = load_catalog() if entries is None else entries
+    groups = group_by_franchise(entries)
+    results = []
+    if max_workers > 1:
+        analyzers = OrderedDict((franchise, [analyzer_for(entry) for entry in group])
+                                for franchise, group in groups.items())
+        run_parallel([analyzer for group in analyzers.values() for analyzer in group],
+                     max_workers=max_workers, store_dir=store_dir, output_graph_dir=output_graph_dir)
+        store = store if store is not None else open_store(store_dir)
+        for franchise, group in analyzers.items():
+            loader = Analyzer(franchise, franchise, None, None, metric="Peak")
+            if not os.path.isdir(loader.csv_dir()):
+                continue
+            try:
+                results.append(franchise_impact(franchise, group, loader.load_frames(store)))
+            except Exception:
+                print(f"Erro na franquia '{franchise}':\n{traceback.format_exc()}")
+    else:
+        store = store if store is not None else open_store(store_dir)
+        with RenderPool() as renderer:
+            for franchise, group in groups.items():
+                try:
+                    results.append(run_franchise(franchise, group, store, output_graph_dir, renderer))
+                except Exception:
+                    print(f"Erro na franquia '{franchise}':\n{traceback.format_exc()}")
+    results = [r for r in results if not r.empty]
+    return pd.concat(results, ignore_index=True) if results else pd.DataFrame()
+
+
+def main():
+    impacto = run_catalog()
+    if not impacto.empty:
+        output_path = os.path.join(OUTPUT_GRAPH_DIR, "impacto_catalogo.csv")
+        impacto.to_csv(output_path, index=False)
+        print(f"\nImpacto dos lançamentos salvo em: {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import os
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from analise import Analyzer
+from player_store import STORE_DIR, load_store, open_store
+from render_cache import RenderPool
+from tracing import call_traced, traced_result, tracer
+
+OUTPUT_GRAPH_DIR = "graphs"
+
+# Resultado de uma tarefa: csv_filename é None para o gráfico combinado; error é None em caso de sucesso.
+TaskResult = namedtuple("TaskResult", ["media_name", "csv_filename", "error"])
+
+_worker_store = None
+
+
+def _init_worker(store_dir):
+    """Prepara o processo trabalhador: backend sem interface gráfica e armazenamento em memory-map."""
+    global _worker_store
+    tracer.reset_worker()
+    import matplotlib.pyplot as plt
+    plt.switch_backend("Agg")
+    _worker_store = open_store(store_dir)
+
+
+def _analyzer_params(analyzer):
+    # Apenas parâmetros simples atravessam o processo; os dados vêm do armazenamento mapeado.
+    return {
+        "media_name": analyzer.media_name,
+        "game_franchise_name": analyzer.game_franchise_name,
+        "media_type": analyzer.media_type,
+        "release_dates": analyzer.release_dates,
+        "combine": analyzer.combine,
+        "metric": analyzer.metrics,
+    }
+
+
+def _run_file(params, csv_filename, output_graph_dir):
+    # No modo combinado nada é plotado aqui: o DataFrame (Month, métricas, Source) volta para o processo principal.
+    analyzer = Analyzer(**params)
+    return analyzer.analyze_file(csv_filename, _worker_store, output_graph_dir)
+
+
+def run_parallel(analyzers, max_workers=None, store_dir=STORE_DIR, output_graph_dir=OUTPUT_GRAPH_DIR):
+    """
+    Executa a análise de várias mídias em um ProcessPoolExecutor, com uma tarefa por arquivo.
+    Mídias individuais geram o gráfico de cada arquivo no trabalhador; nas mídias combinadas
+    cada trabalhador lê e limpa um arquivo e o processo principal junta os DataFrames e gera
+    o gráfico combinado. Os trabalhadores leem os dados do armazenamento colunar (memory-map),
+    então só os DataFrames já limpos das mídias combinadas atravessam os processos.
+
+    Args:
+        analyzers (list[Analyzer]): Analisadores já configurados.
+        max_workers (int, opcional): Número de processos; padrão é os.cpu_count().
+        store_dir (str): Pasta do armazenamento colunar (criado ou recriado se estiver desatualizado).
+        output_graph_dir (str): Pasta dos gráficos.
+
+    Returns:
+        list[TaskResult]: Resultados na ordem das mídias e, dentro delas, dos arquivos; o
+        gráfico combinado vem depois dos arquivos da mídia, com csv_filename None.
+    """
+    load_store(store_dir=store_dir)
+    os.makedirs(output_graph_dir, exist_ok=True)
+
+    tasks = []
+    for analyzer in analyzers:
+        if not os.path.isdir(analyzer.csv_dir()):
+            print(f"Diretório CSV não encontrado: {analyzer.csv_dir()}")
+            continue
+        params = _analyzer_params(analyzer)
+        for csv_filename in analyzer.csv_files():
+            tasks.append((analyzer, csv_filename, (params, csv_filename, output_graph_dir)))
+
+    results = []
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(store_dir,)) as pool:
+        futures = [pool.submit(call_traced, _run_file, *args) for _, _, args in tasks]
+        # Coleta na ordem de submissão para que a saída seja determinística.
+        combined_frames = {}
+        for (analyzer, csv_filename, _), future in zip(tasks, futures):
+            try:
+                # Os spans do trabalhador (leitura, limpeza, plot) entram no tracer deste processo
+                df = traced_result(future)
+                if analyzer.combine and df is not None:
+                    combined_frames.setdefault(id(analyzer), []).append(df)
+                results.append(TaskResult(analyzer.media_name, csv_filename, None))
+            except Exception:
+                results.append(TaskResult(analyzer.media_name, csv_filename, traceback.format_exc()))
+
+    # Os gráficos combinados vão para um RenderPool enquanto o processo principal junta as próximas mídias
+    combined = [analyzer for analyzer in analyzers if analyzer.combine and os.path.isdir(analyzer.csv_dir())]
+    combined_errors, owners = {}, {}
+    with RenderPool() as renderer:
+        for analyzer in combined:
+            submitted = len(renderer.pending)
+            try:
+                Analyzer(**_analyzer_params(analyzer), renderer=renderer).analyze_combined(
+                    combined_frames.get(id(analyzer), []), output_graph_dir)
+            except Exception:
+                combined_errors[id(analyzer)] = traceback.format_exc()
+            owners.update((output_path, id(analyzer)) for output_path, _ in renderer.pending[submitted:])
+        for output_path, error in renderer.wait():
+            combined_errors.setdefault(owners[output_path], error)
+    for analyzer in combined:
+        results.append(TaskResult(analyzer.media_name, None, combined_errors.get(id(analyzer))))
+
+    failures = [r for r in results if r.error]
+    print(f"Análise paralela concluída: {len(tasks)} arquivos, {len(failures)} erros.")
+    for failure in failures:
+        print(f"Erro em {failure.media_name} ({failure.csv_filename or 'combinado'}):\n{failure.error}")
+    return results
+
+
+def main():
+    from analyzer.medias_to_analyze.Fallout.fallout_analyzer import FalloutAnalyzer
+    from analyzer.medias_to_analyze.MortalKombat.mortal_kombat_analyzer import MortalKombatAnalyzer
+    from analyzer.medias_to_analyze.TheWitcher.the_witcher_analyzer import TheWitcherAnalyzer
+
+    run_parallel([
+        FalloutAnalyzer().analyzer,
+        TheWitcherAnalyzer().analyzer,
+        MortalKombatAnalyzer().analyzer,
+    ])
+
+
+if __name__ == '__main__':
+    main()
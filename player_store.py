@@ -0,0 +1,242 @@
+import glob
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from steamdb_csv import load_chart_csv
+
+CSV_ROOT = "csv_data"
+STORE_DIR = "player_store"
+CSV_SUFFIX = "_chart_month_data.csv"
+INDEX_FILE = "index.json"
+
+# Coluna do CSV -> (arquivo .npy, dtype). Os meses ficam como inteiros (meses desde 1970-01).
+COLUMNS = {
+    "Peak": ("peak", np.int32),
+    "Gain": ("gain", np.float32),
+    "% Gain": ("pct_gain", np.float32),
+    "Average": ("average", np.float32),
+    "Avg % Gain": ("avg_pct_gain", np.float32),
+}
+MONTHS_FILE = "months"
+
+
+def _month_codes(months):
+    """Converte uma série datetime64 em meses desde 1970-01 (int32)."""
+    return (months.dt.year.to_numpy() * 12 + months.dt.month.to_numpy() - 1 - 1970 * 12).astype(np.int32)
+
+
+def _codes_to_datetime(codes):
+    return pd.to_datetime(np.asarray(codes, dtype="int64").astype("datetime64[M]"))
+
+
+def _read_chart_csv(csv_path):
+    """Lê um CSV do SteamDB e devolve as colunas tipadas, sem a linha 'Last 30 days'."""
+    try:
+        df = load_chart_csv(csv_path, list(COLUMNS))
+    except KeyError:
+        return None
+    if "Peak" not in df.columns:
+        return None
+    for column in COLUMNS:
+        if column not in df.columns:
+            df[column] = np.float32(np.nan)
+    return df
+
+
+class StaleStoreError(Exception):
+    """O armazenamento não reflete mais os CSVs (arquivos reescritos, removidos ou novos); rode ingest() de novo."""
+
+
+def ingest(csv_root=CSV_ROOT, store_dir=STORE_DIR):
+    """
+    Converte todos os arquivos csv_data/<franquia>/*_chart_month_data.csv em um único
+    conjunto colunar (um .npy por coluna), ordenado por franquia, jogo e mês.
+
+    Args:
+        csv_root (str): Pasta raiz com uma subpasta por franquia.
+        store_dir (str): Pasta de saída do armazenamento.
+
+    Returns:
+        PlayerStore: O armazenamento recém-criado, aberto em modo memory-map.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    entries = []
+    month_chunks = []
+    column_chunks = {column: [] for column in COLUMNS}
+    start = 0
+
+    for franchise in sorted(os.listdir(csv_root)):
+        franchise_dir = os.path.join(csv_root, franchise)
+        if not os.path.isdir(franchise_dir):
+            continue
+        for csv_filename in sorted(os.listdir(franchise_dir)):
+            if not csv_filename.endswith(".csv"):
+                continue
+            csv_path = os.path.join(franchise_dir, csv_filename)
+            try:
+                df = _read_chart_csv(csv_path)
+            except Exception as e:
+                print(f"Erro ao ler {csv_path}: {e}. Pulando.")
+                continue
+            if df is None or df.empty:
+                print(f"Nenhum dado válido em {csv_path}. Pulando.")
+                continue
+
+            stat = os.stat(csv_path)
+            entries.append({
+                "franchise": franchise,
+                "game": os.path.splitext(csv_filename)[0],
+                "file": os.path.relpath(csv_path, csv_root),
+                "start": start,
+                "length": len(df),
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+            })
+            start += len(df)
+            month_chunks.append(_month_codes(df["Month"]))
+            for column, (_, dtype) in COLUMNS.items():
+                column_chunks[column].append(df[column].to_numpy(dtype=dtype))
+
+    np.save(os.path.join(store_dir, MONTHS_FILE + ".npy"),
+            np.concatenate(month_chunks) if month_chunks else np.empty(0, dtype=np.int32))
+    for column, (file_name, dtype) in COLUMNS.items():
+        chunks = column_chunks[column]
+        np.save(os.path.join(store_dir, file_name + ".npy"),
+                np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype))
+
+    index = {"csv_root": os.path.abspath(csv_root), "games": entries}
+    with open(os.path.join(store_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    print(f"Armazenamento criado em '{store_dir}': {len(entries)} jogos, {start} meses.")
+    return PlayerStore(store_dir)
+
+
+def open_store(store_dir=STORE_DIR):
+    """Abre o armazenamento se ele existir; caso contrário retorna None."""
+    if not os.path.isfile(os.path.join(store_dir, INDEX_FILE)):
+        return None
+    return PlayerStore(store_dir)
+
+
+def load_store(csv_root=CSV_ROOT, store_dir=STORE_DIR):
+    """
+    Abre o armazenamento e o recria com ingest() se ele ainda não existe ou se algum CSV
+    mudou, foi removido ou foi adicionado desde a última ingestão (PlayerStore.stale_files).
+    """
+    store = open_store(store_dir)
+    if store is None:
+        return ingest(csv_root, store_dir)
+    stale = store.stale_files()
+    if stale:
+        print(f"{len(stale)} CSVs mudaram desde a última ingestão; recriando o armazenamento...")
+        return ingest(store.csv_root, store_dir)
+    return store
+
+
+class PlayerStore(object):
+    """
+    Acesso somente leitura ao armazenamento colunar gerado por ingest().
+    As colunas são abertas com memory-map, então abrir o armazenamento é quase instantâneo.
+    """
+
+    def __init__(self, store_dir=STORE_DIR):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, INDEX_FILE), encoding="utf-8") as f:
+            index = json.load(f)
+        self.csv_root = index["csv_root"]
+        self.entries = index["games"]
+        self.months = np.load(os.path.join(store_dir, MONTHS_FILE + ".npy"), mmap_mode="r")
+        self.columns = {
+            column: np.load(os.path.join(store_dir, file_name + ".npy"), mmap_mode="r")
+            for column, (file_name, _) in COLUMNS.items()
+        }
+        self._by_key = {(e["franchise"], e["game"]): e for e in self.entries}
+        self._by_path = {os.path.join(self.csv_root, e["file"]): e for e in self.entries}
+
+    def franchises(self):
+        return sorted({e["franchise"] for e in self.entries})
+
+    def games(self, franchise):
+        return [e for e in self.entries if e["franchise"] == franchise]
+
+    def entry(self, franchise, game):
+        return self._by_key.get((franchise, game))
+
+    def entry_for_path(self, csv_path):
+        return self._by_path.get(os.path.abspath(csv_path))
+
+    def csv_path(self, entry):
+        return os.path.join(self.csv_root, entry["file"])
+
+    def is_fresh(self, entry):
+        """Verifica se o CSV de origem não foi reescrito desde a ingestão."""
+        try:
+            stat = os.stat(self.csv_path(entry))
+        except FileNotFoundError:
+            return False
+        return stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]
+
+    def stale_files(self, franchise=None):
+        """
+        CSVs (relativos a csv_root) em que o armazenamento está desatualizado: reescritos ou
+        removidos desde a ingestão, ou novos na pasta da franquia e ausentes de index.json.
+        """
+        entries = self.entries if franchise is None else self.games(franchise)
+        stale = [e["file"] for e in entries if not self.is_fresh(e)]
+        known = {e["file"] for e in self.entries}
+        pattern = os.path.join(self.csv_root, "*" if franchise is None else glob.escape(franchise), "*.csv")
+        stale += sorted(path for path in (os.path.relpath(p, self.csv_root) for p in glob.glob(pattern))
+                        if path not in known)
+        return stale
+
+    def check_fresh(self, franchise=None):
+        """
+        Raises:
+            StaleStoreError: Se algum CSV da franquia (ou de todas) mudou desde a ingestão.
+        """
+        stale = self.stale_files(franchise)
+        if stale:
+            shown = ", ".join(stale[:5]) + (f" e mais {len(stale) - 5}" if len(stale) > 5 else "")
+            raise StaleStoreError(f"Armazenamento '{self.store_dir}' desatualizado: {shown}")
+
+    def series(self, entry, columns=None):
+        """
+        Retorna os dados de um jogo como DataFrame com a coluna 'Month' (datetime64)
+        e as colunas numéricas pedidas, ordenado por mês.
+        """
+        columns = list(COLUMNS) if columns is None else columns
+        window = slice(entry["start"], entry["start"] + entry["length"])
+        data = {"Month": _codes_to_datetime(self.months[window])}
+        for column in columns:
+            data[column] = np.asarray(self.columns[column][window])
+        return pd.DataFrame(data)
+
+    def panel(self, metric="Peak", franchise=None):
+        """
+        Retorna um painel largo (mês x jogo) da métrica, com PeriodIndex mensal e
+        colunas MultiIndex (franquia, jogo). Meses ausentes ficam como NaN.
+
+        Raises:
+            StaleStoreError: Se algum CSV mudou desde a ingestão (ver stale_files).
+        """
+        self.check_fresh(franchise)
+        entries = self.entries if franchise is None else self.games(franchise)
+        if not entries:
+            return pd.DataFrame()
+        first = min(int(self.months[e["start"]]) for e in entries)
+        last = max(int(self.months[e["start"] + e["length"] - 1]) for e in entries)
+        values = np.full((last - first + 1, len(entries)), np.nan, dtype=np.float64)
+        for i, e in enumerate(entries):
+            window = slice(e["start"], e["start"] + e["length"])
+            values[np.asarray(self.months[window]) - first, i] = self.columns[metric][window]
+        index = pd.period_range(_codes_to_datetime([first])[0], periods=last - first + 1, freq="M")
+        columns = pd.MultiIndex.from_tuples([(e["franchise"], e["game"]) for e in entries],
+                                            names=["franchise", "game"])
+        return pd.DataFrame(values, index=index, columns=columns)
+
+
+if __name__ == '__main__':
+    ingest()
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import struct
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from tracing import call_traced, traced_result, tracer
+
+# Chave gravada como texto nos metadados do PNG; assim o próprio arquivo diz com quais
+# dados e opções foi gerado, sem um manifesto compartilhado entre processos.
+RENDER_KEY = "RenderKey"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def render_key(df, options):
+    """
+    Calcula o hash do conteúdo de um gráfico: os dados plotados e todas as opções
+    (métrica, datas de lançamento, títulos, tamanho da figura...).
+    """
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(json.dumps(options, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def read_render_key(png_path):
+    """Lê a chave gravada no PNG; retorna None se o arquivo não existir ou não tiver chave."""
+    try:
+        with open(png_path, "rb") as f:
+            if f.read(8) != PNG_SIGNATURE:
+                return None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                length, chunk_type = struct.unpack(">I4s", header)
+                # Os metadados de texto vêm antes dos dados da imagem.
+                if chunk_type in (b"IDAT", b"IEND"):
+                    return None
+                data = f.read(length)
+                f.read(4)  # CRC
+                if chunk_type == b"tEXt":
+                    keyword, _, text = data.partition(b"\x00")
+                    if keyword.decode("latin-1") == RENDER_KEY:
+                        return text.decode("latin-1")
+    except (FileNotFoundError, struct.error):
+        return None
+
+
+def is_up_to_date(png_path, key):
+    return read_render_key(png_path) == key
+
+
+def _init_render_worker():
+    # Backend sem interface gráfica e imports pesados feitos uma única vez por processo.
+    tracer.reset_worker()
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot  # noqa: F401
+    import seaborn  # noqa: F401
+
+
+class RenderPool(object):
+    """
+    Pool de processos para renderizar gráficos em paralelo.
+    Os trabalhadores usam o backend Agg e mantêm matplotlib e seaborn já importados;
+    os spans de cada renderização voltam com o resultado e entram no tracer em wait().
+    """
+
+    def __init__(self, max_workers=None):
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_render_worker)
+        self.pending = []
+
+    def submit(self, function, df, output_path, *args):
+        """Agenda function(df, output_path, *args) em um trabalhador."""
+        future = self.executor.submit(call_traced, function, df, output_path, *args)
+        self.pending.append((output_path, future))
+        return future
+
+    def wait(self):
+        """Espera todas as renderizações pendentes e retorna a lista de (arquivo, erro)."""
+        errors = []
+        for output_path, future in self.pending:
+            try:
+                traced_result(future)
+            except Exception:
+                errors.append((output_path, traceback.format_exc()))
+                print(f"Erro ao renderizar '{output_path}':\n{errors[-1][1]}")
+        self.pending = []
+        return errors
+
+    def close(self):
+        self.wait()
+        self.executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+RESULTS_FILE = "analysis_results.sqlite"
+
+# Incrementar quando o cálculo de analisar_impacto_lancamento mudar: invalida todos os resultados salvos
+RESULTS_VERSION = 1
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        csv_path TEXT NOT NULL,
+        params_key TEXT NOT NULL,
+        file_stat TEXT NOT NULL,
+        data_key TEXT NOT NULL,
+        result TEXT NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (csv_path, params_key)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS reports (
+        path TEXT PRIMARY KEY,
+        result_key TEXT NOT NULL
+    )
+    """,
+)
+
+
+def params_key(**params):
+    """Chave dos parâmetros da análise (mais RESULTS_VERSION)."""
+    payload = json.dumps({"version": RESULTS_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_stat(path):
+    """Identifica a versão do arquivo sem lê-lo (mesma ideia de steamdb_csv.SeriesCache)."""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def data_key(df, first_month, last_month):
+    """
+    Hash só dos meses de que a análise depende ([first_month, last_month] do índice mensal).
+    Meses novos fora da janela do evento não invalidam o resultado.
+    """
+    window = df.loc[first_month:last_month]
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, window.columns)).encode("utf-8"))
+    digest.update(",".join(map(str, window.index)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(window, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class ResultsStore(object):
+    """
+    Resultados estruturados de analisar_impacto_lancamento (variações, médias, janelas,
+    p-valor, intervalo) guardados em SQLite e indexados por (CSV, parâmetros).
+
+    Um resultado vale enquanto o arquivo não muda (tamanho + mtime) ou, se mudou, enquanto
+    os meses da janela do evento são os mesmos (data_key). Os relatórios .txt gerados a
+    partir de cada resultado ficam registrados em 'reports', para serem reescritos apenas
+    quando o resultado muda (os PNGs já carregam a própria chave, ver render_cache).
+    """
+
+    def __init__(self, path=RESULTS_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+        return False
+
+    def _entry(self, csv_path, key):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT file_stat, data_key, result FROM results WHERE csv_path = ? AND params_key = ?",
+                (os.path.abspath(csv_path), key)).fetchone()
+
+    def lookup(self, csv_path, key, load_frame, window):
+        """
+        Procura um resultado ainda válido.
+
+        Args:
+            csv_path (str): CSV analisado.
+            key (str): params_key da análise.
+            load_frame (callable): Lê o DataFrame do CSV; só é chamado se o arquivo mudou.
+            window (tuple): (primeiro, último) mês de que a análise depende.
+
+        Returns:
+            tuple: (resultado ou None, DataFrame lido ou None, data_key calculado ou None).
+        """
+        entry = self._entry(csv_path, key)
+        stat = file_stat(csv_path)
+        if entry is not None and entry[0] == stat:
+            self.hits += 1
+            return json.loads(entry[2]), None, entry[1]
+        df = load_frame()
+        current = data_key(df, *window)
+        if entry is not None and entry[1] == current:
+            self._write("UPDATE results SET file_stat = ?, updated_at = ? WHERE csv_path = ? AND params_key = ?",
+                        (stat, time.time(), os.path.abspath(csv_path), key))
+            self.hits += 1
+            return json.loads(entry[2]), df, current
+        self.misses += 1
+        return None, df, current
+
+    def put(self, csv_path, key, current_data_key, result):
+        self._write(
+            "INSERT OR REPLACE INTO results (csv_path, params_key, file_stat, data_key, result, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(csv_path), key, file_stat(csv_path), current_data_key, json.dumps(result), time.time()))
+
+    def report_is_current(self, report_path, result_key):
+        """True se report_path existe e foi gerado a partir do resultado result_key."""
+        if not os.path.exists(report_path):
+            return False
+        with self.lock:
+            row = self.conn.execute("SELECT result_key FROM reports WHERE path = ?",
+                                    (os.path.abspath(report_path),)).fetchone()
+        return row is not None and row[0] == result_key
+
+    def mark_report(self, report_path, result_key):
+        self._write("INSERT OR REPLACE INTO reports (path, result_key) VALUES (?, ?)",
+                    (os.path.abspath(report_path), result_key))
+
+    def _write(self, sql, params):
+        with self.lock:
+            self.conn.execute(sql, params)
+            self.conn.commit()
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses}
@@ -1,23 +1,35 @@
-import time
-
 from scraper.games_to_scraper.games import games, franchises
+from scraper.lean_browser import LeanBrowser
+from scraper.scrape_journal import ScrapeJournal, run_pending
+from scraper.scraper_pool import ScraperPool
 from scraper.steamdb_scraper import MonthlyPlayersSteamDBScraper
+from tracing import tracer
 
 
-def execute_scraper():
-    steamdb_scraper = MonthlyPlayersSteamDBScraper()
-    steamdb_scraper.access_steamdb()
-    steamdb_scraper.login()
-    for game in games:
-        steamdb_scraper.search_game(game)
-        steamdb_scraper.enter_game(game)
-        steamdb_scraper.proccess_game(csv_dir=game)
-        print("O programa irá esperar por 10 segundso para evitar captcha.")
-        time.sleep(10)
+def execute_scraper(incremental=False, workers=1, http_mode=False, fresh=False, retry_failed=False,
+                    lean=False, headless="auto", profile_dir=None):
+    browser = LeanBrowser(headless=headless) if lean else None
+    journal = ScrapeJournal()
+    if journal.begin(games, franchises, fresh=fresh, retry_failed=retry_failed):
+        print(f"Retomando execução anterior: {journal.unfinished()} tarefas pendentes. {journal.summary()}")
+    try:
+        if workers > 1:
+            ScraperPool(num_workers=workers, incremental=incremental, http_mode=http_mode, journal=journal,
+                        browser=browser, profile_dir=profile_dir).run()
+            return
 
-    for franchise in franchises:
-        steamdb_scraper.search_game(franchise)
-        steamdb_scraper.enter_franchise()
-        steamdb_scraper.proccess_franchise(csv_dir=franchise)
-        print("O programa irá esperar por 10 segundso para evitar captcha.")
-        time.sleep(10)
+        steamdb_scraper = MonthlyPlayersSteamDBScraper(incremental=incremental, http_mode=http_mode, journal=journal,
+                                                       browser=browser, profile_dir=profile_dir)
+        steamdb_scraper.start_session()
+        if http_mode:
+            steamdb_scraper.enable_http_mode()
+        try:
+            run_pending(journal, steamdb_scraper)
+        finally:
+            steamdb_scraper.save_session()
+        print(f"Scraper concluído. Throttle: {steamdb_scraper.throttle.metrics()}")
+        print(f"Esperas por página: {steamdb_scraper.ready.metrics()}")
+    finally:
+        journal.print_summary()
+        journal.close()
+        tracer.finish("scraper")
@@ -0,0 +1,186 @@
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+STEAMDB_URL = "https://steamdb.info"
+
+
+class ChallengeRequired(Exception):
+    """O SteamDB respondeu com um desafio (captcha/Cloudflare) ou bloqueio; o navegador precisa resolvê-lo."""
+
+
+class ChartTableNotFound(Exception):
+    """A página baixada não contém a tabela mensal, ou a contém sem linhas (preenchida por JavaScript)."""
+
+
+def _clean_text(text):
+    # Equivalente ao innerText.trim() usado na extração pelo navegador
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class _PageParser(HTMLParser):
+    """
+    Extrai de uma página do SteamDB o <h1 itemprop="name">, a tabela com o id pedido
+    (cabeçalhos e células) e os links <a> das linhas dessa tabela.
+    """
+
+    def __init__(self, table_id):
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.title = ""
+        self.headers = []
+        self.rows = []
+        self.row_links = []
+        self.found_table = False
+        self._in_h1 = False
+        self._table_depth = 0
+        self._section = None
+        self._cell = None
+        self._row = None
+        self._links = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "h1" and attrs.get("itemprop") == "name":
+            self._in_h1 = True
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif attrs.get("id") == self.table_id:
+                self.found_table = True
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+        if tag in ("thead", "tbody"):
+            self._section = tag
+        elif tag == "tr":
+            self._row, self._links = [], []
+        elif tag in ("td", "th"):
+            self._cell = []
+        elif tag == "a" and self._links is not None and attrs.get("href"):
+            self._links.append((attrs.get("href"), attrs.get("class", "")))
+
+    def handle_endtag(self, tag):
+        if tag == "h1":
+            self._in_h1 = False
+        if not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+        elif tag in ("td", "th") and self._cell is not None:
+            text = _clean_text("".join(self._cell))
+            if self._section == "thead":
+                if tag == "th":
+                    self.headers.append(text)
+            elif tag == "td" and self._row is not None:
+                self._row.append(text)
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            if self._section != "thead":
+                self.rows.append(self._row)
+                self.row_links.append(self._links)
+            self._row, self._links = None, None
+
+    def handle_data(self, data):
+        if self._in_h1:
+            self.title += data
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+class SteamDBHttpFetcher(object):
+    """
+    Busca páginas do SteamDB por HTTP, sem renderizar no navegador.
+    Usa os cookies (incluindo __Host-steamdb e cf_clearance) e o user agent de uma sessão
+    de navegador já logada, em uma sessão requests com conexões keep-alive.
+    base_url permite apontar para um servidor local que sirva páginas gravadas.
+    """
+
+    CHALLENGE_MARKERS = ("just a moment", "attention required", "challenges.cloudflare.com", "cf-challenge")
+    MONTH_TABLE_ID = "chart-month-table"
+    # Aba de gráficos do app. O SteamDB pode preencher a tabela mensal só via JavaScript (o navegador
+    # espera por js-chart-month-loading); nesse caso fetch_month_table levanta ChartTableNotFound e o
+    # scraper usa o navegador para o app.
+    MONTH_TABLE_PATH = "/app/{app_id}/charts/"
+
+    def __init__(self, cookies=None, user_agent=None, base_url=STEAMDB_URL, timeout=20, pool_size=4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+        for cookie in cookies or []:
+            self.session.cookies.set(cookie["name"], cookie["value"], path=cookie.get("path", "/"))
+
+    @classmethod
+    def from_driver(cls, driver, **kwargs):
+        """Cria o fetcher com o cookie jar e o user agent do navegador logado."""
+        user_agent = driver.execute_script("return navigator.userAgent;")
+        return cls(cookies=driver.get_cookies(), user_agent=user_agent, **kwargs)
+
+    def update_cookies(self, driver):
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie["name"], cookie["value"], path=cookie.get("path", "/"))
+
+    def _url(self, url_or_path):
+        """Converte uma URL do SteamDB (absoluta ou relativa) para o base_url configurado."""
+        parts = urlsplit(url_or_path)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        return self.base_url + (path if path.startswith("/") else "/" + path)
+
+    def get_html(self, url_or_path):
+        response = self.session.get(self._url(url_or_path), timeout=self.timeout)
+        lowered = response.text[:5000].lower()
+        if response.status_code in (403, 429, 503) or any(m in lowered for m in self.CHALLENGE_MARKERS):
+            raise ChallengeRequired(f"{response.status_code} em {response.url}")
+        response.raise_for_status()
+        return response.text
+
+    def _parse(self, html, table_id):
+        parser = _PageParser(table_id)
+        parser.feed(html)
+        parser.close()
+        return parser
+
+    def charts_path(self, app_url):
+        app_id = re.search(r"/app/(\d+)", app_url)
+        if not app_id:
+            raise ValueError(f"URL de app inválida: {app_url}")
+        return self.MONTH_TABLE_PATH.format(app_id=app_id.group(1))
+
+    def fetch_month_table(self, app_url):
+        """
+        Baixa a tabela mensal de um app.
+
+        Returns:
+            tuple: (nome do jogo no H1, cabeçalhos, linhas), no mesmo formato da extração pelo navegador.
+
+        Raises:
+            ChartTableNotFound: Se a tabela não está no HTML ou não tem nenhuma linha com dados.
+        """
+        path = self.charts_path(app_url)
+        parser = self._parse(self.get_html(path), self.MONTH_TABLE_ID)
+        if not parser.found_table:
+            raise ChartTableNotFound(f"Tabela '{self.MONTH_TABLE_ID}' não encontrada em {path}")
+        rows = [row for row in parser.rows if any(row)]
+        if not rows:
+            raise ChartTableNotFound(f"Tabela '{self.MONTH_TABLE_ID}' sem linhas no HTML de {path}")
+        return _clean_text(parser.title), parser.headers, rows
+
+    def search_app(self, game_name):
+        """Pesquisa um jogo e retorna a URL do app cujo nome é exatamente game_name (ou None)."""
+        html = self.get_html("/search/?" + urlencode({"a": "all", "q": game_name}))
+        parser = self._parse(html, "table-sortable")
+        for row, links in zip(parser.rows, parser.row_links):
+            if game_name in row:
+                for href, _ in links:
+                    if re.search(r"/app/\d+", href):
+                        return urljoin(STEAMDB_URL + "/", href)
+        return None
@@ -0,0 +1,97 @@
+import os
+from contextlib import contextmanager
+
+import undetected_chromedriver as uc
+
+# Tipos de arquivo que o scraper nunca lê (a tabela e os links vêm do DOM)
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.mp3", "*.m3u8"]
+# Anúncios e analytics de terceiros. Cloudflare (challenges.cloudflare.com) e o login da Steam nunca entram aqui.
+THIRD_PARTY_PATTERNS = [
+    "*googletagmanager.com*", "*google-analytics.com*", "*googlesyndication.com*", "*doubleclick.net*",
+    "*adservice.google.*", "*fundingchoicesmessages.google.com*", "*static.cloudflareinsights.com*",
+    "*nitropay.com*", "*amazon-adsystem.com*", "*facebook.net*", "*hotjar.com*", "*quantserve.com*",
+    "*scorecardresearch.com*", "*youtube.com/embed*",
+]
+
+WINDOW_SIZE = "1366,900"
+
+
+class LeanBrowser(object):
+    """
+    Configuração enxuta do Chrome para o scraper: bloqueia imagens, fontes, mídia e
+    domínios de terceiros via CDP (Network.setBlockedURLs), limita a memória do renderer
+    e roda headless quando não há login interativo (captcha/2FA) a fazer.
+
+    headless:
+        'auto' -> headless apenas se já existe uma sessão salva; se ela tiver expirado,
+                  o scraper reabre o navegador visível para o login.
+        True   -> sempre headless. False -> sempre visível.
+    """
+
+    def __init__(self, headless="auto", block_images=True, block_fonts=True, block_media=True,
+                 block_third_party=True, extra_blocked=(), js_heap_mb=256, renderer_process_limit=2,
+                 disk_cache_mb=32):
+        self.headless = headless
+        self.block_images = block_images
+        self.block_fonts = block_fonts
+        self.block_media = block_media
+        self.block_third_party = block_third_party
+        self.extra_blocked = list(extra_blocked)
+        self.js_heap_mb = js_heap_mb
+        self.renderer_process_limit = renderer_process_limit
+        self.disk_cache_mb = disk_cache_mb
+
+    def use_headless(self, session_file):
+        if self.headless == "auto":
+            return bool(session_file) and os.path.isfile(session_file)
+        return bool(self.headless)
+
+    def blocked_urls(self):
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_third_party:
+            patterns += THIRD_PARTY_PATTERNS
+        return patterns + self.extra_blocked
+
+    def chrome_options(self, headless):
+        """ChromeOptions com os limites de memória; headless precisa de um tamanho de janela fixo."""
+        options = uc.ChromeOptions()
+        options.add_argument(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+        options.add_argument(f"--renderer-process-limit={self.renderer_process_limit}")
+        options.add_argument(f"--disk-cache-size={self.disk_cache_mb * 1024 * 1024}")
+        for argument in ("--disable-dev-shm-usage", "--disable-extensions", "--disable-background-networking",
+                         "--disable-component-update", "--disable-default-apps", "--disable-sync",
+                         "--mute-audio", "--no-first-run", "--autoplay-policy=user-gesture-required"):
+            options.add_argument(argument)
+        if headless:
+            options.add_argument("--disable-gpu")
+            options.add_argument(f"--window-size={WINDOW_SIZE}")
+        return options
+
+    def launch(self, session_file=None, profile_dir=None, headless=None):
+        """Cria o navegador com as opções enxutas e o bloqueio de requisições já instalado."""
+        headless = self.use_headless(session_file) if headless is None else headless
+        driver = uc.Chrome(options=self.chrome_options(headless), user_data_dir=profile_dir, headless=headless)
+        self.install(driver)
+        return driver, headless
+
+    def install(self, driver, patterns=None):
+        """Ativa o bloqueio de URLs na aba do driver (vale para as navegações seguintes)."""
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_urls() if patterns is None else patterns})
+
+    @contextmanager
+    def relaxed(self, driver):
+        """Suspende o bloqueio de imagens e fontes (captcha, login da Steam); terceiros continuam bloqueados."""
+        self.install(driver, THIRD_PARTY_PATTERNS + self.extra_blocked if self.block_third_party else self.extra_blocked)
+        try:
+            yield
+        finally:
+            self.install(driver)
@@ -0,0 +1,105 @@
+import threading
+import time
+
+
+class RateBudget(object):
+    """
+    Token bucket compartilhado entre threads.
+    Limita o total de requisições ao SteamDB feitas por todas as sessões de navegador juntas.
+    """
+
+    def __init__(self, requests_per_minute=12, burst=1):
+        self.rate = requests_per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Bloqueia até haver orçamento para mais uma requisição."""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveThrottle(RateBudget):
+    """
+    Token bucket com ritmo adaptativo.
+    Começa no ritmo máximo; a cada sinal de resistência do SteamDB (página de desafio/captcha
+    ou timeout) reduz o ritmo pela metade e impõe uma pausa crescente a todas as sessões.
+    Cada requisição bem-sucedida aumenta o ritmo aos poucos de volta ao máximo.
+    """
+
+    def __init__(self, max_requests_per_minute=20, min_requests_per_minute=2, backoff_factor=2.0,
+                 ramp_step_per_minute=1.0, base_cooldown=5.0, max_cooldown=300.0, min_pause_fraction=0.25):
+        super().__init__(requests_per_minute=max_requests_per_minute)
+        self.max_rate = max_requests_per_minute / 60.0
+        self.min_rate = min_requests_per_minute / 60.0
+        self.backoff_factor = backoff_factor
+        self.ramp_step = ramp_step_per_minute / 60.0
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.min_pause_fraction = min_pause_fraction
+        self.cooldown_until = 0.0
+        self.consecutive_pushbacks = 0
+        self.pushbacks = 0
+        self.successes = 0
+
+    @property
+    def requests_per_minute(self):
+        """Ritmo atual permitido, em requisições por minuto."""
+        return self.rate * 60.0
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                remaining = self.cooldown_until - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(remaining)
+        super().acquire()
+
+    def on_pushback(self, reason):
+        with self.lock:
+            self._refill()
+            self.pushbacks += 1
+            self.consecutive_pushbacks += 1
+            self.rate = max(self.min_rate, self.rate / self.backoff_factor)
+            self.tokens = 0.0
+            cooldown = min(self.max_cooldown,
+                           self.base_cooldown * self.backoff_factor ** (self.consecutive_pushbacks - 1))
+            self.cooldown_until = time.monotonic() + cooldown
+        print(f"Resistência do SteamDB ({reason}). Ritmo reduzido para {self.requests_per_minute:.1f} req/min "
+              f"e pausa de {cooldown:.0f} s.")
+
+    def on_success(self):
+        with self.lock:
+            self._refill()
+            self.successes += 1
+            self.consecutive_pushbacks = 0
+            self.rate = min(self.max_rate, self.rate + self.ramp_step)
+
+    def pause_factor(self):
+        """
+        Multiplicador das pausas de humanização: mínimo quando não há pressão,
+        1x no dobro do intervalo mínimo e maior conforme o ritmo cai.
+        """
+        return max(self.min_pause_fraction, self.max_rate / self.rate - 1)
+
+    def metrics(self):
+        return {
+            "requests_per_minute": round(self.requests_per_minute, 2),
+            "successes": self.successes,
+            "pushbacks": self.pushbacks,
+            "cooling_down": self.cooldown_until > time.monotonic(),
+        }
@@ -0,0 +1,155 @@
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from tracing import span
+
+# Condições avaliadas no navegador. Seletores que começam com '/' são XPath; os demais, CSS.
+READY_CHECK_JS = """
+function readyCheck(kind, selector) {
+    const el = selector.startsWith('/')
+        ? document.evaluate(selector, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : document.querySelector(selector);
+    const visible = (e) => !!e && e.getClientRects().length > 0 && getComputedStyle(e).visibility !== 'hidden';
+    switch (kind) {
+        case 'present': return el;
+        case 'visible': return visible(el) ? el : null;
+        case 'clickable': return visible(el) && !el.disabled ? el : null;
+        case 'hidden': return visible(el) ? null : true;
+        case 'populated': return visible(el) && el.querySelector('tbody tr') ? el : null;
+    }
+    throw new Error('Condição desconhecida: ' + kind);
+}
+"""
+
+# Resolve assim que a condição vale: verifica uma vez e depois a cada mutação do DOM, sem polling
+WAIT_JS = READY_CHECK_JS + """
+const [kind, selector, timeoutMs] = arguments;
+const done = arguments[arguments.length - 1];
+const pack = (r) => ({ok: !!r, element: r && r !== true ? r : null});
+const first = readyCheck(kind, selector);
+if (first) { done(pack(first)); return; }
+let timer = null;
+const observer = new MutationObserver(() => {
+    const r = readyCheck(kind, selector);
+    if (r) finish(r);
+});
+function finish(r) {
+    observer.disconnect();
+    clearTimeout(timer);
+    done(pack(r));
+}
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true,
+                                             attributeFilter: ['class', 'style', 'hidden', 'disabled']});
+timer = setTimeout(() => finish(readyCheck(kind, selector)), timeoutMs);
+"""
+
+CHECK_JS = READY_CHECK_JS + "return readyCheck(arguments[0], arguments[1]);"
+
+
+class PageReadiness(object):
+    """
+    Esperas que retornam assim que a condição exata vale, sem pausas fixas de folga.
+
+    Condições de DOM (presente, visível, clicável, oculto, tabela com linhas) rodam em um
+    MutationObserver via execute_async_script. Condições de navegação (URL, readyState)
+    não sobrevivem à troca de documento dentro do navegador e usam um polling curto
+    (poll_interval). Cada espera vira um span 'wait_<nome>' com o tempo de fato esperado,
+    e metrics() resume os tempos por nome.
+    """
+
+    def __init__(self, driver, timeout=20, poll_interval=0.05):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.driver.set_script_timeout(timeout + 5)
+        self.waits = defaultdict(lambda: {"count": 0, "total_s": 0.0, "max_s": 0.0, "timeouts": 0})
+
+    def _record(self, name, seconds, ok):
+        stats = self.waits[name]
+        stats["count"] += 1
+        stats["total_s"] += seconds
+        stats["max_s"] = max(stats["max_s"], seconds)
+        stats["timeouts"] += 0 if ok else 1
+
+    def _timed(self, name, wait):
+        with span(f"wait_{name}", "scraper") as wait_span:
+            start = time.perf_counter()
+            ok = False
+            try:
+                result = wait()
+                ok = True
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                self._record(name, elapsed, ok)
+                wait_span.set(waited_ms=round(elapsed * 1000, 1), outcome="ready" if ok else "timeout")
+
+    def dom(self, kind, selector, name, timeout=None):
+        """
+        Espera a condição kind ('present', 'visible', 'clickable', 'hidden' ou 'populated')
+        do seletor. Retorna o elemento (ou True para 'hidden').
+
+        Raises:
+            TimeoutException: Se a condição não valer dentro do timeout.
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        def wait():
+            deadline = time.monotonic() + timeout
+            try:
+                result = self.driver.execute_async_script(WAIT_JS, kind, selector, int(timeout * 1000))
+            except (JavascriptException, WebDriverException) as e:
+                if isinstance(e, TimeoutException):
+                    raise
+                # O documento mudou durante a espera (redirecionamento, desafio): segue no novo documento
+                result = None
+            if result and result["ok"]:
+                return result["element"] or True
+            remaining = deadline - time.monotonic()
+            if result is not None or remaining <= 0:
+                raise TimeoutException(f"Condição '{kind}' de '{selector}' não ocorreu em {timeout}s")
+            return WebDriverWait(self.driver, remaining, poll_frequency=self.poll_interval).until(
+                lambda d: d.execute_script(CHECK_JS, kind, selector),
+                f"Condição '{kind}' de '{selector}' não ocorreu em {timeout}s")
+
+        return self._timed(name, wait)
+
+    def present(self, selector, name, timeout=None):
+        return self.dom("present", selector, name, timeout)
+
+    def clickable(self, selector, name, timeout=None):
+        return self.dom("clickable", selector, name, timeout)
+
+    def hidden(self, selector, name, timeout=None):
+        return self.dom("hidden", selector, name, timeout)
+
+    def populated(self, selector, name, timeout=None):
+        """Tabela visível e com ao menos uma linha no tbody."""
+        return self.dom("populated", selector, name, timeout)
+
+    def until(self, condition, name, timeout=None):
+        """Condição arbitrária do Selenium (ex.: expected_conditions) com polling curto."""
+        timeout = self.timeout if timeout is None else timeout
+        return self._timed(name, lambda: WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval)
+                           .until(condition))
+
+    def navigation(self, clicked_element, name, timeout=None):
+        """
+        Espera a navegação disparada por um clique: o elemento clicado pertence ao documento
+        antigo (fica 'stale') e o novo documento termina de carregar (readyState 'complete').
+        Funciona mesmo quando a URL de destino é igual à atual.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        left_page = EC.staleness_of(clicked_element)
+        return self._timed(name, lambda: WebDriverWait(self.driver, timeout, poll_frequency=self.poll_interval).until(
+            lambda d: left_page(d) and d.execute_script("return document.readyState") == "complete"))
+
+    def metrics(self):
+        """Tempo esperado por nome: quantidade, média e máximo (ms) e timeouts."""
+        return {name: {"count": stats["count"], "mean_ms": round(stats["total_s"] / stats["count"] * 1000, 1),
+                       "max_ms": round(stats["max_s"] * 1000, 1), "timeouts": stats["timeouts"]}
+                for name, stats in self.waits.items()}
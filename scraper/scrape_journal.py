@@ -0,0 +1,258 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+import traceback
+
+from tracing import span
+
+JOURNAL_FILE = ".scrape_journal.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    csv_dir TEXT,
+    url TEXT,
+    label TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (kind, name)
+)
+"""
+
+# Ordem de execução: jogos avulsos, depois franquias e por fim os apps descobertos nelas
+KIND_ORDER = "CASE kind WHEN 'game' THEN 0 WHEN 'franchise' THEN 1 ELSE 2 END"
+
+
+class ScrapeJournal(object):
+    """
+    Diário persistente (SQLite) das tarefas do scraper.
+
+    Cada jogo, franquia e app descoberto em uma franquia vira uma linha com status
+    (pending, running, done, failed), número de tentativas e último erro. Uma execução
+    interrompida (queda do navegador, captcha, Ctrl+C) é retomada de onde parou, e as
+    falhas voltam para a fila com espera exponencial até max_attempts.
+
+    Apps são identificados pelo id do SteamDB, então um jogo presente em várias franquias
+    é raspado uma única vez, inclusive entre execuções retomadas.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, max_attempts=4, base_backoff=60.0, max_backoff=1800.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # Uma conexão compartilhada pelas threads do scraper_pool, serializada pelo lock
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def _write(self, sql, params=()):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(sql, params)
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return cursor.rowcount
+
+    def _read(self, sql, params=()):
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def unfinished(self):
+        """Quantidade de tarefas pendentes ou interrompidas no meio."""
+        return self._read("SELECT COUNT(*) AS n FROM tasks WHERE status IN ('pending', 'running')")[0]["n"]
+
+    def begin(self, games, franchises, fresh=False, retry_failed=False):
+        """
+        Prepara a execução. Se o diário ainda tem tarefas inacabadas (e fresh=False), retoma:
+        tarefas 'running' de uma execução interrompida voltam para 'pending' e só o que falta
+        é processado. Com retry_failed, o diário também é mantido (tarefas concluídas e apps
+        já descobertos) e só as falhas voltam para a fila. Caso contrário começa uma execução
+        nova com todas as tarefas pendentes.
+
+        Args:
+            games (list[str]): Jogos avulsos.
+            franchises (list[str]): Franquias.
+            fresh (bool): Ignora o progresso salvo e recomeça do zero.
+            retry_failed (bool): Devolve à fila as tarefas que esgotaram as tentativas.
+
+        Returns:
+            bool: True se a execução foi retomada.
+        """
+        if fresh:
+            resumed = False
+        elif retry_failed:
+            resumed = self._read("SELECT COUNT(*) AS n FROM tasks")[0]["n"] > 0
+        else:
+            resumed = self.unfinished() > 0
+        if not resumed:
+            # Execução nova: as tarefas vêm das listas atuais e os apps são redescobertos pelas franquias
+            self._write("DELETE FROM tasks")
+        else:
+            self._write("UPDATE tasks SET status = 'pending' WHERE status = 'running'")
+        if retry_failed:
+            self._write("UPDATE tasks SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ? "
+                        "WHERE status = 'failed'", (time.time(), time.time()))
+        for game in games:
+            self.add("game", game, csv_dir=game)
+        for franchise in franchises:
+            self.add("franchise", franchise, csv_dir=franchise)
+        return resumed
+
+    def add(self, kind, name, csv_dir=None, url=None, label=None):
+        """Registra uma tarefa; retorna False se ela já existe (dedup por kind + name)."""
+        return self._write(
+            "INSERT OR IGNORE INTO tasks (kind, name, csv_dir, url, label, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, name, csv_dir, url, label, time.time())) > 0
+
+    def claim(self):
+        """
+        Reserva a próxima tarefa pendente cuja espera já passou (status 'running',
+        tentativas + 1). Seguro entre threads.
+
+        Returns:
+            dict: A tarefa, ou None se nada estiver pronto agora.
+        """
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    f"SELECT * FROM tasks WHERE status = 'pending' AND next_attempt_at <= ? "
+                    f"ORDER BY {KIND_ORDER}, next_attempt_at, rowid LIMIT 1", (now,)).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        "UPDATE tasks SET status = 'running', attempts = attempts + 1, updated_at = ? "
+                        "WHERE kind = ? AND name = ?", (now, row["kind"], row["name"]))
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        task = dict(row)
+        task["attempts"] += 1
+        task["status"] = "running"
+        return task
+
+    def seconds_until_next(self):
+        """Espera até a próxima tarefa pendente ficar pronta (0 se já há uma; None se não há nenhuma)."""
+        rows = self._read("SELECT MIN(next_attempt_at) AS next_at FROM tasks WHERE status = 'pending'")
+        next_at = rows[0]["next_at"]
+        return None if next_at is None else max(0.0, next_at - time.time())
+
+    def complete(self, task):
+        self._write("UPDATE tasks SET status = 'done', last_error = NULL, updated_at = ? WHERE kind = ? AND name = ?",
+                    (time.time(), task["kind"], task["name"]))
+
+    def release(self, task):
+        """Devolve à fila, sem contar a tentativa, uma tarefa interrompida pela sessão (e não pelo site)."""
+        self._write("UPDATE tasks SET status = 'pending', attempts = MAX(attempts - 1, 0), next_attempt_at = ?, "
+                    "updated_at = ? WHERE kind = ? AND name = ? AND status = 'running'",
+                    (time.time(), time.time(), task["kind"], task["name"]))
+
+    def backoff(self, attempts):
+        """Espera antes da próxima tentativa: exponencial no número de tentativas, com jitter."""
+        delay = min(self.max_backoff, self.base_backoff * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(0.8, 1.2)
+
+    def fail(self, task, error):
+        """
+        Registra a falha. A tarefa volta para a fila após backoff(tentativas), ou fica como
+        'failed' quando as tentativas se esgotam.
+
+        Returns:
+            bool: True se haverá nova tentativa.
+        """
+        retry = task["attempts"] < self.max_attempts
+        now = time.time()
+        self._write(
+            "UPDATE tasks SET status = ?, last_error = ?, next_attempt_at = ?, updated_at = ? WHERE kind = ? AND name = ?",
+            ("pending" if retry else "failed", str(error)[-2000:], now + self.backoff(task["attempts"]) if retry else 0,
+             now, task["kind"], task["name"]))
+        return retry
+
+    def summary(self):
+        """Contagem de tarefas por tipo e status, ex.: {'app': {'done': 40, 'failed': 1}}."""
+        counts = {}
+        for row in self._read("SELECT kind, status, COUNT(*) AS n FROM tasks GROUP BY kind, status"):
+            counts.setdefault(row["kind"], {})[row["status"]] = row["n"]
+        return counts
+
+    def failures(self):
+        """Tarefas que esgotaram as tentativas, com o último erro."""
+        return self._read("SELECT kind, name, label, attempts, last_error FROM tasks WHERE status = 'failed' "
+                          "ORDER BY kind, name")
+
+    def print_summary(self):
+        print(f"Diário do scraper ({os.path.abspath(self.path)}): {self.summary()}")
+        for failure in self.failures():
+            last_line = (failure["last_error"] or "").strip().splitlines()[-1:] or [""]
+            print(f"  Falhou após {failure['attempts']} tentativas: {failure['kind']} "
+                  f"'{failure['label'] or failure['name']}': {last_line[0]}")
+
+
+def run_task(steamdb_scraper, task):
+    """Executa uma tarefa do diário; retorna True se ela terminou com os dados salvos (ou sem nada novo)."""
+    if task["kind"] == "game":
+        return steamdb_scraper.scrape_game(task["name"])
+    if task["kind"] == "franchise":
+        return steamdb_scraper.scrape_franchise(task["name"])
+    if task["kind"] == "app":
+        return steamdb_scraper.scrape_app(task["url"], csv_dir=task["csv_dir"], app_name=task["label"])
+    raise ValueError(f"Tipo de tarefa desconhecido: {task['kind']}")
+
+
+def run_pending(journal, steamdb_scraper, worker_name="scraper", max_idle_wait=300.0, poll_interval=5.0):
+    """
+    Processa as tarefas do diário até não sobrar nenhuma pendente. Tarefas em backoff são
+    aguardadas (no máximo max_idle_wait por vez); exceções e falhas relatadas pelo scraper
+    vão para journal.fail e voltam para a fila. Enquanto outra sessão ainda processa uma
+    tarefa (que pode registrar apps ou voltar para a fila), a fila é consultada a cada poll_interval.
+    """
+    while True:
+        task = journal.claim()
+        if task is None:
+            wait = journal.seconds_until_next()
+            if wait is None:
+                if journal.unfinished() == 0:
+                    return
+                time.sleep(poll_interval)
+                continue
+            print(f"[{worker_name}] Aguardando {wait:.0f}s pela próxima nova tentativa...")
+            with span("journal_backoff_wait", "scraper"):
+                time.sleep(min(wait, max_idle_wait))
+            continue
+
+        label = task["label"] or task["name"]
+        print(f"[{worker_name}] Processando {task['kind']} '{label}' (tentativa {task['attempts']})")
+        try:
+            ok = run_task(steamdb_scraper, task)
+            error = None if ok else "Nenhum dado salvo (ver log da tentativa)."
+        except Exception:
+            ok, error = False, traceback.format_exc()
+        except BaseException:
+            # Sessão interrompida (Ctrl+C, SystemExit): a tarefa volta para a fila em vez de ficar 'running'
+            # e prender as outras sessões no polling
+            journal.release(task)
+            raise
+        if ok:
+            journal.complete(task)
+            continue
+        retry = journal.fail(task, error)
+        print(f"[{worker_name}] Falha em {task['kind']} '{label}'"
+              f"{'; nova tentativa mais tarde' if retry else '; tentativas esgotadas'}.")
@@ -0,0 +1,80 @@
+import os
+import threading
+import traceback
+
+from scraper.rate_limit import AdaptiveThrottle
+from scraper.scrape_journal import ScrapeJournal, run_pending
+from scraper.steamdb_scraper import MonthlyPlayersSteamDBScraper
+
+
+class ScraperPool(object):
+    """
+    Executa várias sessões de navegador em paralelo, cada uma em sua thread.
+    As sessões fazem login uma única vez, puxam jogos e franquias de uma fila
+    compartilhada e dividem um único AdaptiveThrottle: a resistência vista por uma
+    sessão desacelera todas.
+    As tarefas vêm do diário persistente (ScrapeJournal), que também registra falhas e novas tentativas.
+    """
+
+    def __init__(self, num_workers=2, requests_per_minute=20, incremental=False, http_mode=False, journal=None,
+                 browser=None, profile_dir=None):
+        self.num_workers = num_workers
+        self.throttle = AdaptiveThrottle(max_requests_per_minute=requests_per_minute)
+        self.incremental = incremental
+        self.http_mode = http_mode
+        # Criação do navegador e login interativo (captcha/2FA) acontecem uma sessão por vez
+        self.login_lock = threading.Lock()
+        self.journal = journal
+        # LeanBrowser opcional; sessões enxutas usam menos memória e cabem mais por máquina
+        self.browser = browser
+        # Perfil persistente do Chrome; cada sessão usa uma subpasta, pois o Chrome não compartilha um perfil aberto
+        self.profile_dir = profile_dir
+
+    def run(self, games=None, franchises=None):
+        """
+        Processa as tarefas pendentes do diário. Sem um diário no construtor, cria um com
+        games e franquias (retomando uma execução anterior inacabada, se houver).
+
+        Returns:
+            list[dict]: Tarefas que esgotaram as tentativas (ScrapeJournal.failures).
+        """
+        if self.journal is None:
+            self.journal = ScrapeJournal()
+            self.journal.begin(games or [], franchises or [])
+
+        workers = [
+            threading.Thread(target=self._worker, args=(worker_id,), name=f"scraper-{worker_id}")
+            for worker_id in range(min(self.num_workers, max(self.journal.unfinished(), 1)))
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        failures = self.journal.failures()
+        print(f"Pool de scrapers concluído com {len(failures)} falhas. Throttle: {self.throttle.metrics()}")
+        return failures
+
+    def _worker_profile(self, worker_id):
+        return os.path.join(self.profile_dir, f"scraper-{worker_id}") if self.profile_dir else None
+
+    def _worker(self, worker_id):
+        worker_name = f"scraper-{worker_id}"
+        steamdb_scraper = None
+        try:
+            with self.login_lock:
+                print(f"[{worker_name}] Iniciando navegador e login...")
+                steamdb_scraper = MonthlyPlayersSteamDBScraper(incremental=self.incremental,
+                                                               throttle=self.throttle, http_mode=self.http_mode,
+                                                               journal=self.journal, browser=self.browser,
+                                                               profile_dir=self._worker_profile(worker_id))
+                steamdb_scraper.start_session()
+                if self.http_mode:
+                    steamdb_scraper.enable_http_mode()
+            run_pending(self.journal, steamdb_scraper, worker_name=worker_name)
+        except Exception:
+            # As demais sessões seguem com a fila (run_pending já devolveu a tarefa em andamento)
+            print(f"[{worker_name}] Sessão encerrada por erro:\n{traceback.format_exc()}")
+        finally:
+            if steamdb_scraper is not None:
+                steamdb_scraper.close_browser()
@@ -1,18 +1,38 @@
 import os
+import json
 from dotenv import load_dotenv
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
+
+from scraper.http_fetcher import ChallengeRequired, ChartTableNotFound, SteamDBHttpFetcher
+from scraper.rate_limit import AdaptiveThrottle
+from scraper.readiness import PageReadiness
+from tracing import annotate, span, traced
 import time
 import csv
 import re
 import random
+import tempfile
+import threading
+from contextlib import nullcontext
+from datetime import datetime
 
 load_dotenv()
 
 
+def _current_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Lida uma vez na importação: os.umask altera o processo inteiro e não é seguro entre as threads do pool
+CSV_FILE_MODE = 0o666 & ~_current_umask()
+
+
 class MonthlyPlayersSteamDBScraper:
     steamdb_user = os.getenv('STEAMDB_USER')
     steamdb_pwd = os.getenv('STEAMDB_PWD')
@@ -30,10 +50,122 @@ class MonthlyPlayersSteamDBScraper:
     PAGE_LOAD_PAUSE_MAX = 4.0
     POST_SCROLL_PAUSE = 0.5
 
-    def __init__(self):
-        options = uc.ChromeOptions()
-        self.driver = uc.Chrome(options=options)
+    # Trechos de título que indicam página de desafio (Cloudflare/captcha) em vez do conteúdo
+    CHALLENGE_TITLE_MARKERS = ("just a moment", "attention required", "captcha", "verify you are human")
+
+    # Extrai cabeçalhos e células da tabela mensal em uma única chamada ao navegador
+    MONTH_TABLE_JS = """
+        const table = arguments[0];
+        const text = (el) => el.innerText.trim();
+        const firstRow = table.querySelector('tbody tr');
+        let headers = Array.from(table.querySelectorAll('thead tr th')).map(text);
+        if (!headers.length && firstRow) {
+            const firstRowTh = firstRow.querySelectorAll('th');
+            headers = Array.from(firstRowTh.length ? firstRowTh : firstRow.querySelectorAll('td')).map(text);
+        }
+        return {
+            headers: headers,
+            firstRowCells: firstRow ? firstRow.querySelectorAll('td').length : 0,
+            rows: Array.from(table.querySelectorAll('tbody tr')).map(
+                (tr) => Array.from(tr.querySelectorAll('td')).map(text))
+        };
+    """
+
+    # Lista as linhas de jogos da tabela da franquia (índice, subinfo vazio, link) em uma única chamada
+    FRANCHISE_ROWS_JS = """
+        return Array.from(arguments[0].querySelectorAll('tbody tr.app')).map((tr, index) => {
+            const subinfo = tr.querySelector('td div.subinfo');
+            const link = tr.querySelector('td a.b');
+            if (!subinfo || !link) return null;
+            return {
+                index: index,
+                subinfo_empty: subinfo.innerHTML.trim() === '',
+                href: link.href,
+                app_name: link.innerText.trim()
+            };
+        }).filter((row) => row !== null);
+    """
+
+    # Protege processed_apps quando o conjunto é compartilhado entre threads
+    _processed_apps_lock = threading.Lock()
+
+    # Cookies da sessão logada, reaproveitados entre execuções
+    SESSION_FILE = ".steamdb_session.json"
+    STEAMDB_URL = "https://steamdb.info/"
+
+    # Linha volátil da tabela mensal; é sempre substituída pela leitura mais recente
+    LAST_30_DAYS_LABEL = "Last 30 days"
+
+    # Páginas seguidas sem a tabela mensal no HTML até o modo HTTP deixar de buscá-la (pesquisas continuam por HTTP)
+    HTTP_MONTH_TABLE_MAX_MISSES = 3
+
+    def __init__(self, incremental=False, throttle=None, http_mode=False, session_file=SESSION_FILE,
+                 profile_dir=None, processed_apps=None, journal=None, browser=None):
+        # Ritmo adaptativo de requisições; pode ser compartilhado entre sessões (scraper_pool)
+        self.throttle = throttle if throttle is not None else AdaptiveThrottle()
+        # No modo incremental, meses fechados já salvos são mantidos e a extração para no primeiro mês conhecido
+        self.incremental = incremental
+        # No modo HTTP o navegador só faz login e resolve desafios; as tabelas vêm por requests
+        self.http_mode = http_mode
+        self.http_fetcher = None
+        self.http_month_tables = True
+        self.http_month_table_misses = 0
+        # Sessão persistida em disco: cookies serializados e, opcionalmente, um perfil do Chrome (user-data-dir)
+        self.session_file = session_file
+        # Apps já processados nesta execução; o pool compartilha o mesmo conjunto entre as sessões
+        self.processed_apps = processed_apps if processed_apps is not None else set()
+        # Diário persistente (scrape_journal); com ele, os apps das franquias viram tarefas próprias
+        self.journal = journal
+        # Modo enxuto (lean_browser.LeanBrowser): headless, sem imagens/fontes/terceiros e com memória limitada
+        self.browser = browser
+        self.profile_dir = profile_dir
+        self.headless = False
+        self._launch_browser()
+
+    def _launch_browser(self, headless=None):
+        if self.browser is None:
+            options = uc.ChromeOptions()
+            self.driver = uc.Chrome(options=options, user_data_dir=self.profile_dir)
+        else:
+            self.driver, self.headless = self.browser.launch(self.session_file, self.profile_dir, headless)
+            print(f"Navegador enxuto iniciado ({'headless' if self.headless else 'visível'}).")
         self.wait = WebDriverWait(self.driver, 20)  # Um wait de 20 segundos é um bom padrão
+        # Esperas por evento (MutationObserver) para as páginas de pesquisa, franquia e gráficos
+        self.ready = PageReadiness(self.driver, timeout=20)
+
+    def _interactive(self):
+        """No modo enxuto, libera imagens e fontes enquanto captcha e login da Steam são resolvidos."""
+        return self.browser.relaxed(self.driver) if self.browser is not None else nullcontext()
+
+    def _acquire_request(self):
+        """Espera o orçamento global antes de uma ação que carrega uma página do SteamDB."""
+        with span("throttle_wait", "scraper"):
+            self.throttle.acquire()
+
+    def _pause(self, min_seconds, max_seconds):
+        """Pausa de humanização, escalada pela pressão atual do throttle."""
+        with span("humanizing_sleep", "scraper"):
+            time.sleep(random.uniform(min_seconds, max_seconds) * self.throttle.pause_factor())
+
+    def _is_challenge_page(self):
+        try:
+            title = self.driver.title.lower()
+        except Exception:
+            return False
+        if any(marker in title for marker in self.CHALLENGE_TITLE_MARKERS):
+            return True
+        return bool(self.driver.find_elements(
+            By.CSS_SELECTOR, "iframe[src*='challenges.cloudflare.com'], #challenge-form"))
+
+    def _record_page_outcome(self):
+        """Informa ao throttle se a última navegação trouxe conteúdo ou uma página de desafio."""
+        if self._is_challenge_page():
+            print("SteamDB respondeu com uma página de desafio.")
+            annotate(outcome="challenge")
+            self.throttle.on_pushback("challenge")
+            return False
+        self.throttle.on_success()
+        return True
 
     def _simulate_typing(self, element, text):
         """Simula a digitação de texto em um elemento, caractere por caractere."""
@@ -44,10 +176,11 @@ class MonthlyPlayersSteamDBScraper:
 
     def access_steamdb(self):
         print("Accessing steamdb.info...")
+        self._acquire_request()
         self.driver.get("https://steamdb.info/")
-        time.sleep(random.uniform(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX))
+        self._pause(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX)
         input("Resolva o captch e pressione Enter para continuar...")
-        time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+        self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
         return
 
     def check_logged(self):
@@ -57,19 +190,100 @@ class MonthlyPlayersSteamDBScraper:
             return True
         return False
 
+    def _session_is_valid(self):
+        """Logado de fato: cookie de sessão presente e sem o link de login no cabeçalho."""
+        return self.check_logged() and not self.driver.find_elements(By.CLASS_NAME, "header-login")
+
+    def save_session(self):
+        """Grava os cookies do SteamDB em session_file (somente leitura para o usuário)."""
+        if not self.session_file or not self.driver.get_cookie("__Host-steamdb"):
+            return
+        cookies = [c for c in self.driver.get_cookies() if "steamdb.info" in c.get("domain", "")]
+        # Temporário único (0600): as sessões do pool gravam o mesmo session_file ao mesmo tempo
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.session_file)),
+                                         prefix=".", suffix=".session.tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(cookies, f)
+            os.replace(temp_path, self.session_file)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        print(f"Sessão salva em '{self.session_file}'.")
+
+    def restore_session(self):
+        """
+        Restaura os cookies salvos e verifica se a sessão continua válida.
+        Retorna False se não houver sessão salva, se ela expirou ou se o SteamDB pedir um desafio.
+        """
+        if not self.session_file or not os.path.isfile(self.session_file):
+            return False
+        print(f"Restaurando sessão de '{self.session_file}'...")
+        with open(self.session_file, encoding='utf-8') as f:
+            cookies = json.load(f)
+        self._acquire_request()
+        self.driver.get(self.STEAMDB_URL)
+        if not self._record_page_outcome():
+            return False
+        for cookie in cookies:
+            cookie.pop("sameSite", None)
+            if cookie["name"].startswith("__Host-"):
+                cookie.pop("domain", None)  # Cookies __Host- não podem ter atributo domain
+            try:
+                self.driver.add_cookie(cookie)
+            except Exception as e:
+                print(f"Não foi possível restaurar o cookie '{cookie['name']}': {e}")
+        self._acquire_request()
+        self.driver.refresh()
+        self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
+        if self._session_is_valid():
+            print("Sessão restaurada; login interativo não é necessário.")
+            return True
+        print("Sessão salva expirou.")
+        return False
+
+    @traced(category="scraper")
+    def start_session(self):
+        """
+        Reaproveita a sessão salva; só faz o fluxo interativo (captcha, login, 2FA) se ela expirou.
+        No modo enxuto headless, o login é feito em um navegador visível, que volta a ser
+        headless (headless='auto') assim que a sessão nova é salva.
+        """
+        if self.restore_session():
+            return
+        if self.headless:
+            print("Login interativo necessário; reabrindo o navegador visível...")
+            self.driver.quit()
+            self._launch_browser(headless=False)
+        with self._interactive():
+            self.login()
+        self.save_session()
+        if self.browser is not None and self.browser.headless == "auto" and self.browser.use_headless(self.session_file):
+            print("Sessão salva; voltando ao navegador headless.")
+            self.driver.quit()
+            self._launch_browser(headless=True)
+            if not self.restore_session():
+                print("A sessão nova não foi aceita no navegador headless; seguindo visível.")
+                self.driver.quit()
+                self._launch_browser(headless=False)
+                with self._interactive():
+                    self.login()
+                # Sobrescreve a sessão recusada, para as próximas execuções não repetirem a tentativa headless
+                self.save_session()
+
     def handle_header_login(self):
         # Click on the login link
         login_link = self.wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "header-login")))
         login_link.click()
         print("Clicked header login link.")
-        time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+        self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
 
     def click_sign_in_via_steam(self):
         try:
             sign_in_button = self.wait.until(EC.element_to_be_clickable((By.ID, "js-sign-in")))
             sign_in_button.click()
             print("Clicked 'Sign in via Steam' button (js-sign-in).")
-            time.sleep(random.uniform(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX))
+            self._pause(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX)
         except TimeoutException:
             print(
                 "Could not find or click 'js-sign-in' button. Page structure might have changed or CAPTCHA interference.")
@@ -79,14 +293,14 @@ class MonthlyPlayersSteamDBScraper:
         try:
             self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'input[type="text"]')))
             print("Steam login page loaded.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
         except TimeoutException:
             print("Steam login page did not load as expected.")
             raise TimeoutException("Steam login page did not load as expected.")
 
         try:
             print("Attempting to fill Steam credentials...")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
             username_input_steam = self.wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "input._2GBWeup5cttgbTw8FM3tfx")))
             self._simulate_typing(username_input_steam, self.steamdb_user)
@@ -95,12 +309,12 @@ class MonthlyPlayersSteamDBScraper:
             password_input_steam = self.driver.find_element(By.CSS_SELECTOR, 'input[type="password"]')
             self._simulate_typing(password_input_steam, self.steamdb_pwd)
             print("Filled password.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
 
             login_button_steam = self.driver.find_element(By.CLASS_NAME, "DjSvCZoKKfoNSmarsEcTS")
             login_button_steam.click()
             print("Clicked Steam login button.")
-            time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))
+            self._pause(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX)
 
         except (NoSuchElementException, TimeoutException) as e:
             print(f"Could not find username/password fields or login button on Steam page: {e}")
@@ -108,15 +322,15 @@ class MonthlyPlayersSteamDBScraper:
 
     def handle_two_auth(self):
         input("Realize a autenticação de dois fatores atrelada a sua conta e pressione enter")
-        time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+        self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
         try:
             image_login_button = self.wait.until(EC.element_to_be_clickable((By.ID, "imageLogin")))
             print("Botão 'imageLogin' apareceu. Clicando nele para finalizar o login no Steam...")
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
                                        image_login_button)
-            time.sleep(self.POST_SCROLL_PAUSE)
+            self._pause(self.POST_SCROLL_PAUSE, self.POST_SCROLL_PAUSE)
             self.driver.execute_script("arguments[0].click();", image_login_button)
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
 
             print("Aguardando redirecionamento para o SteamDB e pelo cookie de sessão...")
             self.wait.until(
@@ -127,7 +341,7 @@ class MonthlyPlayersSteamDBScraper:
             )
             print(
                 "Login bem-sucedido e redirecionado para o SteamDB após autenticação móvel e clique no 'imageLogin'.")
-            time.sleep(random.uniform(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX))
+            self._pause(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX)
 
         except TimeoutException:
             print(
@@ -136,11 +350,12 @@ class MonthlyPlayersSteamDBScraper:
                     "steamdb.info" in self.driver.current_url and \
                     "login" not in self.driver.current_url.lower():
                 print("No entanto, o login no SteamDB parece ter sido bem-sucedido (cookie encontrado).")
-                time.sleep(random.uniform(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX))
+                self._pause(self.ACTION_MEDIUM_PAUSE_MIN, self.ACTION_MEDIUM_PAUSE_MAX)
             else:
                 print("O processo de login ficou parado ou falhou após a etapa de autenticação móvel.")
-                time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+                self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
 
+    @traced(category="scraper")
     def login(self):
         try:
             self.access_steamdb()  # Movido para cá para garantir que a página seja acessada antes de checar o login
@@ -159,35 +374,48 @@ class MonthlyPlayersSteamDBScraper:
         except Exception as e:
             print(f"An unexpected error occurred during login: {e}")
 
+    @traced(category="scraper")
     def search_game(self, game_name):
         try:
             print(f"Attempting to find search input with itemprop='query-input'.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
-            search_input = self.wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'input[itemprop="query-input"]'))
-            )
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
+            search_input = self.ready.present('input[itemprop="query-input"]', "search_input")
             search_input.clear()
-            time.sleep(random.uniform(0.3, 0.7))  # Pausa curta após limpar
+            self._pause(0.3, 0.7)  # Pausa curta após limpar
             self._simulate_typing(search_input, game_name)
             print(f"Filled search input with '{game_name}'.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
 
             print(f"Attempting to find search button with aria-label='Perform search'.")
-            search_button = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, 'button[aria-label="Perform search"]'))
-            )
+            search_button = self.ready.clickable('button[aria-label="Perform search"]', "search_button")
+            # Os resultados podem vir por navegação ou ser montados na própria página: espera a URL mudar
+            # ou uma tabela de resultados nova aparecer, em vez de esperar o botão sair do documento
+            previous_url = self.driver.current_url
+            previous_tables = self.driver.find_elements(By.CSS_SELECTOR, "#table-sortable")
+
+            def new_results_table(driver):
+                tables = driver.find_elements(By.CSS_SELECTOR, "#table-sortable")
+                return bool(tables) and tables[0] not in previous_tables
+
+            self._acquire_request()
             search_button.click()
             print("Clicked search button.")
-            time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))  # Esperar resultados
+            self.ready.until(EC.any_of(EC.url_changes(previous_url), new_results_table), "search_results")
+            self._record_page_outcome()
             print(f"Search for '{game_name}' performed.")
 
         except TimeoutException:
+            annotate(outcome="timeout")
+            self.throttle.on_pushback("timeout")
             print(f"Error: Could not find search elements or timed out waiting for them.")
         except NoSuchElementException:
+            annotate(outcome="not_found")
             print(f"Error: One of the search elements was not found on the page.")
         except Exception as e:
+            annotate(outcome="error")
             print(f"An unexpected error occurred during game search: {e}")
 
+    @traced(category="scraper")
     def enter_game(self, game_name):
         """
         Na página de resultados da pesquisa, encontra e clica em um link de jogo
@@ -195,14 +423,10 @@ class MonthlyPlayersSteamDBScraper:
         Espera-se que o link esteja na terceira coluna das linhas da tabela.
         """
         print(f"Tentando encontrar e clicar no jogo: '{game_name}' nos resultados da pesquisa.")
-        search_results_url = self.driver.current_url
 
         try:
-            self.wait.until(
-                EC.presence_of_element_located((By.ID, "table-sortable"))
-            )
+            self.ready.present("#table-sortable", "search_table")
             print("Tabela de resultados da pesquisa encontrada.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
 
             potential_links = self.driver.find_elements(By.XPATH, "//table[@id='table-sortable']/tbody/tr/td[3]/a")
 
@@ -246,167 +470,271 @@ class MonthlyPlayersSteamDBScraper:
                         f"Link do jogo com texto exato '{game_name}' não encontrado na tabela de resultados da pesquisa.")
 
             print(f"Link do jogo encontrado para '{game_name}'.")
-            time.sleep(random.uniform(0.3, 0.7))
+            self._pause(0.3, 0.7)
 
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
                                        target_link)
-            time.sleep(self.POST_SCROLL_PAUSE)
+            self._pause(self.POST_SCROLL_PAUSE, self.POST_SCROLL_PAUSE)
+            self._acquire_request()
             self.driver.execute_script("arguments[0].click();", target_link)
             print(f"Link do jogo clicado para '{game_name}'.")
 
-            self.wait.until(EC.not_(EC.url_to_be(search_results_url)))
+            self.ready.navigation(target_link, "game_page")
             print(f"Navegado para fora dos resultados da pesquisa. URL atual: {self.driver.current_url}")
-            time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))
+            self._record_page_outcome()
 
         except TimeoutException:
+            annotate(outcome="timeout")
+            self.throttle.on_pushback("timeout")
             print(
                 f"Erro: Timeout ao tentar encontrar ou clicar no jogo '{game_name}'. Ele pode não estar nos resultados ou a estrutura da página mudou.")
         except NoSuchElementException as e:
+            annotate(outcome="not_found")
             print(f"Erro: Link do jogo para '{game_name}' não encontrado. {e}")
         except Exception as e:
+            annotate(outcome="error")
             print(f"Um erro inesperado ocorreu em enter_game para '{game_name}': {e}")
 
+    @traced(category="scraper")
     def enter_franchise(self):
         """
         Encontra um elemento <i> com texto "Franchise", clica no <a> anterior.
         """
         try:
             print("Tentando encontrar o gatilho da franquia (<i>Franchise</i>)...")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
+            self._pause(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX)
             try:
-                franchise_trigger_link = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH,
-                                                "//i[@class='subinfo' and normalize-space(text())='Franchise']/preceding-sibling::a[1]"))
-                )
+                franchise_trigger_link = self.ready.clickable(
+                    "//i[@class='subinfo' and normalize-space(text())='Franchise']/preceding-sibling::a[1]",
+                    "franchise_link")
             except TimeoutException:
+                annotate(outcome="not_found")
                 print("Nenhum link de franquia encontrado usando o gatilho <i>Franchise</i> e o irmão <a> anterior.")
                 return
 
             franchise_link_href = franchise_trigger_link.get_attribute('href')
             print(f"Encontrado link da franquia através do gatilho <i>: {franchise_link_href}. Clicando nele...")
+            self._acquire_request()
             franchise_trigger_link.click()
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
 
-            self.wait.until(EC.url_contains("/franchise/"))
+            self.ready.navigation(franchise_trigger_link, "franchise_page")
             print("Navegado para a página da franquia.")
-            time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))
+            self._record_page_outcome()
 
         except TimeoutException:
+            annotate(outcome="timeout")
+            self.throttle.on_pushback("timeout")
             print("Erro: Timeout esperando pelo gatilho principal da franquia ou pela página da franquia carregar.")
         except NoSuchElementException:
+            annotate(outcome="not_found")
             print("Erro: Não foi possível encontrar o gatilho principal da franquia.")
         except Exception as e:
+            annotate(outcome="error")
             print(f"Um erro inesperado ocorreu em enter_franchise: {e}")
 
+    @traced(category="scraper")
     def proccess_franchise(self, csv_dir):
         """
         Na página da franquia (que contém a tabela de jogos), itera pelas linhas da tabela.
-        Para cada linha com um <div class="subinfo"> vazio, clica no link <a> correspondente.
+        Para cada linha com um <div class="subinfo"> vazio, abre diretamente a aba de gráficos do jogo.
+        Com um diário, os jogos são apenas registrados como tarefas 'app' (deduplicadas pelo id do app).
+
+        Returns:
+            bool: False se a página ou a tabela da franquia não foram encontradas.
         """
         print("\nIniciando processamento da tabela de vendas na página de franquia...")
         try:
             if "/franchise/" not in self.driver.current_url:
                 print("Não parece estar em uma página de franquia. Abortando proccess_franchise.")
                 print(f"URL Atual: {self.driver.current_url}")
-                return
+                return False
 
             table_id = "DataTables_Table_0"
             try:
-                table_sales = self.wait.until(
-                    EC.presence_of_element_located((By.ID, table_id))
-                )
+                table_sales = self.ready.populated(f"#{table_id}", "franchise_table")
                 print("Tabela de jogos encontrada.")
-                time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
             except TimeoutException:
                 print(f"Tabela de jogos (ID: {table_id}) não encontrada na página. Abortando.")
-                return
+                return False
 
             franchise_page_url = self.driver.current_url
             rows_to_process_info = []
-            all_rows_in_table = table_sales.find_elements(By.CSS_SELECTOR, "tbody tr.app")
-
-            for index, row_element in enumerate(all_rows_in_table):
-                try:
-                    subinfo_div = row_element.find_element(By.CSS_SELECTOR, "td div.subinfo")
-                    is_empty_js = "return arguments[0].innerHTML.trim() === '';"
-                    is_subinfo_empty = self.driver.execute_script(is_empty_js, subinfo_div)
-
-                    if is_subinfo_empty:
-                        link_to_click_in_row = row_element.find_element(By.CSS_SELECTOR, "td a.b")
-                        link_href = link_to_click_in_row.get_attribute("href")
-                        if link_href and link_href != franchise_page_url and "javascript:void(0)" not in link_href:
-                            rows_to_process_info.append(
-                                {"original_index": index, "href": link_href, "app_name": link_to_click_in_row.text})
-                except NoSuchElementException:
-                    pass  # Silenciosamente ignora linhas que não correspondem à estrutura
+            # Linhas sem div.subinfo ou sem link já são descartadas pelo script
+            for row in self.driver.execute_script(self.FRANCHISE_ROWS_JS, table_sales):
+                link_href = row["href"]
+                if row["subinfo_empty"] and link_href and link_href != franchise_page_url \
+                        and "javascript:void(0)" not in link_href:
+                    rows_to_process_info.append(
+                        {"original_index": row["index"], "href": link_href, "app_name": row["app_name"]})
 
             num_rows_to_click = len(rows_to_process_info)
             print(f"Encontradas {num_rows_to_click} linhas com div.subinfo vazio para processar.")
+            annotate(rows=num_rows_to_click)
 
             if num_rows_to_click == 0:
-                return
+                return True
 
-            for i in range(num_rows_to_click):
-                item_info = rows_to_process_info[i]
-                original_row_index = item_info["original_index"]
+            if self.journal is not None:
+                new_apps = sum(self.journal.add("app", self._app_key(item_info["href"]), csv_dir=csv_dir,
+                                                url=item_info["href"], label=item_info["app_name"])
+                               for item_info in rows_to_process_info)
+                print(f"{new_apps} apps novos registrados no diário ({num_rows_to_click - new_apps} já conhecidos).")
+                return True
 
-                if self.driver.current_url != franchise_page_url:
-                    print(f"Retornando para a página da tabela de franquia: {franchise_page_url}")
-                    self.driver.get(franchise_page_url)
-                    self.wait.until(lambda driver: driver.current_url == franchise_page_url)
-                    self.wait.until(EC.presence_of_element_located((By.ID, table_id)))
-                    time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))
+            # Cada jogo é aberto direto na aba de gráficos, sem voltar à página da franquia entre eles
+            for item_info in rows_to_process_info:
+                original_row_index = item_info["original_index"]
+                if not self._claim_app(item_info["href"]):
+                    print(f"App {item_info['app_name']} já foi processado nesta execução (outra franquia). Pulando.")
+                    continue
 
                 try:
-                    current_all_rows_recheck = self.driver.find_elements(By.CSS_SELECTOR, f"#{table_id} tbody tr.app")
-                    if original_row_index >= len(current_all_rows_recheck):
-                        print(
-                            f"Índice da linha original {original_row_index} está fora dos limites ({len(current_all_rows_recheck)}). Pulando.")
-                        continue
-                    current_row_element_recheck = current_all_rows_recheck[original_row_index]
-                    actual_subinfo_div_recheck = current_row_element_recheck.find_element(By.CSS_SELECTOR,
-                                                                                          "td div.subinfo")
-                    if not self.driver.execute_script("return arguments[0].innerHTML.trim() === '';",
-                                                      actual_subinfo_div_recheck):
-                        print(
-                            f"Linha {original_row_index} (App: {item_info['app_name']}): div.subinfo não está mais vazio. Pulando.")
-                        continue
-                    link_element_to_click_recheck = current_row_element_recheck.find_element(By.CSS_SELECTOR, "td a.b")
-                    print(
-                        f"\nProcessando linha (índice original {original_row_index}, App: {item_info['app_name']}): Clicando no link {item_info['href']}")
-                    self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
-                                               link_element_to_click_recheck)
-                    time.sleep(self.POST_SCROLL_PAUSE)
-                    self.driver.execute_script("arguments[0].click();", link_element_to_click_recheck)
-                    self.wait.until(lambda driver: driver.current_url != franchise_page_url)
-                    print(f"Navegado para: {self.driver.current_url}")
-                    time.sleep(random.uniform(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX))
-                    self.proccess_game(csv_dir=csv_dir)  # Processa o jogo imediatamente após navegar
-                except StaleElementReferenceException:
-                    print(
-                        f"StaleElementReferenceException para linha {original_row_index} (App: {item_info['app_name']}). O DOM mudou.")
+                    print(f"\nProcessando linha (índice original {original_row_index}, App: {item_info['app_name']})")
+                    self.scrape_app(item_info["href"], csv_dir=csv_dir, app_name=item_info["app_name"])
                 except TimeoutException:
+                    annotate(outcome="timeout")
+                    self.throttle.on_pushback("timeout")
                     print(
                         f"Timeout durante o processamento da linha {original_row_index} (App: {item_info['app_name']}).")
                 except Exception as e:
                     print(
                         f"Erro inesperado ao processar linha {original_row_index} (App: {item_info['app_name']}): {e}")
 
-            if self.driver.current_url != franchise_page_url:
-                print(f"Retornando para a página da tabela de franquia ({franchise_page_url}) após o loop.")
-                self.driver.get(franchise_page_url)
-                self.wait.until(lambda driver: driver.current_url == franchise_page_url)
-                time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
             print("\nProcessamento da tabela de franquia concluído.")
+            return True
         except Exception as e:
             print(f"Um erro geral ocorreu em proccess_franchise: {e}")
+            return False
+
+    def _app_key(self, app_url):
+        app_id = re.search(r"/app/(\d+)", app_url)
+        return app_id.group(1) if app_id else app_url.rstrip("/")
+
+    def _charts_url(self, app_url):
+        return app_url.split("#")[0].split("?")[0].rstrip("/") + "/charts/"
+
+    def _claim_app(self, app_url):
+        """Marca o app como processado; retorna False se ele já foi visto em outra franquia."""
+        app_key = self._app_key(app_url)
+        with self._processed_apps_lock:
+            if app_key in self.processed_apps:
+                return False
+            self.processed_apps.add(app_key)
+            return True
+
+    def _csv_filename_for(self, game_name):
+        game_name_for_file = re.sub(r'[^\w\s._-]', '', game_name).strip().replace(' ', '_')
+        if not game_name_for_file: game_name_for_file = "dados_steamdb"
+        return f"{game_name_for_file}_chart_month_data.csv"
 
+    def _rows_to_save(self, rows, headers, csv_dir, csv_filename):
+        """
+        Descarta linhas vazias e, no modo incremental, para no primeiro mês já salvo. Se os
+        cabeçalhos mudaram, a tabela inteira é mantida: o CSV será regravado sem mesclagem.
+        """
+        known_months = set()
+        if self.incremental:
+            existing_headers, existing_rows = self._read_csv_rows(os.path.join(f"csv_data/{csv_dir}", csv_filename))
+            if self._can_merge(headers, existing_headers, existing_rows):
+                # Meses fechados já salvos (a linha 'Last 30 days' é sempre substituída)
+                known_months = {row[0] for row in existing_rows if row and row[0] != self.LAST_30_DAYS_LABEL}
+            elif existing_rows:
+                print(f"Cabeçalhos de '{csv_filename}' mudaram ({existing_headers} -> {headers}); "
+                      f"a tabela completa será salva.")
+        rows_to_save = []
+        for row_data in rows:
+            if row_data and row_data[0] in known_months:
+                # A tabela vem do mês mais recente para o mais antigo: o restante já está salvo.
+                print(f"Mês '{row_data[0]}' já está salvo. Apenas os meses mais recentes foram extraídos.")
+                break
+            if any(rd for rd in row_data if rd): rows_to_save.append(row_data)
+        return rows_to_save
+
+    def enable_http_mode(self):
+        """Exporta cookies e user agent do navegador logado para a sessão HTTP."""
+        self.http_fetcher = SteamDBHttpFetcher.from_driver(self.driver)
+        print(f"Modo HTTP ativado com {len(self.http_fetcher.session.cookies)} cookies do navegador.")
+
+    def _http_get(self, fetch, url):
+        """
+        Executa fetch() respeitando o throttle. Se o SteamDB pedir um desafio, abre a URL
+        no navegador para resolvê-lo, atualiza os cookies e tenta uma segunda vez.
+        """
+        self._acquire_request()
+        try:
+            with span("http_get", "scraper", url=url):
+                result = fetch()
+        except ChallengeRequired as e:
+            print(f"Desafio na requisição HTTP ({e}). Abrindo no navegador para resolver...")
+            annotate(outcome="challenge_retry", retries=1)
+            self.throttle.on_pushback("challenge")
+            self._acquire_request()
+            with self._interactive():
+                self.driver.get(url)
+                self._pause(self.PAGE_LOAD_PAUSE_MIN, self.PAGE_LOAD_PAUSE_MAX)
+                if not self._record_page_outcome():
+                    input("Resolva o captch e pressione Enter para continuar...")
+            self.http_fetcher.update_cookies(self.driver)
+            self._acquire_request()
+            with span("http_get", "scraper", url=url, retry=True):
+                result = fetch()
+        self.throttle.on_success()
+        return result
+
+    def _http_month_table_missing(self, error):
+        """Registra uma página sem a tabela mensal no HTML; após várias seguidas, desativa a busca por HTTP."""
+        self.http_month_table_misses += 1
+        annotate(outcome="browser_fallback")
+        print(f"{error}. A tabela mensal não veio no HTML; usando o navegador para este app.")
+        if self.http_month_tables and self.http_month_table_misses >= self.HTTP_MONTH_TABLE_MAX_MISSES:
+            self.http_month_tables = False
+            print(f"{self.http_month_table_misses} páginas seguidas sem a tabela mensal no HTML: "
+                  f"as próximas tabelas serão lidas pelo navegador.")
+
+    @traced(category="scraper")
+    def proccess_game_http(self, app_url, csv_dir, app_name=None):
+        """
+        Equivalente a proccess_game no modo HTTP: baixa e salva a tabela mensal sem renderizar a página.
+        Se o HTML não traz as linhas da tabela (ChartTableNotFound), o app é lido pelo navegador.
+        """
+        if not self.http_month_tables:
+            return self._scrape_app_in_browser(app_url, csv_dir, app_name)
+        print(f"\nIniciando processamento HTTP dos gráficos do jogo: {app_url}")
+        table_id = SteamDBHttpFetcher.MONTH_TABLE_ID
+        try:
+            try:
+                game_name, headers, rows = self._http_get(lambda: self.http_fetcher.fetch_month_table(app_url),
+                                                          app_url)
+            except ChartTableNotFound as e:
+                self._http_month_table_missing(e)
+                return self._scrape_app_in_browser(app_url, csv_dir, app_name)
+            self.http_month_table_misses = 0
+            csv_filename = self._csv_filename_for(game_name or "dados_jogo_steamdb")
+            all_rows_data = self._rows_to_save(rows, headers, csv_dir, csv_filename)
+            if not all_rows_data:
+                print(f"Nenhum dado encontrado na tabela '{table_id}'.")
+                return bool(rows)
+            print(f"Extraídas {len(all_rows_data)} linhas de dados.")
+            self.csv_writer(headers, all_rows_data, table_id, csv_dir, csv_filename)
+            return True
+        except Exception as e:
+            annotate(outcome="error")
+            print(f"Erro em proccess_game_http para {app_url}: {e}")
+            return False
+
+    @traced(category="scraper")
     def proccess_game(self, csv_dir ):
+        """
+        Salva a tabela mensal do jogo aberto no navegador.
+
+        Returns:
+            bool: True se a tabela foi salva (ou, no modo incremental, não havia meses novos).
+        """
         current_game_page_url = self.driver.current_url
         print(f"\nIniciando processamento dos gráficos do jogo: {current_game_page_url}")
         game_name_for_file = "dados_jogo_steamdb"
         try:
-            h1_element = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "h1[itemprop='name']")))
+            h1_element = self.ready.present("h1[itemprop='name']", "game_title")
             game_name_for_file = h1_element.text.strip()
             if not game_name_for_file: raise ValueError("H1 estava vazio.")
             print(f"Nome do jogo extraído do H1: '{game_name_for_file}'")
@@ -424,86 +752,166 @@ class MonthlyPlayersSteamDBScraper:
             except Exception as e_title:
                 print(f"Erro ao obter nome do título: {e_title}. Usando nome padrão.")
                 game_name_for_file = "dados_jogo_steamdb"
-        game_name_for_file = re.sub(r'[^\w\s._-]', '', game_name_for_file).strip().replace(' ', '_')
-        if not game_name_for_file: game_name_for_file = "dados_steamdb"
-        csv_filename = f"{game_name_for_file}_chart_month_data.csv"
+        csv_filename = self._csv_filename_for(game_name_for_file)
 
         try:
-            print("Tentando clicar na aba 'Charts' (id='tab-charts')...")
-            charts_tab_button = self.wait.until(EC.element_to_be_clickable((By.ID, "tab-charts")))
-            self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
-                                       charts_tab_button)
-            time.sleep(self.POST_SCROLL_PAUSE)
-            self.driver.execute_script("arguments[0].click();", charts_tab_button)
-            print("Aba 'Charts' clicada.")
-            time.sleep(random.uniform(self.ACTION_SHORT_PAUSE_MIN, self.ACTION_SHORT_PAUSE_MAX))
-            self.wait.until(EC.any_of(EC.url_contains("/charts/"),
-                                      EC.presence_of_element_located((By.CSS_SELECTOR, "a#tab-charts.selected"))))
+            if "/charts/" in self.driver.current_url:
+                print("Página já aberta na aba de gráficos.")
+            else:
+                print("Tentando clicar na aba 'Charts' (id='tab-charts')...")
+                charts_tab_button = self.ready.clickable("#tab-charts", "charts_tab")
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center', inline: 'nearest'});",
+                                           charts_tab_button)
+                self._pause(self.POST_SCROLL_PAUSE, self.POST_SCROLL_PAUSE)
+                self._acquire_request()
+                self.driver.execute_script("arguments[0].click();", charts_tab_button)
+                print("Aba 'Charts' clicada.")
+                self.ready.until(EC.any_of(EC.url_contains("/charts/"),
+                                           EC.presence_of_element_located((By.CSS_SELECTOR, "a#tab-charts.selected"))),
+                                 "charts_tab_selected")
             print(f"Navegado para a aba de gráficos. URL: {self.driver.current_url}")
             table_id = "chart-month-table"
             loading_div_id = "js-chart-month-loading"
             print(f"Esperando pelo div de loading '{loading_div_id}' ficar oculto...")
-            self.wait.until(EC.invisibility_of_element_located((By.ID, loading_div_id)))
-            time.sleep(random.uniform(0.3, 0.8))  # Pausa após loading sumir
-            print(f"Esperando pela tabela '{table_id}' ficar visível...")
-            data_table = self.wait.until(EC.visibility_of_element_located((By.ID, table_id)))
-            time.sleep(random.uniform(self.ACTION_MEDIUM_PAUSE_MIN,
-                                      self.ACTION_MEDIUM_PAUSE_MAX))  # Pausa maior para renderizar tabela
+            self.ready.hidden(f"#{loading_div_id}", "chart_loading")
+            self._record_page_outcome()
+            print(f"Esperando pela tabela '{table_id}' ficar visível e com linhas...")
+            data_table = self.ready.populated(f"#{table_id}", "chart_table")
             print("Tabela de dados mensais encontrada e visível.")
-            headers = []
-            header_elements = data_table.find_elements(By.CSS_SELECTOR, "thead tr th")
-            if header_elements:
-                headers = [header.text.strip() for header in header_elements]
-            else:
-                try:
-                    first_row_th = data_table.find_elements(By.CSS_SELECTOR, "tbody tr:first-child th")
-                    if first_row_th:
-                        headers = [th.text.strip() for th in first_row_th]
-                    else:
-                        first_row_td = data_table.find_elements(By.CSS_SELECTOR, "tbody tr:first-child td")
-                        if first_row_td: headers = [td.text.strip() for td in first_row_td]
-                except:
-                    pass
+            with span("extract_cells", "scraper") as extract_span:
+                table_content = self.driver.execute_script(self.MONTH_TABLE_JS, data_table)
+                extract_span.set(rows=len(table_content["rows"]))
+            headers = table_content["headers"]
             if not headers:
-                first_data_row_cells_count = data_table.find_elements(By.CSS_SELECTOR, "tbody tr:first-child td")
-                if first_data_row_cells_count:
-                    headers = [f"Coluna_{i + 1}" for i in range(len(first_data_row_cells_count))]
+                if table_content["firstRowCells"]:
+                    headers = [f"Coluna_{i + 1}" for i in range(table_content["firstRowCells"])]
                 else:
                     headers = ["Dados"]; print("Não foi possível determinar os cabeçalhos, usando placeholder.")
             print(f"Cabeçalhos extraídos: {headers}")
-            all_rows_data = []
-            body_rows = data_table.find_elements(By.CSS_SELECTOR, "tbody tr")
-            for row in body_rows:
-                cols = row.find_elements(By.TAG_NAME, "td")
-                row_data = [ele.text.strip() for ele in cols]
-                if any(rd for rd in row_data if rd): all_rows_data.append(row_data)
+            all_rows_data = self._rows_to_save(table_content["rows"], headers, csv_dir, csv_filename)
             if not all_rows_data:
                 print(f"Nenhum dado encontrado na tabela '{table_id}'.");
-                return
+                return bool(table_content["rows"])
             print(f"Extraídas {len(all_rows_data)} linhas de dados.")
-            time.sleep(random.uniform(0.3, 0.7))  # Pausa antes de escrever
             self.csv_writer(headers, all_rows_data, table_id, csv_dir, csv_filename)
+            return True
         except TimeoutException:
+            annotate(outcome="timeout")
+            self.throttle.on_pushback("timeout")
             print(f"Timeout ao processar {current_game_page_url} (gráficos/tabela).")
         except NoSuchElementException:
+            annotate(outcome="not_found")
             print(f"Elemento não encontrado em {current_game_page_url}.")
         except Exception as e:
+            annotate(outcome="error")
             print(f"Erro em proccess_game para {current_game_page_url}: {e}")
         finally:
             print(f"Processamento de {current_game_page_url} concluído.")
+        return False
 
+    def _month_sort_key(self, month_label):
+        """Ordena como a tabela do SteamDB: 'Last 30 days' primeiro, depois do mês mais recente ao mais antigo."""
+        if month_label == self.LAST_30_DAYS_LABEL:
+            return 0, 0
+        try:
+            return 1, -datetime.strptime(month_label, "%B %Y").toordinal()
+        except ValueError:
+            return 2, 0
+
+    def _read_csv_rows(self, full_csv_path):
+        if not os.path.isfile(full_csv_path):
+            return [], []
+        with open(full_csv_path, newline='', encoding='utf-8') as csvfile:
+            rows = list(csv.reader(csvfile))
+        if not rows:
+            return [], []
+        return rows[0], rows[1:]
+
+    def _can_merge(self, headers, existing_headers, existing_rows):
+        """Linhas novas só são mescladas a um CSV existente com os mesmos cabeçalhos."""
+        return bool(existing_rows) and (not headers or headers == existing_headers)
+
+    def _merge_rows(self, existing_rows, new_rows):
+        merged = {row[0]: row for row in existing_rows if row}
+        for row in new_rows:
+            if row:
+                merged[row[0]] = row
+        return sorted(merged.values(), key=lambda row: self._month_sort_key(row[0]))
+
+    @traced(category="scraper")
     def csv_writer(self, headers, rows_data, table_id, csv_dir, csv_filename):
         output_dir = f"csv_data/{csv_dir}"
         os.makedirs(output_dir, exist_ok=True)
         full_csv_path = os.path.join(output_dir, csv_filename)
-        with open(full_csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            if headers:
-                writer.writerow(headers)
-            writer.writerows(rows_data)
+
+        if self.incremental:
+            existing_headers, existing_rows = self._read_csv_rows(full_csv_path)
+            if self._can_merge(headers, existing_headers, existing_rows):
+                headers = existing_headers
+                rows_data = self._merge_rows(existing_rows, rows_data)
+                if rows_data == existing_rows:
+                    annotate(outcome="unchanged")
+                    print(f"Nenhum mês novo ou alterado para '{full_csv_path}'.")
+                    return
+
+        # Escreve em um arquivo temporário e renomeia, para nunca deixar um CSV pela metade
+        fd, temp_path = tempfile.mkstemp(dir=output_dir, prefix=".", suffix=".csv.tmp")
+        try:
+            with os.fdopen(fd, 'w', newline='', encoding='utf-8') as csvfile:
+                writer = csv.writer(csvfile)
+                if headers:
+                    writer.writerow(headers)
+                writer.writerows(rows_data)
+            # mkstemp cria o arquivo com modo 0600; o CSV publicado segue a umask, como um open() comum
+            os.chmod(temp_path, CSV_FILE_MODE)
+            os.replace(temp_path, full_csv_path)
+            annotate(rows=len(rows_data))
+        except BaseException:
+            os.remove(temp_path)
+            raise
         print(f"Dados da tabela '{table_id}' salvos em '{full_csv_path}'")
 
+    @traced(category="scraper")
+    def scrape_game(self, game):
+        """Pesquisa o jogo, entra na página dele e salva a tabela mensal em csv_data/<game>. Retorna se salvou."""
+        if self.http_fetcher is not None:
+            app_url = self._http_get(lambda: self.http_fetcher.search_app(game), "https://steamdb.info/")
+            if app_url:
+                return self.proccess_game_http(app_url, csv_dir=game, app_name=game)
+            print(f"Jogo '{game}' não encontrado pela pesquisa HTTP. Usando o navegador.")
+        self.search_game(game)
+        self.enter_game(game)
+        return self.proccess_game(csv_dir=game)
+
+    @traced(category="scraper")
+    def scrape_franchise(self, franchise):
+        """Pesquisa a franquia, entra na página dela e salva a tabela mensal de cada jogo. Retorna se a tabela foi lida."""
+        self.search_game(franchise)
+        self.enter_franchise()
+        return self.proccess_franchise(csv_dir=franchise)
+
+    @traced(category="scraper")
+    def scrape_app(self, app_url, csv_dir, app_name=None):
+        """Abre a aba de gráficos de um app (link da tabela da franquia) e salva a tabela mensal. Retorna se salvou."""
+        if self.http_fetcher is not None:
+            return self.proccess_game_http(app_url, csv_dir=csv_dir, app_name=app_name)
+        return self._scrape_app_in_browser(app_url, csv_dir, app_name)
+
+    def _scrape_app_in_browser(self, app_url, csv_dir, app_name=None):
+        charts_url = self._charts_url(app_url)
+        print(f"Abrindo {charts_url}")
+        self._acquire_request()
+        with span("open_charts_page", "scraper", app=app_name or app_url):
+            # driver.get só retorna após o load; a tabela é esperada por evento em proccess_game
+            self.driver.get(charts_url)
+            self._record_page_outcome()
+        return self.proccess_game(csv_dir=csv_dir)
+
     def close_browser(self):
         if hasattr(self, 'driver'):
+            try:
+                self.save_session()  # Guarda cookies renovados durante a execução
+            except Exception as e:
+                print(f"Não foi possível salvar a sessão: {e}")
             print("Fechando navegador.")
             self.driver.quit()
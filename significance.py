@@ -0,0 +1,109 @@
+import numpy as np
+
+# Quantidade máxima de valores reamostrados (pares x reamostragens) mantidos em memória por vez
+CHUNK_ELEMENTS = 4_000_000
+
+
+def _as_matrix(values):
+    """Aceita uma série (1 jogo) ou uma matriz (jogos x meses) e retorna sempre 2D float64."""
+    values = np.asarray(values, dtype=np.float64)
+    return values[None, :] if values.ndim == 1 else values
+
+
+def _chunks(n_rows, n_resamples):
+    step = max(1, CHUNK_ELEMENTS // max(n_resamples, 1))
+    for start in range(0, n_rows, step):
+        yield slice(start, min(start + step, n_rows))
+
+
+def _resample_counts(rng, n_resamples, size):
+    """
+    Matriz (reamostragens x size) com quantas vezes cada posição foi sorteada em cada
+    reamostragem com reposição. A média reamostrada de todos os jogos vira um produto matricial.
+    """
+    indices = rng.integers(0, size, size=(n_resamples, size))
+    counts = np.zeros((n_resamples, size))
+    np.add.at(counts, (np.arange(n_resamples)[:, None], indices), 1)
+    return counts
+
+
+def bootstrap_lift(before, after, n_resamples=10000, confidence=0.95, seed=None):
+    """
+    Intervalo de confiança bootstrap (percentil) da variação percentual da média
+    (depois - antes) / antes * 100, para vários jogos de uma vez.
+
+    Args:
+        before (array): Meses antes do evento, (jogos x janela) ou uma série.
+        after (array): Meses depois do evento, (jogos x janela) ou uma série.
+        n_resamples (int): Quantidade de reamostragens.
+        confidence (float): Nível de confiança do intervalo.
+        seed (int, opcional): Semente do gerador, para resultados reproduzíveis.
+
+    Returns:
+        dict: Arrays 'lift_pct', 'ci_low' e 'ci_high', um valor por jogo.
+    """
+    before, after = _as_matrix(before), _as_matrix(after)
+    rng = np.random.default_rng(seed)
+    # Os mesmos sorteios servem para todos os jogos (números aleatórios comuns)
+    counts_before = _resample_counts(rng, n_resamples, before.shape[1]) / before.shape[1]
+    counts_after = _resample_counts(rng, n_resamples, after.shape[1]) / after.shape[1]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lift = (after.mean(axis=1) - before.mean(axis=1)) / before.mean(axis=1) * 100
+    ci_low = np.empty(len(before))
+    ci_high = np.empty(len(before))
+    tail = (1 - confidence) / 2 * 100
+    for rows in _chunks(len(before), n_resamples):
+        mean_before = before[rows] @ counts_before.T
+        mean_after = after[rows] @ counts_after.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lifts = (mean_after - mean_before) / mean_before * 100
+        ci_low[rows], ci_high[rows] = np.percentile(lifts, [tail, 100 - tail], axis=1)
+    return {"lift_pct": lift, "ci_low": ci_low, "ci_high": ci_high}
+
+
+def permutation_test(before, after, n_resamples=10000, alternative="greater", seed=None):
+    """
+    Teste de permutação da diferença de médias (depois - antes) para vários jogos de uma vez.
+    Cada permutação sorteia quais meses da janela combinada formam o grupo "depois".
+
+    Args:
+        before (array): Meses antes do evento, (jogos x janela) ou uma série.
+        after (array): Meses depois do evento, (jogos x janela) ou uma série.
+        n_resamples (int): Quantidade de permutações.
+        alternative (str): 'greater', 'less' ou 'two-sided'.
+        seed (int, opcional): Semente do gerador, para resultados reproduzíveis.
+
+    Returns:
+        dict: Arrays 'statistic' (diferença observada) e 'p_value', um valor por jogo.
+    """
+    if alternative not in ("greater", "less", "two-sided"):
+        raise ValueError(f"alternative inválida: {alternative}")
+    before, after = _as_matrix(before), _as_matrix(after)
+    n_before, n_after = before.shape[1], after.shape[1]
+    pooled = np.concatenate([before, after], axis=1)
+    rng = np.random.default_rng(seed)
+
+    # selection[r, j] = 1 se a posição j caiu no grupo "depois" na permutação r
+    order = rng.random((n_resamples, n_before + n_after)).argsort(axis=1)
+    selection = np.zeros((n_resamples, n_before + n_after))
+    np.put_along_axis(selection, order[:, :n_after], 1, axis=1)
+
+    observed = after.mean(axis=1) - before.mean(axis=1)
+    totals = pooled.sum(axis=1)
+    extreme = np.zeros(len(pooled))
+    for rows in _chunks(len(pooled), n_resamples):
+        sum_after = pooled[rows] @ selection.T
+        permuted = sum_after / n_after - (totals[rows, None] - sum_after) / n_before
+        # Tolerância para empates numéricos entre a estatística observada e a permutada
+        tolerance = 1e-9 * np.maximum(np.abs(observed[rows]), 1)[:, None]
+        if alternative == "greater":
+            hits = permuted >= observed[rows, None] - tolerance
+        elif alternative == "less":
+            hits = permuted <= observed[rows, None] + tolerance
+        else:
+            hits = np.abs(permuted) >= np.abs(observed[rows, None]) - tolerance
+        extreme[rows] = hits.sum(axis=1)
+    p_value = (extreme + 1) / (n_resamples + 1)
+    p_value[np.isnan(observed)] = np.nan
+    return {"statistic": observed, "p_value": p_value}
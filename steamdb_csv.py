@@ -0,0 +1,197 @@
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from tracing import span
+
+MONTH_FORMAT = "%B %Y"
+
+# Colunas numéricas do CSV do SteamDB e seus dtypes compactos.
+# Peak sempre existe em linhas válidas; as demais podem vir como "-" e viram NaN.
+NUMERIC_COLUMNS = {
+    "Peak": np.int32,
+    "Gain": np.float32,
+    "% Gain": np.float32,
+    "Average": np.float32,
+    "Avg % Gain": np.float32,
+}
+
+# Tabela de consulta compartilhada: rótulo "%B %Y" -> datetime64. Cada rótulo distinto
+# (ex.: "April 2025") é interpretado uma única vez por processo; "Last 30 days" vira NaT.
+_month_lookup = {}
+
+# Limite padrão do cache de séries já limpas (bytes ocupados pelos DataFrames em memória).
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "entries", "bytes", "max_bytes"])
+
+
+def parse_months(labels):
+    """
+    Converte os rótulos de mês ("April 2025") em datetime64[ns] usando a tabela de consulta.
+    Rótulos que não são meses, como "Last 30 days", resultam em NaT.
+    """
+    codes, uniques = pd.factorize(np.asarray(labels, dtype=object))
+    missing = [label for label in uniques if label not in _month_lookup]
+    if missing:
+        parsed = pd.to_datetime(pd.Index(missing, dtype=object), format=MONTH_FORMAT, errors='coerce')
+        _month_lookup.update(zip(missing, parsed.to_numpy()))
+    # O último elemento atende aos códigos -1 (valores ausentes)
+    table = np.array([_month_lookup[label] for label in uniques] + [np.datetime64("NaT")], dtype="datetime64[ns]")
+    return table[codes]
+
+
+def parse_numbers(df, columns):
+    """
+    Converte várias colunas de texto ("1,340", "+52.4%", "-") em float64 de uma só vez.
+
+    Returns:
+        np.ndarray: Matriz (linhas x colunas), com NaN onde o valor não é numérico.
+    """
+    if not columns:
+        return np.empty((len(df), 0))
+    flat = pd.Series(df[columns].to_numpy(dtype=object).ravel(), dtype="string")
+    cleaned = flat.str.replace(r"[,%+]", "", regex=True)
+    numbers = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+    return numbers.reshape(len(df), len(columns))
+
+
+class SeriesCache(object):
+    """
+    Cache LRU, limitado em bytes, das séries já limpas de cada CSV.
+    A chave é (caminho, tamanho, mtime): quando o scraper regrava um arquivo, a chave muda
+    e a versão antiga deixa de ser usada e acaba descartada pelo LRU.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(csv_path):
+        stat = os.stat(csv_path)
+        return os.path.abspath(csv_path), stat.st_size, stat.st_mtime_ns
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            # Outra versão do mesmo arquivo não será mais pedida
+            for stale in [k for k in self._entries if k[0] == key[0] and k != key]:
+                self._bytes -= self._entries.pop(stale)[1]
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+
+    def set_limit(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, len(self._entries), self._bytes, self.max_bytes)
+
+
+_series_cache = SeriesCache()
+
+
+def cache_info():
+    """Contadores de acertos/faltas e ocupação do cache do processo."""
+    return _series_cache.info()
+
+
+def clear_cache():
+    _series_cache.clear()
+
+
+def clear_month_lookup():
+    """Esvazia a tabela de rótulos de mês já interpretados (para medições a frio)."""
+    _month_lookup.clear()
+
+
+def set_cache_limit(max_bytes):
+    """Altera o limite do cache; 0 desativa o cache."""
+    _series_cache.set_limit(max_bytes)
+
+
+def _parse_chart_csv(csv_path):
+    with span("read_csv", "analyzer") as read_span:
+        df = pd.read_csv(csv_path, dtype=str)
+        read_span.set(rows=len(df))
+    if "Month" not in df.columns:
+        raise KeyError("Month")
+    columns = [c for c in NUMERIC_COLUMNS if c in df.columns]
+
+    with span("parse", "analyzer"):
+        months = parse_months(df["Month"])
+        numbers = parse_numbers(df, columns)
+    valid = ~np.isnat(months)
+    if "Peak" in columns:
+        valid &= ~np.isnan(numbers[:, columns.index("Peak")])
+
+    data = {"Month": months[valid]}
+    for i, column in enumerate(columns):
+        data[column] = numbers[valid, i].astype(NUMERIC_COLUMNS[column])
+    return pd.DataFrame(data).sort_values("Month", kind="stable", ignore_index=True)
+
+
+def load_chart_csv(csv_path, columns=None):
+    """
+    Lê um *_chart_month_data.csv do SteamDB, passando pelo cache de séries do processo.
+
+    Args:
+        csv_path (str): Caminho do CSV.
+        columns (list[str], opcional): Colunas numéricas desejadas; padrão é todas as existentes.
+
+    Returns:
+        pd.DataFrame: Coluna 'Month' (datetime64) e as colunas numéricas pedidas que existem
+        no arquivo, em ordem crescente de mês, sem a linha "Last 30 days" e sem linhas sem Peak.
+        É sempre uma cópia, então o chamador pode alterá-la.
+
+    Raises:
+        KeyError: Se o arquivo não tiver a coluna 'Month'.
+    """
+    with span("load_series", "analyzer") as load_span:
+        key = SeriesCache.key_for(csv_path)
+        df = _series_cache.get(key)
+        if df is None:
+            df = _parse_chart_csv(csv_path)
+            _series_cache.put(key, df)
+            load_span.set(outcome="cache_miss", rows=len(df))
+        else:
+            load_span.set(outcome="cache_hit", rows=len(df))
+        selected = ["Month"] + [c for c in (columns or NUMERIC_COLUMNS) if c in df.columns]
+        return df[selected].copy()
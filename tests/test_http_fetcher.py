@@ -0,0 +1,145 @@
+import os
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from scraper.http_fetcher import ChallengeRequired, ChartTableNotFound, SteamDBHttpFetcher
+from scraper.rate_limit import AdaptiveThrottle
+from scraper.steamdb_scraper import MonthlyPlayersSteamDBScraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "steamdb")
+
+# Caminho pedido pelo fetcher -> página gravada servida pelo servidor local
+ROUTES = {
+    "/app/292030/charts/": "app_292030_charts.html",
+    "/app/1091500/charts/": "app_1091500_charts.html",
+    "/search/": "search.html",
+}
+
+
+class _RecordedPagesHandler(SimpleHTTPRequestHandler):
+    """Serve as páginas de FIXTURES_DIR no lugar do SteamDB; /challenge/ imita o bloqueio do Cloudflare."""
+
+    def translate_path(self, path):
+        return os.path.join(FIXTURES_DIR, ROUTES.get(urlsplit(path).path, "missing.html"))
+
+    def do_GET(self):
+        if urlsplit(self.path).path == "/challenge/":
+            self.send_response(403)
+            self.end_headers()
+            self.wfile.write(b"<title>Just a moment...</title>")
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(_RecordedPagesHandler, directory=FIXTURES_DIR))
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.thread.join()
+
+    def fetcher(self):
+        return SteamDBHttpFetcher(base_url=self.base_url, timeout=5)
+
+
+class SteamDBHttpFetcherTest(StandInServerTestCase):
+    def test_fetch_month_table_parses_recorded_charts_page(self):
+        title, headers, rows = self.fetcher().fetch_month_table("https://steamdb.info/app/292030/")
+
+        self.assertEqual(title, "The Witcher 3: Wild Hunt")
+        self.assertEqual(headers, ["Month", "Peak", "Gain", "% Gain", "Average", "Avg % Gain"])
+        self.assertEqual(rows, [
+            ["Last 30 days", "35,016", "+1,204", "+3.56%", "22,981.7", "+2.11%"],
+            ["May 2025", "33,812", "-2,541", "-6.99%", "22,507.4", "-5.40%"],
+            ["April 2025", "36,353", "+4,020", "+12.43%", "23,792.9", "+9.87%"],
+            ["March 2025", "32,333", "-", "-", "21,655.5", "-"],
+        ])
+
+    def test_table_filled_by_javascript_raises_chart_table_not_found(self):
+        with self.assertRaises(ChartTableNotFound):
+            self.fetcher().fetch_month_table("https://steamdb.info/app/1091500/charts/")
+
+    def test_page_without_table_raises_chart_table_not_found(self):
+        fetcher = self.fetcher()
+        fetcher.MONTH_TABLE_PATH = "/search/?q={app_id}"  # Página gravada sem a tabela mensal
+        with self.assertRaises(ChartTableNotFound):
+            fetcher.fetch_month_table("https://steamdb.info/app/292030/")
+
+    def test_challenge_response_raises_challenge_required(self):
+        with self.assertRaises(ChallengeRequired):
+            self.fetcher().get_html("/challenge/")
+
+    def test_search_app_returns_exact_match(self):
+        self.assertEqual(self.fetcher().search_app("The Witcher 3: Wild Hunt"), "https://steamdb.info/app/292030/")
+        self.assertIsNone(self.fetcher().search_app("Fallout 4"))
+
+
+class HttpModeScraperTest(StandInServerTestCase):
+    """proccess_game_http contra o servidor local, sem abrir o navegador."""
+
+    def setUp(self):
+        self.previous_dir = os.getcwd()
+        self.work_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.work_dir.name)
+        self.browser_calls = []
+        scraper = MonthlyPlayersSteamDBScraper.__new__(MonthlyPlayersSteamDBScraper)
+        scraper.incremental = False
+        scraper.throttle = AdaptiveThrottle(max_requests_per_minute=60000)
+        scraper.http_fetcher = self.fetcher()
+        scraper.http_month_tables = True
+        scraper.http_month_table_misses = 0
+        scraper._scrape_app_in_browser = self._scrape_app_in_browser
+        self.scraper = scraper
+
+    def _scrape_app_in_browser(self, app_url, csv_dir, app_name=None):
+        self.browser_calls.append(app_url)
+        return True
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        self.work_dir.cleanup()
+
+    def test_month_table_is_saved_from_http(self):
+        self.assertTrue(self.scraper.proccess_game_http("https://steamdb.info/app/292030/", csv_dir="the_witcher"))
+
+        csv_path = os.path.join("csv_data", "the_witcher", "The_Witcher_3_Wild_Hunt_chart_month_data.csv")
+        with open(csv_path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0], "Month,Peak,Gain,% Gain,Average,Avg % Gain")
+        self.assertEqual(lines[1], 'Last 30 days,"35,016","+1,204",+3.56%,"22,981.7",+2.11%')
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(self.browser_calls, [])
+
+    def test_missing_rows_fall_back_to_browser(self):
+        app_url = "https://steamdb.info/app/1091500/"
+        self.assertTrue(self.scraper.proccess_game_http(app_url, csv_dir="cyberpunk_2077"))
+
+        self.assertEqual(self.browser_calls, [app_url])
+        self.assertFalse(os.path.exists("csv_data"))
+
+    def test_repeated_misses_stop_http_month_tables(self):
+        app_url = "https://steamdb.info/app/1091500/"
+        for _ in range(MonthlyPlayersSteamDBScraper.HTTP_MONTH_TABLE_MAX_MISSES):
+            self.scraper.proccess_game_http(app_url, csv_dir="cyberpunk_2077")
+        self.assertFalse(self.scraper.http_month_tables)
+
+        self.scraper.proccess_game_http("https://steamdb.info/app/292030/", csv_dir="the_witcher")
+        self.assertEqual(len(self.browser_calls), MonthlyPlayersSteamDBScraper.HTTP_MONTH_TABLE_MAX_MISSES + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
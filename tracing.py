@@ -0,0 +1,266 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+# Limite de eventos guardados em memória; acima dele os spans continuam medindo, mas são descartados
+MAX_EVENTS = 200000
+TRACE_DIR = "traces"
+
+
+class Span(object):
+    """Trecho cronometrado. args aceita contadores e desfechos (rows, outcome, retries...)."""
+
+    __slots__ = ("name", "category", "args", "start_ns")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class _NullSpan(object):
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer(object):
+    """
+    Registra spans aninhados (por thread) e exporta no formato trace-event do Chrome
+    (chrome://tracing ou Perfetto), além de uma tabela resumo por etapa.
+    O custo por span é um par de perf_counter_ns e um append, então pode ficar ligado em produção.
+    """
+
+    def __init__(self, enabled=True, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self._local = threading.local()
+        self._origin_ns = time.perf_counter_ns()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, category="", **args):
+        """Context manager que mede o bloco; exceções que o atravessam viram outcome=<nome da exceção>."""
+        if not self.enabled:
+            return _NullContext()
+        return _SpanContext(self, Span(name, category, args))
+
+    def traced(self, name=None, category=""):
+        """Decorador: mede cada chamada da função em um span."""
+        def decorator(function):
+            span_name = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, category):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def current(self):
+        """Span aberto mais interno da thread atual (ou um span nulo)."""
+        stack = self._stack() if self.enabled else None
+        return stack[-1] if stack else _NULL_SPAN
+
+    def annotate(self, **args):
+        """Anota o span aberto mais interno; útil em blocos except que não propagam a exceção."""
+        self.current().set(**args)
+
+    def _begin(self, span):
+        self._stack().append(span)
+        span.start_ns = time.perf_counter_ns()
+
+    def _end(self, span):
+        end_ns = time.perf_counter_ns()
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        self.events.append((span.name, span.category, span.start_ns - self._origin_ns,
+                            end_ns - span.start_ns, os.getpid(), threading.get_ident(), span.args))
+
+    def reset(self):
+        self.events = []
+        self.dropped = 0
+
+    def reset_worker(self):
+        """Para o initializer de processos trabalhadores: descarta eventos e spans abertos herdados do pai (fork)."""
+        self.reset()
+        self._local = threading.local()
+
+    def drain(self):
+        """
+        Retorna e limpa os eventos deste processo, com o início em perf_counter_ns absoluto.
+        O relógio de perf_counter é o mesmo para todos os processos da máquina, então
+        merge() consegue colocar os eventos de um trabalhador na linha do tempo do pai.
+        """
+        events = [(name, category, start_ns + self._origin_ns, duration_ns, pid, tid, args)
+                  for name, category, start_ns, duration_ns, pid, tid, args in self.events]
+        self.reset()
+        return events
+
+    def merge(self, events):
+        """Junta eventos vindos de drain() em outro processo; pid e tid continuam os do trabalhador."""
+        for name, category, start_ns, duration_ns, pid, tid, args in events:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                continue
+            self.events.append((name, category, start_ns - self._origin_ns, duration_ns, pid, tid, args))
+
+    def chrome_trace(self):
+        """Eventos no formato JSON trace-event do Chrome (eventos 'X', tempos em microssegundos)."""
+        trace_events = []
+        for name, category, start_ns, duration_ns, pid, tid, args in list(self.events):
+            trace_events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start_ns / 1000,
+                "dur": duration_ns / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {k: v if isinstance(v, (int, float, str, bool)) or v is None else str(v)
+                         for k, v in args.items()},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped}}
+
+    def write_chrome_trace(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+    def summary(self):
+        """
+        Agrega os spans por nome.
+
+        Returns:
+            list[dict]: Por etapa: count, total_s, mean_ms, max_ms, rows (soma do arg 'rows')
+            e outcomes (contagem de cada 'outcome' anotado), ordenado pelo tempo total.
+        """
+        stages = defaultdict(lambda: {"count": 0, "total_ns": 0, "max_ns": 0, "rows": 0,
+                                      "outcomes": defaultdict(int)})
+        for name, _, _, duration_ns, _, _, args in list(self.events):
+            stage = stages[name]
+            stage["count"] += 1
+            stage["total_ns"] += duration_ns
+            stage["max_ns"] = max(stage["max_ns"], duration_ns)
+            rows = args.get("rows")
+            if isinstance(rows, int):
+                stage["rows"] += rows
+            if "outcome" in args:
+                stage["outcomes"][args["outcome"]] += 1
+        table = []
+        for name, stage in stages.items():
+            table.append({
+                "stage": name,
+                "count": stage["count"],
+                "total_s": stage["total_ns"] / 1e9,
+                "mean_ms": stage["total_ns"] / stage["count"] / 1e6,
+                "max_ms": stage["max_ns"] / 1e6,
+                "rows": stage["rows"],
+                "outcomes": dict(stage["outcomes"]),
+            })
+        return sorted(table, key=lambda row: row["total_s"], reverse=True)
+
+    def print_summary(self):
+        table = self.summary()
+        if not table:
+            return
+        print(f"\n{'Etapa':<28} {'N':>6} {'Total (s)':>10} {'Média (ms)':>11} {'Máx (ms)':>10} {'Linhas':>8}  Desfechos")
+        for row in table:
+            outcomes = ", ".join(f"{k}={v}" for k, v in sorted(row["outcomes"].items()))
+            print(f"{row['stage']:<28} {row['count']:>6} {row['total_s']:>10.3f} {row['mean_ms']:>11.2f} "
+                  f"{row['max_ms']:>10.2f} {row['rows'] or '':>8}  {outcomes}")
+        if self.dropped:
+            print(f"({self.dropped} spans descartados acima do limite de {self.max_events})")
+
+    def finish(self, run_name):
+        """Grava traces/<run_name>_<data>.json, imprime o resumo por etapa e limpa os eventos."""
+        if not self.enabled or not self.events:
+            return None
+        path = os.path.join(TRACE_DIR, f"{run_name}_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        self.write_chrome_trace(path)
+        self.print_summary()
+        self.reset()
+        print(f"Trace salvo em: {path} (abra em chrome://tracing ou ui.perfetto.dev)")
+        return path
+
+
+class _SpanContext(object):
+    __slots__ = ("tracer", "span")
+
+    def __init__(self, tracer, span):
+        self.tracer = tracer
+        self.span = span
+
+    def __enter__(self):
+        self.tracer._begin(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is not None and "outcome" not in self.span.args:
+            self.span.args["outcome"] = exc_type.__name__
+        self.tracer._end(self.span)
+        return False
+
+
+class _NullContext(object):
+    def __enter__(self):
+        return _NULL_SPAN
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+# Tracer do processo. TRACING=0 desliga a coleta.
+tracer = Tracer(enabled=os.environ.get("TRACING", "1") != "0")
+
+
+def call_traced(function, *args):
+    """
+    Executa function(*args) num processo trabalhador e retorna (resultado, eventos), para que os
+    spans do trabalhador cheguem ao tracer do processo principal (ver traced_result).
+    Se function falhar, os eventos seguem no atributo trace_events da exceção.
+    """
+    try:
+        result = function(*args)
+    except Exception as error:
+        error.trace_events = tracer.drain()
+        raise
+    return result, tracer.drain()
+
+
+def traced_result(future):
+    """future.result() de uma tarefa call_traced, juntando os eventos do trabalhador ao tracer local."""
+    try:
+        result, events = future.result()
+    except Exception as error:
+        tracer.merge(getattr(error, "trace_events", ()))
+        raise
+    tracer.merge(events)
+    return result
+
+span = tracer.span
+traced = tracer.traced
+annotate = tracer.annotate